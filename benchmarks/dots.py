@@ -0,0 +1,59 @@
+"""
+Benchmark the per-test output overhead of RichTextTestResult in dots mode,
+against the stock unittest.TextTestResult.
+
+Run with:
+
+    python benchmarks/dots.py [number_of_tests]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import unittest
+
+# Render colours, as on most CI systems, even though output is discarded.
+os.environ.setdefault("FORCE_COLOR", "1")
+
+from django_rich.test import RichTestRunner  # noqa: E402
+
+
+class TrivialTests(unittest.TestCase):
+    def test_pass(self) -> None:
+        pass
+
+
+def time_runner(runner_class: type[unittest.TextTestRunner], count: int) -> float:
+    suite = unittest.TestSuite(TrivialTests("test_pass") for _ in range(count))
+    with open(os.devnull, "w") as devnull:
+        runner = runner_class(stream=devnull, verbosity=1)
+        start = time.perf_counter()
+        runner.run(suite)
+        return time.perf_counter() - start
+
+
+def time_silent(count: int) -> float:
+    suite = unittest.TestSuite(TrivialTests("test_pass") for _ in range(count))
+    result = unittest.TestResult()
+    start = time.perf_counter()
+    suite.run(result)
+    return time.perf_counter() - start
+
+
+def main(argv: list[str]) -> None:
+    count = int(argv[0]) if argv else 100_000
+    baseline = time_silent(count)
+    print(f"{count:,} trivial tests, output overhead per test:")
+    for name, runner_class in [
+        ("unittest.TextTestRunner", unittest.TextTestRunner),
+        ("RichTestRunner", RichTestRunner),
+    ]:
+        elapsed = time_runner(runner_class, count)
+        overhead = (elapsed - baseline) / count * 1_000_000
+        print(f"  {name:<24} {elapsed:.3f}s total, {overhead:.2f}µs per test")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+def cache_path(cache_dir: str | os.PathLike[str], name: str) -> Path:
+    """
+    Return the path for a file in the cache directory.
+    """
+    return Path(cache_dir) / name
+
+
+def _make_cache_dir(directory: Path) -> None:
+    if not directory.is_dir():
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / ".gitignore").write_text(
+            "# Created by django-rich, automatically.\n*\n"
+        )
+
+
+def read_json(path: Path) -> Any:
+    """
+    Read a JSON cache file, returning None if it is missing or unreadable.
+    """
+    try:
+        with path.open() as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: Path, data: Any) -> None:
+    """
+    Write a JSON cache file compactly, replacing any existing file atomically.
+    The cache directory is created with a .gitignore if needed.
+    """
+    _make_cache_dir(path.parent)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def update_json(path: Path, data: Any, *, empty: bool) -> None:
+    """
+    Write a JSON cache file, unless it's ``empty`` and there's no existing
+    file to update, so the cache directory isn't created for nothing.
+    """
+    if empty and not path.exists():
+        return
+    write_json(path, data)
@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+import difflib
+import os
+import reprlib
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from contextlib import ExitStack, contextmanager
+from typing import Any, NamedTuple, cast
+from unittest import TestCase, mock
+
+# Hide the frames of the assertions below from tracebacks, like unittest's
+# own.
+__unittest = True
+
+# Sequences whose differing parts have more than this product of lengths are
+# split at elements that occur once in each, like a patience diff, rather
+# than compared with difflib, which takes quadratic time.
+_QUADRATIC_LIMIT = 10_000
+# Parts without such elements are compared in windows of this length.
+_WINDOW_SIZE = 100
+
+# Characters shown either side of the first difference in one-line strings.
+_CHAR_CONTEXT = 30
+
+_Opcode = tuple[str, int, int, int, int]
+
+
+class DiffLimits(NamedTuple):
+    """
+    Limits for the structural diffs in assertion messages from the
+    --structural-diffs option.
+
+    Values are shown with reprs of up to ``max_repr`` characters, and changed
+    lines in strings with ``context`` unchanged lines around them. Once
+    ``max_lines`` lines have been written, or ``time_budget`` seconds spent,
+    the diff is cut short. ``None`` disables a limit.
+    """
+
+    max_lines: int | None = 50
+    max_repr: int | None = 120
+    context: int = 2
+    time_budget: float | None = 1.0
+
+
+class _Stop(Exception):
+    pass
+
+
+def structural_diff(first: Any, second: Any, limits: DiffLimits) -> list[str]:
+    """
+    List the differences between two values, recursing into dicts, lists,
+    and tuples, with one line per changed path, like ``~ ['users'][3]['name']:
+    'Al' != 'Alan'``. Lines starting ``-`` and ``+`` are removed and added
+    items, and multi-line strings get a unified diff of their changed lines.
+    """
+    differ = _Differ(limits)
+    try:
+        differ.diff("", first, second)
+    except _Stop as stop:
+        differ.lines.append(str(stop))
+    return differ.lines
+
+
+def diff_message(first: Any, second: Any, limits: DiffLimits) -> str:
+    short = _Differ(limits).short
+    return "\n".join(
+        [f"{short(first)} != {short(second)}", *structural_diff(first, second, limits)]
+    )
+
+
+@contextmanager
+def structural_diffs(limits: DiffLimits) -> Iterator[None]:
+    """
+    Replace the messages of TestCase's type-specific equality assertions,
+    which assertEqual() uses for dicts, lists, tuples, and strings, with
+    structural diffs. unittest's own messages come from difflib, which can
+    take seconds for large values, and are then truncated by maxDiff.
+    """
+    with ExitStack() as stack:
+        for name, kind in (
+            ("assertDictEqual", dict),
+            ("assertListEqual", list),
+            ("assertTupleEqual", tuple),
+            ("assertMultiLineEqual", str),
+        ):
+            assertion = _assertion(getattr(TestCase, name), kind, limits)
+            stack.enter_context(mock.patch.object(TestCase, name, assertion))
+        yield
+
+
+def _assertion(
+    original: Callable[..., None], kind: type, limits: DiffLimits
+) -> Callable[..., None]:
+    def assertion(self: TestCase, first: Any, second: Any, msg: Any = None) -> None:
+        if not isinstance(first, kind) or not isinstance(second, kind):
+            # unittest's checks and messages for the wrong types.
+            original(self, first, second, msg)
+            return
+        if first != second:
+            message = diff_message(first, second, limits)
+            self.fail(self._formatMessage(msg, message))
+
+    assertion.__name__ = original.__name__
+    assertion.__doc__ = original.__doc__
+    return assertion
+
+
+class _Differ:
+    def __init__(self, limits: DiffLimits) -> None:
+        self.limits = limits
+        self.lines: list[str] = []
+        self.deadline = None
+        if limits.time_budget is not None:
+            self.deadline = time.perf_counter() + limits.time_budget
+        self.repr: Callable[[Any], str] = repr
+        if limits.max_repr is not None:
+            # reprlib bounds the work, as well as the result, for containers.
+            bounded = reprlib.Repr()
+            bounded.maxlevel = 2
+            bounded.maxstring = bounded.maxother = bounded.maxlong = limits.max_repr
+            self.repr = bounded.repr
+
+    def short(self, value: Any) -> str:
+        text = self.repr(value)
+        max_repr = self.limits.max_repr
+        if max_repr is not None and len(text) > max_repr:
+            text = text[: max_repr - 1] + "…"
+        return text
+
+    def check(self) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise _Stop(f"… diff stopped after {self.limits.time_budget:g}s")
+
+    def emit(self, line: str) -> None:
+        max_lines = self.limits.max_lines
+        if max_lines is not None and len(self.lines) >= max_lines:
+            raise _Stop(f"… diff cut short at {max_lines} lines")
+        self.lines.append(line)
+
+    def diff(self, path: str, first: Any, second: Any) -> None:
+        self.check()
+        if isinstance(first, dict) and isinstance(second, dict):
+            self.diff_dicts(path, first, second)
+        elif (isinstance(first, list) and isinstance(second, list)) or (
+            isinstance(first, tuple) and isinstance(second, tuple)
+        ):
+            self.diff_sequences(path, first, second)
+        elif isinstance(first, str) and isinstance(second, str):
+            self.diff_strings(path, first, second)
+        else:
+            self.emit(f"~ {_label(path)}{self.short(first)} != {self.short(second)}")
+
+    def diff_dicts(
+        self, path: str, first: dict[Any, Any], second: dict[Any, Any]
+    ) -> None:
+        for key, value in first.items():
+            if key not in second:
+                self.emit(f"- {path}[{self.short(key)}]: {self.short(value)}")
+            elif value != second[key]:
+                self.diff(f"{path}[{self.short(key)}]", value, second[key])
+        for key, value in second.items():
+            if key not in first:
+                self.emit(f"+ {path}[{self.short(key)}]: {self.short(value)}")
+
+    def diff_sequences(
+        self, path: str, first: Sequence[Any], second: Sequence[Any]
+    ) -> None:
+        # Trimming common ends with == is faster than matching keys.
+        start = 0
+        first_end, second_end = len(first), len(second)
+        while start < min(first_end, second_end) and first[start] == second[start]:
+            start += 1
+        while (
+            first_end > start
+            and second_end > start
+            and first[first_end - 1] == second[second_end - 1]
+        ):
+            first_end -= 1
+            second_end -= 1
+        try:
+            codes = _opcodes(
+                self.keys(first, start, first_end),
+                self.keys(second, start, second_end),
+                self.check,
+            )
+        except _Stop:
+            # Say where the differences are, at least.
+            self.emit(f"~ {path}[{start}:{first_end}] != {path}[{start}:{second_end}]")
+            raise
+        for tag, i1, i2, j1, j2 in codes:
+            if tag == "equal":
+                continue
+            i1, i2, j1, j2 = i1 + start, i2 + start, j1 + start, j2 + start
+            if i2 - i1 == j2 - j1:
+                # Changed in place.
+                for i, j in zip(range(i1, i2), range(j1, j2)):
+                    if first[i] != second[j]:
+                        self.diff(f"{path}[{i}]", first[i], second[j])
+                continue
+            for i in range(i1, i2):
+                self.emit(f"- {path}[{i}]: {self.short(first[i])}")
+            for j in range(j1, j2):
+                self.emit(f"+ {path}[{j}]: {self.short(second[j])}")
+
+    def keys(self, items: Sequence[Any], start: int, end: int) -> list[Hashable]:
+        keys = []
+        for index in range(start, end):
+            if not index % 1024:
+                self.check()
+            keys.append(_key(items[index]))
+        return keys
+
+    def diff_strings(self, path: str, first: str, second: str) -> None:
+        first_lines = first.splitlines(keepends=True)
+        second_lines = second.splitlines(keepends=True)
+        if len(first_lines) <= 1 and len(second_lines) <= 1:
+            self.emit(f"~ {_label(path)}{self.diff_chars(first, second)}")
+            return
+        indent = ""
+        if path:
+            self.emit(f"~ {path}:")
+            indent = "  "
+        codes = _opcodes(first_lines, second_lines, self.check)
+        for group in _grouped(codes, self.limits.context):
+            i1, j1 = group[0][1], group[0][3]
+            i2, j2 = group[-1][2], group[-1][4]
+            self.emit(f"{indent}@@ -{i1 + 1},{i2 - i1} +{j1 + 1},{j2 - j1} @@")
+            for tag, i1, i2, j1, j2 in group:
+                removed = [self.line(line) for line in first_lines[i1:i2]]
+                added = [self.line(line) for line in second_lines[j1:j2]]
+                if tag == "replace" and _stripped(removed) == _stripped(added):
+                    # Differing only in whitespace at line ends.
+                    removed = [self.short(line) for line in first_lines[i1:i2]]
+                    added = [self.short(line) for line in second_lines[j1:j2]]
+                if tag == "equal":
+                    for line in removed:
+                        self.emit(f"{indent}  {line}")
+                    continue
+                for line in removed:
+                    self.emit(f"{indent}- {line}")
+                for line in added:
+                    self.emit(f"{indent}+ {line}")
+
+    def diff_chars(self, first: str, second: str) -> str:
+        max_repr = self.limits.max_repr
+        if max_repr is None or max(len(first), len(second)) <= max_repr:
+            return f"{first!r} != {second!r}"
+        index = len(os.path.commonprefix([first, second]))
+        start = max(0, index - _CHAR_CONTEXT)
+        end = index + _CHAR_CONTEXT
+
+        def excerpt(text: str) -> str:
+            before = "…" if start else ""
+            after = "…" if len(text) > end else ""
+            return f"{before}{text[start:end]!r}{after}"
+
+        return f"differs at character {index}: {excerpt(first)} != {excerpt(second)}"
+
+    def line(self, line: str) -> str:
+        line = line.rstrip("\r\n")
+        max_repr = self.limits.max_repr
+        if max_repr is not None and len(line) > max_repr:
+            line = line[: max_repr - 1] + "…"
+        return line
+
+
+def _stripped(lines: list[str]) -> list[str]:
+    return [line.rstrip() for line in lines]
+
+
+def _label(path: str) -> str:
+    return f"{path}: " if path else ""
+
+
+def _key(item: Any) -> Hashable:
+    # Unhashable items, such as dicts, are matched by their reprs.
+    if isinstance(item, (dict, list, set)):
+        return (_key, repr(item))
+    try:
+        hash(item)
+    except TypeError:
+        return (_key, repr(item))
+    return cast(Hashable, item)
+
+
+def _opcodes(
+    first: Sequence[Hashable],
+    second: Sequence[Hashable],
+    check: Callable[[], None],
+) -> list[_Opcode]:
+    """
+    Like difflib.SequenceMatcher.get_opcodes(), in close to linear time for
+    long sequences. After trimming common ends, differing parts that are too
+    long for difflib are split at elements occurring once in each, taking the
+    longest run of them in the same order. Parts without such elements are
+    compared with difflib in windows, each starting after the last match.
+    """
+    pairs: list[tuple[int, int]] = []
+    pending = [(0, len(first), 0, len(second))]
+    while pending:
+        check()
+        alo, ahi, blo, bhi = pending.pop()
+        while alo < ahi and blo < bhi and first[alo] == second[blo]:
+            pairs.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and first[ahi - 1] == second[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            pairs.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+        if (ahi - alo) * (bhi - blo) <= _QUADRATIC_LIMIT:
+            pairs.extend(_matching_pairs(first, alo, ahi, second, blo, bhi))
+            continue
+        anchors = _unique_anchors(first, alo, ahi, second, blo, bhi)
+        if not anchors:
+            # Compare windows small enough for difflib, each starting after
+            # the last pair found, which keeps most unchanged runs of
+            # repetitive elements.
+            while alo < ahi and blo < bhi:
+                check()
+                window = _matching_pairs(
+                    first,
+                    alo,
+                    min(alo + _WINDOW_SIZE, ahi),
+                    second,
+                    blo,
+                    min(blo + _WINDOW_SIZE, bhi),
+                )
+                if not window:
+                    alo += _WINDOW_SIZE
+                    blo += _WINDOW_SIZE
+                    continue
+                pairs.extend(window)
+                alo, blo = window[-1][0] + 1, window[-1][1] + 1
+            continue
+        for i, j in anchors:
+            pairs.append((i, j))
+            pending.append((alo, i, blo, j))
+            alo, blo = i + 1, j + 1
+        pending.append((alo, ahi, blo, bhi))
+    pairs.sort()
+
+    codes: list[_Opcode] = []
+    i = j = 0
+    for pair_i, pair_j in [*pairs, (len(first), len(second))]:
+        if i < pair_i and j < pair_j:
+            codes.append(("replace", i, pair_i, j, pair_j))
+        elif i < pair_i:
+            codes.append(("delete", i, pair_i, j, j))
+        elif j < pair_j:
+            codes.append(("insert", i, i, j, pair_j))
+        if pair_i == len(first):
+            break
+        if codes and codes[-1][0] == "equal":
+            _, start_i, _, start_j, _ = codes[-1]
+            codes[-1] = ("equal", start_i, pair_i + 1, start_j, pair_j + 1)
+        else:
+            codes.append(("equal", pair_i, pair_i + 1, pair_j, pair_j + 1))
+        i, j = pair_i + 1, pair_j + 1
+    return codes
+
+
+def _matching_pairs(
+    first: Sequence[Hashable],
+    alo: int,
+    ahi: int,
+    second: Sequence[Hashable],
+    blo: int,
+    bhi: int,
+) -> list[tuple[int, int]]:
+    matcher = difflib.SequenceMatcher(
+        None, first[alo:ahi], second[blo:bhi], autojunk=False
+    )
+    return [
+        (alo + i + k, blo + j + k)
+        for i, j, size in matcher.get_matching_blocks()
+        for k in range(size)
+    ]
+
+
+def _unique_anchors(
+    first: Sequence[Hashable],
+    alo: int,
+    ahi: int,
+    second: Sequence[Hashable],
+    blo: int,
+    bhi: int,
+) -> list[tuple[int, int]]:
+    # For each element: its count and index in first, then in second.
+    seen: dict[Hashable, list[int]] = {}
+    for i in range(alo, ahi):
+        entry = seen.setdefault(first[i], [0, i, 0, 0])
+        entry[0] += 1
+    for j in range(blo, bhi):
+        found = seen.get(second[j])
+        if found is not None:
+            found[2] += 1
+            found[3] = j
+    # In order of first, as dicts keep the order of insertion.
+    candidates = [
+        (entry[1], entry[3])
+        for entry in seen.values()
+        if entry[0] == 1 and entry[2] == 1
+    ]
+    # The longest increasing run of indexes in second, by patience sorting.
+    tails: list[int] = []
+    tail_indexes: list[int] = []
+    previous = [-1] * len(candidates)
+    for n, (_, j) in enumerate(candidates):
+        k = bisect_left(tail_indexes, j)
+        if k:
+            previous[n] = tails[k - 1]
+        if k == len(tails):
+            tails.append(n)
+            tail_indexes.append(j)
+        else:
+            tails[k] = n
+            tail_indexes[k] = j
+    anchors = []
+    n = tails[-1] if tails else -1
+    while n >= 0:
+        anchors.append(candidates[n])
+        n = previous[n]
+    anchors.reverse()
+    return anchors
+
+
+def _grouped(codes: list[_Opcode], context: int) -> Iterator[list[_Opcode]]:
+    # Like difflib.SequenceMatcher.get_grouped_opcodes().
+    if not codes:
+        return
+    codes = list(codes)
+    tag, i1, i2, j1, j2 = codes[0]
+    if tag == "equal":
+        codes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    tag, i1, i2, j1, j2 = codes[-1]
+    if tag == "equal":
+        codes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+    group: list[_Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
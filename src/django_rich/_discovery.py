@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import sys
+import unittest
+from collections.abc import Iterable
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, NamedTuple
+from unittest.loader import VALID_MODULE_NAME
+
+from django.test.utils import iter_test_cases  # type: ignore [attr-defined]
+
+from django_rich._cache import cache_path, read_json, write_json
+
+
+class CachedTest(NamedTuple):
+    test_id: str
+    tags: frozenset[str]
+
+
+class DiscoveryStats(NamedTuple):
+    label: str
+    # Test modules imported, and those skipped thanks to the index.
+    imported: int
+    skipped: int
+    tests: int
+    duration: float
+
+
+class DiscoveryIndex:
+    """
+    The tests found in each test module by previous runs, saved between runs.
+
+    Entries are keyed by the module's file path, and store the modification
+    time and size of the module and of the files defining its test classes
+    and their base classes, so an entry is ignored once any of them changes.
+    """
+
+    version = 1
+
+    def __init__(self, path: Path, entries: dict[str, dict[str, Any]]) -> None:
+        self.path = path
+        self.entries = entries
+        self.changed = False
+        # File stamps, read at most once per run.
+        self._stamps: dict[str, list[int] | None] = {}
+
+    @classmethod
+    def load(cls, cache_dir: str | os.PathLike[str]) -> DiscoveryIndex:
+        path = cache_path(cache_dir, "discovery.json")
+        data = read_json(path)
+        entries = {}
+        if isinstance(data, dict) and data.get("version") == cls.version:
+            entries = data["modules"]
+        return cls(path, entries)
+
+    def save(self) -> None:
+        for full_path in list(self.entries):
+            if self._stamp(full_path) is None:
+                # The module was deleted.
+                del self.entries[full_path]
+                self.changed = True
+        if self.changed:
+            write_json(self.path, {"version": self.version, "modules": self.entries})
+            self.changed = False
+
+    def _stamp(self, filename: str) -> list[int] | None:
+        try:
+            return self._stamps[filename]
+        except KeyError:
+            pass
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            stamp = None
+        else:
+            stamp = [stat.st_mtime_ns, stat.st_size]
+        self._stamps[filename] = stamp
+        return stamp
+
+    def get(self, full_path: str) -> list[CachedTest] | None:
+        """
+        The tests recorded for a module file, or None if there are none or
+        its files have changed since.
+        """
+        entry = self.entries.get(full_path)
+        if entry is None:
+            return None
+        for filename, stamp in entry["files"].items():
+            if self._stamp(filename) != stamp:
+                return None
+        return [
+            CachedTest(test_id, frozenset(tags)) for test_id, tags in entry["tests"]
+        ]
+
+    def record(self, full_path: str, tests: Iterable[unittest.TestCase]) -> None:
+        filenames = {full_path}
+        cached_tests = []
+        for test in tests:
+            for klass in type(test).__mro__:
+                module = sys.modules.get(klass.__module__)
+                filename = getattr(module, "__file__", None)
+                if filename is not None:
+                    filenames.add(filename)
+            cached_tests.append([test.id(), sorted(get_test_tags(test))])
+        files = {}
+        for filename in sorted(filenames):
+            stamp = self._stamp(filename)
+            if stamp is None:
+                # Can't tell when the file changes, so don't index the module.
+                self.entries.pop(full_path, None)
+                return
+            files[filename] = stamp
+        self.entries[full_path] = {"files": files, "tests": cached_tests}
+        self.changed = True
+
+
+def get_test_tags(test: unittest.TestCase) -> set[str]:
+    """
+    The tags of a test and its test method, as Django's --tag option sees them.
+    """
+    tags = set(getattr(test, "tags", []))
+    method = getattr(test, getattr(test, "_testMethodName", ""), None)
+    tags.update(getattr(method, "tags", []))
+    return tags
+
+
+class IndexedTestLoader(unittest.TestLoader):
+    """
+    A test loader that skips importing test modules during discovery when the
+    discovery index shows none of their tests match the test name patterns
+    (-k) and tags (--tag and --exclude-tag).
+
+    Without patterns or tags, every module is still imported, since all of
+    their tests run.
+    """
+
+    def __init__(
+        self,
+        index: DiscoveryIndex,
+        tags: Iterable[str] = (),
+        exclude_tags: Iterable[str] = (),
+    ) -> None:
+        super().__init__()
+        self.index = index
+        self.tags = set(tags)
+        self.exclude_tags = set(exclude_tags)
+        self.imported = 0
+        self.skipped = 0
+
+    def reset_counts(self) -> None:
+        self.imported = 0
+        self.skipped = 0
+
+    def _is_selected(self, test_id: str, tags: frozenset[str]) -> bool:
+        patterns = self.testNamePatterns
+        if patterns and not any(fnmatchcase(test_id, p) for p in patterns):
+            return False
+        if self.tags and tags.isdisjoint(self.tags):
+            return False
+        return tags.isdisjoint(self.exclude_tags)
+
+    def _find_test_path(self, full_path: str, pattern: str) -> tuple[Any, bool]:
+        basename = os.path.basename(full_path)
+        if (
+            not os.path.isfile(full_path)
+            or not VALID_MODULE_NAME.match(basename)
+            or not self._match_path(basename, full_path, pattern)
+        ):
+            return super()._find_test_path(full_path, pattern)  # type: ignore [misc, no-any-return]
+
+        cached = self.index.get(full_path)
+        if cached is not None and not any(
+            self._is_selected(test_id, tags) for test_id, tags in cached
+        ):
+            self.skipped += 1
+            return None, False
+
+        # Load all tests, to index them, then apply the patterns.
+        patterns = self.testNamePatterns
+        self.testNamePatterns = None
+        try:
+            tests, should_recurse = super()._find_test_path(full_path, pattern)  # type: ignore [misc]
+        finally:
+            self.testNamePatterns = patterns
+        self.imported += 1
+        if tests is None:
+            return tests, should_recurse
+        all_tests = list(iter_test_cases(tests))
+        if any(isinstance(t, unittest.loader._FailedTest) for t in all_tests):  # type: ignore [attr-defined]
+            # Import errors aren't indexed, so the module is retried next time.
+            self.index.entries.pop(full_path, None)
+            return tests, should_recurse
+        self.index.record(full_path, all_tests)
+        if patterns:
+            tests = self.suiteClass(
+                [
+                    test
+                    for test in all_tests
+                    if any(fnmatchcase(test.id(), p) for p in patterns)
+                ]
+            )
+        return tests, should_recurse
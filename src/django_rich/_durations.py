@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import heapq
+import json
+from collections.abc import Iterable, Mapping
+from operator import itemgetter
+from typing import Any, NamedTuple, TypeVar
+
+_T = TypeVar("_T")
+
+
+def slowest(items: Iterable[tuple[_T, float]], count: int) -> list[tuple[_T, float]]:
+    """
+    Return the ``count`` items with the longest durations, longest first, or
+    all of them when ``count`` is 0. A bounded selection avoids sorting every
+    item when only a few are shown.
+    """
+    if count > 0:
+        return heapq.nlargest(count, items, key=itemgetter(1))
+    return sorted(items, key=itemgetter(1), reverse=True)
+
+
+class DurationTotal(NamedTuple):
+    duration: float
+    fixtures: float
+    tests: int
+
+
+def aggregate(
+    test_durations: Mapping[str, float],
+    fixture_durations: Mapping[str, float],
+) -> tuple[dict[str, DurationTotal], dict[str, DurationTotal]]:
+    """
+    Total durations by test case class and by module. Class totals include
+    class fixtures, such as setUpClass() and setUpTestData().
+    """
+    class_totals: dict[str, list[float]] = {}
+    for test_id, elapsed in test_durations.items():
+        class_label = test_id.rpartition(".")[0]
+        total = class_totals.get(class_label)
+        if total is None:
+            class_totals[class_label] = [elapsed, 0.0, 1]
+        else:
+            total[0] += elapsed
+            total[2] += 1
+    for class_label, elapsed in fixture_durations.items():
+        total = class_totals.setdefault(class_label, [0.0, 0.0, 0])
+        total[0] += elapsed
+        total[1] += elapsed
+
+    classes = {}
+    module_totals: dict[str, list[float]] = {}
+    for class_label, (duration, fixtures, tests) in class_totals.items():
+        classes[class_label] = DurationTotal(duration, fixtures, int(tests))
+        module_label = class_label.rpartition(".")[0]
+        total = module_totals.setdefault(module_label, [0.0, 0.0, 0])
+        total[0] += duration
+        total[1] += fixtures
+        total[2] += tests
+    modules = {
+        label: DurationTotal(duration, fixtures, int(tests))
+        for label, (duration, fixtures, tests) in module_totals.items()
+    }
+    return classes, modules
+
+
+def write_durations_json(
+    path: str,
+    test_durations: Mapping[str, float],
+    fixture_durations: Mapping[str, float],
+) -> None:
+    """
+    Write all durations, in seconds, to a JSON file.
+    """
+    classes, modules = aggregate(test_durations, fixture_durations)
+    data: dict[str, Any] = {
+        "tests": dict(test_durations),
+        "classes": {label: total._asdict() for label, total in classes.items()},
+        "modules": {label: total._asdict() for label, total in modules.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from unittest import TestCase
+from unittest.util import strclass
+
+from django_rich._cache import cache_path, read_json, update_json
+
+# IDs of errors in class and module fixtures, like
+# "setUpClass (app.tests.BookTests)".
+_FIXTURE_ERROR_RE = re.compile(r"^\w+ \((?P<label>[\w.]+)\)$")
+
+
+class FailedTests:
+    """
+    IDs of the tests that failed in previous runs, saved between runs.
+
+    Tests stay recorded until they pass, so running a subset of tests keeps
+    the failures of the others. Errors in class or module fixtures, such as
+    setUpClass(), are recorded by class or module label, matching all of its
+    tests.
+    """
+
+    version = 1
+
+    def __init__(self, path: Path, failed: set[str]) -> None:
+        self.path = path
+        self.failed = failed
+
+    @classmethod
+    def load(cls, cache_dir: str | os.PathLike[str]) -> FailedTests:
+        path = cache_path(cache_dir, "failed.json")
+        data = read_json(path)
+        failed = set()
+        if isinstance(data, dict) and data.get("version") == cls.version:
+            failed = set(data["failed"])
+        return cls(path, failed)
+
+    def save(self) -> None:
+        update_json(
+            self.path,
+            {"version": self.version, "failed": sorted(self.failed)},
+            empty=not self.failed,
+        )
+
+    def matches(self, test: TestCase) -> bool:
+        if not self.failed:
+            return False
+        test_id = test.id()
+        if test_id in self.failed:
+            return True
+        class_label = strclass(type(test))
+        return (
+            class_label in self.failed or class_label.rpartition(".")[0] in self.failed
+        )
+
+    def update(self, ran: Iterable[str], failed: Iterable[str]) -> None:
+        """
+        Forget tests that ran, along with errors in the fixtures of their
+        classes and modules, then record those that failed.
+        """
+        ran_labels = set()
+        for test_id in ran:
+            ran_labels.add(test_id)
+            class_label = test_id.rpartition(".")[0]
+            ran_labels.add(class_label)
+            ran_labels.add(class_label.rpartition(".")[0])
+        self.failed -= ran_labels
+        for test_id in failed:
+            match = _FIXTURE_ERROR_RE.match(test_id)
+            self.failed.add(match["label"] if match else test_id)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from unittest import TestCase
+
+from rich.traceback import Trace
+
+# Innermost frames of each exception that must match.
+FINGERPRINT_FRAMES = 3
+
+# Object reprs often contain memory addresses, which differ between tests.
+_ADDRESS_RE = re.compile(r"0x[0-9a-fA-F]+")
+
+
+def error_fingerprint(
+    trace: Trace, output: str = "", frames: int = FINGERPRINT_FRAMES
+) -> str:
+    """
+    Identify an error by the type and message of each exception in its chain,
+    the location of their innermost frames, and any captured output, so the
+    same error raised in different tests has the same fingerprint.
+    """
+    parts = [output]
+    for stack in trace.stacks:
+        parts.append(stack.exc_type)
+        parts.append(_ADDRESS_RE.sub("0x", stack.exc_value))
+        parts.extend(
+            f"{frame.filename}:{frame.lineno}:{frame.name}"
+            for frame in stack.frames[-frames:]
+        )
+    return hashlib.blake2b(
+        "\0".join(parts).encode(errors="surrogatepass"), digest_size=8
+    ).hexdigest()
+
+
+def subtest_fingerprint(subtest: TestCase, exc_type: type[BaseException]) -> str:
+    """
+    Identify the failures of a test's subtests that share a message and
+    parameter names, and raise the same type of exception, whatever the
+    parameter values, so they group together.
+    """
+    message = subtest._message  # type: ignore [attr-defined]
+    parts = [
+        subtest.test_case.id(),  # type: ignore [attr-defined]
+        message if isinstance(message, str) else "",
+        *sorted(subtest.params),  # type: ignore [attr-defined]
+        f"{exc_type.__module__}.{exc_type.__qualname__}",
+    ]
+    return hashlib.blake2b(
+        "\0".join(parts).encode(errors="surrogatepass"), digest_size=8
+    ).hexdigest()
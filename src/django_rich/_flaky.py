@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from unittest import TestCase, TestResult
+
+from django_rich._cache import cache_path, read_json, update_json
+from django_rich._watchdog import Watchdog
+
+
+class FlakyHistory:
+    """
+    Flake rates of tests that have been flaky, saved between runs.
+
+    A test is flaky in a run when it fails, then passes when rerun. Tests get
+    an entry the first time they are flaky, stored as ``[rate, runs]``, and
+    the rate is then updated on each run as if over the last ``window`` runs.
+    """
+
+    version = 1
+    window = 20
+
+    def __init__(self, path: Path, entries: dict[str, list[float]]) -> None:
+        self.path = path
+        self.entries = entries
+
+    @classmethod
+    def load(cls, cache_dir: str | os.PathLike[str]) -> FlakyHistory:
+        path = cache_path(cache_dir, "flaky.json")
+        data = read_json(path)
+        entries = {}
+        if isinstance(data, dict) and data.get("version") == cls.version:
+            entries = data["flaky"]
+        return cls(path, entries)
+
+    def save(self) -> None:
+        update_json(
+            self.path,
+            {"version": self.version, "flaky": self.entries},
+            empty=not self.entries,
+        )
+
+    def get(self, test_id: str) -> tuple[float, int] | None:
+        entry = self.entries.get(test_id)
+        if entry is None:
+            return None
+        return entry[0], int(entry[1])
+
+    def update(self, ran: Iterable[str], flaky: Iterable[str]) -> None:
+        flaky = set(flaky)
+        entries = self.entries
+        for test_id in flaky:
+            entries.setdefault(test_id, [0.0, 0])
+        for test_id in {*ran, *flaky}:
+            entry = entries.get(test_id)
+            if entry is None:
+                continue
+            rate, runs = entry
+            runs = min(int(runs) + 1, self.window)
+            rate += ((test_id in flaky) - rate) / runs
+            entries[test_id] = [round(rate, 6), runs]
+
+
+class RerunResult(TestResult):
+    """
+    A quiet result for rerunning failed tests, recording those that pass.
+    Tests are watched by the ``watchdog`` of the run, if any.
+    """
+
+    def __init__(self, watchdog: Watchdog | None = None) -> None:
+        super().__init__()
+        self.watchdog = watchdog
+        self.passed: set[str] = set()
+
+    def startTest(self, test: TestCase) -> None:
+        super().startTest(test)
+        if self.watchdog is not None:
+            self.watchdog.watch(test)
+
+    def stopTest(self, test: TestCase) -> None:
+        if self.watchdog is not None:
+            self.watchdog.unwatch()
+        super().stopTest(test)
+
+    def addSuccess(self, test: TestCase) -> None:
+        super().addSuccess(test)
+        self.passed.add(test.id())
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import heapq
+import os
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import NamedTuple
+
+from django_rich._cache import cache_path, read_json, write_json
+
+
+class Slowdown(NamedTuple):
+    test_id: str
+    elapsed: float
+    average: float
+
+
+class DurationHistory:
+    """
+    Rolling average durations of tests, saved between runs.
+
+    Each entry is stored as ``[average, runs]``. The average is updated as if
+    over the last ``window`` runs.
+    """
+
+    version = 1
+    window = 10
+
+    def __init__(self, path: Path, entries: dict[str, list[float]]) -> None:
+        self.path = path
+        self.entries = entries
+
+    @classmethod
+    def load(cls, cache_dir: str | os.PathLike[str]) -> DurationHistory:
+        path = cache_path(cache_dir, "durations.json")
+        data = read_json(path)
+        entries = {}
+        if isinstance(data, dict) and data.get("version") == cls.version:
+            entries = data["durations"]
+        return cls(path, entries)
+
+    def save(self) -> None:
+        write_json(self.path, {"version": self.version, "durations": self.entries})
+
+    def get(self, test_id: str) -> float | None:
+        entry = self.entries.get(test_id)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def default(self) -> float:
+        """
+        The estimate for tests without history: the mean known average.
+        """
+        if not self.entries:
+            return 0.0
+        return sum(entry[0] for entry in self.entries.values()) / len(self.entries)
+
+    def estimate(self, test_ids: Iterable[str], default: float | None = None) -> float:
+        if default is None:
+            default = self.default()
+        total = 0.0
+        for test_id in test_ids:
+            entry = self.entries.get(test_id)
+            total += default if entry is None else entry[0]
+        return total
+
+    def update(self, durations: Mapping[str, float]) -> None:
+        entries = self.entries
+        for test_id, elapsed in durations.items():
+            entry = entries.get(test_id)
+            if entry is None:
+                entries[test_id] = [round(elapsed, 6), 1]
+            else:
+                average, runs = entry
+                runs = min(int(runs) + 1, self.window)
+                average += (elapsed - average) / runs
+                entries[test_id] = [round(average, 6), runs]
+
+    def slowdowns(
+        self,
+        durations: Mapping[str, float],
+        *,
+        factor: float,
+        min_increase: float,
+        min_runs: int,
+        limit: int,
+    ) -> tuple[list[Slowdown], int]:
+        """
+        Find tests that took over ``factor`` times their average, and at least
+        ``min_increase`` seconds longer. Return up to ``limit`` of them, the
+        largest increases first, and the total count.
+        """
+        found = []
+        for test_id, elapsed in durations.items():
+            entry = self.entries.get(test_id)
+            if entry is None or entry[1] < min_runs:
+                continue
+            average = entry[0]
+            if elapsed > average * factor and elapsed - average >= min_increase:
+                found.append(Slowdown(test_id, elapsed, average))
+        top = heapq.nlargest(limit, found, key=lambda s: s.elapsed - s.average)
+        return top, len(found)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from types import CodeType, FrameType, TracebackType
+from typing import Any, NamedTuple
+
+from django_rich._cache import cache_path, read_json, write_json
+from django_rich._watch import is_project_file
+
+# sys.monitoring tool IDs that Python leaves free for other tools, after the
+# debugger, coverage, and profiler IDs.
+_TOOL_IDS = (3, 4)
+
+
+class ImpactIndex:
+    """
+    The project source files that each test case class ran, saved between
+    runs, for selecting the tests affected by changed files.
+
+    Files are paths relative to the working directory, with forward slashes,
+    like git prints them. They are stored once, and referred to by index.
+    """
+
+    version = 1
+
+    def __init__(self, path: Path, classes: dict[str, set[str]]) -> None:
+        self.path = path
+        self.classes = classes
+
+    @classmethod
+    def load(cls, cache_dir: str | os.PathLike[str]) -> ImpactIndex:
+        path = cache_path(cache_dir, "impact.json")
+        data = read_json(path)
+        classes = {}
+        if isinstance(data, dict) and data.get("version") == cls.version:
+            files = data["files"]
+            classes = {
+                label: {files[i] for i in indexes}
+                for label, indexes in data["classes"].items()
+            }
+        return cls(path, classes)
+
+    def save(self) -> None:
+        files = sorted(set().union(*self.classes.values()))
+        indexes = {filename: i for i, filename in enumerate(files)}
+        write_json(
+            self.path,
+            {
+                "version": self.version,
+                "files": files,
+                "classes": {
+                    label: sorted(indexes[filename] for filename in class_files)
+                    for label, class_files in sorted(self.classes.items())
+                },
+            },
+        )
+
+    def update(self, classes: dict[str, set[str]]) -> None:
+        """
+        Replace the files of the given test case classes.
+        """
+        self.classes.update(classes)
+
+    def files(self) -> set[str]:
+        return set().union(*self.classes.values())
+
+    def affected(self, changed: set[str]) -> set[str]:
+        """
+        The labels of the test case classes that ran any of the changed files.
+        """
+        return {
+            label
+            for label, class_files in self.classes.items()
+            if not changed.isdisjoint(class_files)
+        }
+
+
+class ImpactSelection(NamedTuple):
+    changed_files: int
+    selected_classes: int
+    selected_tests: int
+    skipped_classes: int
+    skipped_tests: int
+    # Selected because they're missing from the impact index.
+    unrecorded_classes: int
+
+
+class ImpactRecorder:
+    """
+    Record the project source files that run during each test case class,
+    from switch() to the next, while in use as a context manager.
+
+    On Python 3.12+, this uses sys.monitoring, with each function reported
+    once per class. Older versions use a profile function, called for every
+    function call, which slows tests down more.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        # Test case class labels to the files that ran.
+        self.classes: dict[str, set[str]] = {}
+        self._files: set[str] | None = None
+        # Source files to their paths relative to root, or None when they
+        # aren't project files.
+        self._relative: dict[str, str | None] = {}
+        self._tool_id: int | None = None
+        # Python 3.12+.
+        self._monitoring: Any = getattr(sys, "monitoring", None)
+
+    def __enter__(self) -> ImpactRecorder:
+        monitoring = self._monitoring
+        if monitoring is not None:
+            for tool_id in _TOOL_IDS:
+                if monitoring.get_tool(tool_id) is None:
+                    monitoring.use_tool_id(tool_id, "django-rich")
+                    monitoring.register_callback(
+                        tool_id, monitoring.events.PY_START, self._on_start
+                    )
+                    monitoring.set_events(tool_id, monitoring.events.PY_START)
+                    self._tool_id = tool_id
+                    return self
+        threading.setprofile(self._on_profile)
+        sys.setprofile(self._on_profile)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._tool_id is not None:
+            monitoring = self._monitoring
+            monitoring.set_events(self._tool_id, 0)
+            monitoring.register_callback(
+                self._tool_id, monitoring.events.PY_START, None
+            )
+            monitoring.free_tool_id(self._tool_id)
+            self._tool_id = None
+        else:
+            sys.setprofile(None)
+            threading.setprofile(None)
+        self._files = None
+
+    def switch(self, label: str) -> None:
+        """
+        Record files for the test case class with the given label from now.
+        """
+        self._files = self.classes.setdefault(label, set())
+        if self._tool_id is not None:
+            # Report functions disabled for the previous class again.
+            self._monitoring.restart_events()
+
+    def _record(self, filename: str) -> None:
+        try:
+            relative = self._relative[filename]
+        except KeyError:
+            relative = self._relative[filename] = (
+                Path(filename).relative_to(self.root).as_posix()
+                if is_project_file(filename, self.root)
+                else None
+            )
+        if relative is not None and self._files is not None:
+            self._files.add(relative)
+
+    def _on_start(self, code: CodeType, offset: int) -> Any:
+        self._record(code.co_filename)
+        return self._monitoring.DISABLE
+
+    def _on_profile(self, frame: FrameType, event: str, arg: Any) -> None:
+        if event == "call":
+            self._record(frame.f_code.co_filename)
+
+
+def find_changed_files(since: str | None, paths: Iterable[str]) -> set[str]:
+    """
+    The given paths, and with ``since``, the files that git reports changed
+    since that commit, including uncommitted and untracked files. Paths are
+    relative to the working directory, with forward slashes.
+    """
+    changed = {Path(os.path.relpath(path)).as_posix() for path in paths}
+    if since is not None:
+        changed.update(
+            _git("diff", "--name-only", "--no-renames", "--relative", since, "--")
+        )
+        changed.update(_git("ls-files", "--others", "--exclude-standard"))
+    return changed
+
+
+def _git(*args: str) -> list[str]:
+    try:
+        process = subprocess.run(
+            ["git", "-c", "core.quotePath=false", *args],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError as exc:
+        raise ValueError(f"Could not run git: {exc}") from exc
+    if process.returncode != 0:
+        raise ValueError(f"git {args[0]} failed: {process.stderr.strip()}")
+    return process.stdout.splitlines()
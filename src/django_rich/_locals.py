@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from traceback import walk_tb
+from types import FrameType, FunctionType, TracebackType
+from typing import Any, NamedTuple
+
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.utils.functional import LazyObject, empty
+from rich.pretty import Node, traverse
+from rich.traceback import Trace
+
+
+class LocalsLimits(NamedTuple):
+    """
+    Limits for rendering local variables in failure tracebacks.
+
+    The first three are passed to Rich’s ``pretty.traverse()``. Once
+    ``time_budget`` seconds have been spent on a traceback, remaining locals
+    are listed without their values. ``None`` disables a limit.
+    """
+
+    max_length: int | None = 10
+    max_string: int | None = 80
+    max_depth: int | None = 5
+    time_budget: float | None = 1.0
+
+
+class DatabaseAccessBlocked(Exception):
+    pass
+
+
+def _block_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    raise DatabaseAccessBlocked("Database access blocked while rendering locals.")
+
+
+@contextmanager
+def block_database_access() -> Iterator[None]:
+    with ExitStack() as stack:
+        for alias in connections:
+            connection = connections[alias]
+            stack.enter_context(connection.execute_wrapper(_block_query))
+            # Avoid logging blocked queries, such as for --debug-sql.
+            stack.callback(
+                setattr,
+                connection,
+                "force_debug_cursor",
+                connection.force_debug_cursor,
+            )
+            connection.force_debug_cursor = False
+        yield
+
+
+class _Repr:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def __repr__(self) -> str:
+        return self.text
+
+
+def _truncate(text: str, max_string: int | None) -> str:
+    if max_string is not None and len(text) > max_string:
+        return f"{text[:max_string]}+{len(text) - max_string}"
+    return text
+
+
+def safe_value(value: Any, limits: LocalsLimits) -> Any:
+    """
+    Return a stand-in for values whose repr would hit the database, or
+    evaluate a lazy object.
+    """
+    # Check the real type, since isinstance() would evaluate a lazy object
+    # through its proxied __class__.
+    value_type = type(value)
+    if issubclass(value_type, LazyObject):
+        if value._wrapped is empty:
+            return _Repr(f"<{value_type.__name__}: unevaluated>")
+        value = value._wrapped
+        value_type = type(value)
+
+    if issubclass(value_type, QuerySet) and value._result_cache is None:
+        try:
+            sql = str(value.query)
+        except Exception as exc:
+            sql = f"<sql-error {exc!r}>"
+        return _Repr(
+            f"<{value_type.__name__} (unevaluated) "
+            + f"model={value.model._meta.label} "
+            + f"sql={_truncate(sql, limits.max_string)!r}>"
+        )
+
+    if issubclass(value_type, Model):
+        # __str__() may load deferred fields or related objects.
+        try:
+            return _Repr(repr(value))
+        except Exception:
+            return _Repr(f"<{value_type.__name__}: pk={value.pk!r}>")
+
+    return value
+
+
+def _frame_locals(
+    frame: FrameType, limits: LocalsLimits, deadline: float | None
+) -> dict[str, Node]:
+    result = {}
+    for key, value in frame.f_locals.items():
+        if key.startswith("__") or issubclass(type(value), (FunctionType, type)):
+            continue
+        if deadline is not None and time.perf_counter() > deadline:
+            result[key] = Node(value_repr="<not rendered, time budget exceeded>")
+            continue
+        try:
+            result[key] = traverse(
+                safe_value(value, limits),
+                max_length=limits.max_length,
+                max_string=limits.max_string,
+                max_depth=limits.max_depth,
+            )
+        except Exception as exc:
+            result[key] = Node(value_repr=f"<repr-error {str(exc)!r}>")
+    return result
+
+
+def _rich_frames(tb: TracebackType | None) -> list[FrameType]:
+    # Mirror the frame selection in rich.traceback.Traceback.extract().
+    frames = []
+    for frame, _ in walk_tb(tb):
+        if frame.f_locals.get("_rich_traceback_omit", False):
+            continue
+        frames.append(frame)
+        if frame.f_locals.get("_rich_traceback_guard", False):
+            frames.clear()
+    return frames
+
+
+def _fill(
+    trace: Trace,
+    exc_value: BaseException,
+    tb: TracebackType | None,
+    limits: LocalsLimits,
+    deadline: float | None,
+    follow_chain: bool,
+) -> None:
+    exc: BaseException | None = exc_value
+    for stack in trace.stacks:
+        if exc is None:  # pragma: no cover
+            break
+
+        frames = _rich_frames(tb)
+        if len(frames) == len(stack.frames):
+            for rich_frame, frame in zip(stack.frames, frames):
+                rich_frame.locals = _frame_locals(frame, limits, deadline)
+
+        if stack.is_group:
+            follow_chain = False
+            seen: set[BaseException] = set()
+            sub_excs = []
+            for sub_exc in exc.exceptions:  # type: ignore [attr-defined]
+                if sub_exc not in seen:
+                    seen.add(sub_exc)
+                    sub_excs.append(sub_exc)
+            for sub_trace, sub_exc in zip(stack.exceptions, sub_excs):
+                _fill(
+                    sub_trace,
+                    sub_exc,
+                    sub_exc.__traceback__,
+                    limits,
+                    deadline,
+                    follow_chain=False,
+                )
+
+        if not follow_chain:
+            break
+        cause = exc.__cause__
+        if cause is not None and cause is not exc:
+            exc = cause
+        elif exc.__context__ is not None and not exc.__suppress_context__:
+            exc = exc.__context__
+        else:
+            exc = None
+        tb = exc.__traceback__ if exc is not None else None
+
+
+def extract_locals(
+    trace: Trace,
+    exc_value: BaseException,
+    tb: TracebackType | None,
+    limits: LocalsLimits,
+) -> None:
+    """
+    Fill in the locals for each frame of a trace extracted without them.
+
+    Values are rendered with database access blocked, so reprs that would run
+    queries show an error instead.
+    """
+    deadline = None
+    if limits.time_budget is not None:
+        deadline = time.perf_counter() + limits.time_budget
+    with block_database_access():
+        _fill(trace, exc_value, tb, limits, deadline, follow_chain=True)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import sys
+import tracemalloc
+from typing import NamedTuple
+
+from django_rich._profile import get_import_paths, relative_filename
+
+MEMORY_MODES = ("rss", "tracemalloc")
+
+
+class MemoryUsage(NamedTuple):
+    # Bytes of resident memory, or of memory traced by tracemalloc.
+    size: int
+    # Memory blocks allocated by the interpreter, roughly the object count.
+    blocks: int
+
+    def growth_since(self, before: MemoryUsage) -> MemoryUsage:
+        return MemoryUsage(self.size - before.size, self.blocks - before.blocks)
+
+
+def current_rss() -> int:
+    """
+    The resident set size of this process, in bytes. Where /proc is not
+    available, fall back to the peak resident set size.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # pragma: no cover  # Windows
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, and kilobytes elsewhere.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def sample(mode: str) -> MemoryUsage:
+    """
+    Measure memory use, cheaply enough to do around every test. The "rss"
+    mode reads the resident set size, and the "tracemalloc" mode the memory
+    traced by tracemalloc, which must be tracing.
+    """
+    if mode == "tracemalloc":
+        size = tracemalloc.get_traced_memory()[0]
+    else:
+        size = current_rss()
+    return MemoryUsage(size, sys.getallocatedblocks())
+
+
+class AllocationSite(NamedTuple):
+    location: str
+    size: int
+    blocks: int
+
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def top_sites(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int
+) -> list[AllocationSite]:
+    """
+    The ``limit`` source lines whose allocations grew the most between
+    snapshots.
+    """
+    import_paths = get_import_paths()
+    sites = []
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        filename = relative_filename(frame.filename, import_paths)
+        sites.append(
+            AllocationSite(
+                f"{filename}:{frame.lineno}", stat.size_diff, stat.count_diff
+            )
+        )
+    return sites
+
+
+_SIZE_UNITS = ("KiB", "MiB", "GiB")
+
+
+def format_size(size: int) -> str:
+    """
+    Format a change in bytes with a sign and binary units.
+    """
+    sign = "-" if size < 0 else "+"
+    value = abs(size)
+    if value < 1024:
+        return f"{sign}{value} B"
+    scaled = float(value)
+    for unit in _SIZE_UNITS:
+        scaled /= 1024
+        if scaled < 1024 or unit == _SIZE_UNITS[-1]:
+            break
+    return f"{sign}{scaled:.1f} {unit}"
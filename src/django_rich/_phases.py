@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from typing import Any
+from unittest import mock
+
+from django.core import management
+from django.db import connections
+
+
+class Phase:
+    def __init__(self, name: str, duration: float = 0.0, count: int = 1) -> None:
+        self.name = name
+        self.duration = duration
+        # Times this phase ran, such as once per cloned database.
+        self.count = count
+        self.children: list[Phase] = []
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration": round(self.duration, 6),
+            "count": self.count,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+
+class PhaseTimer:
+    """
+    A replacement for Django's TimeKeeper, used by the --timing option, that
+    records phases as a tree. Phases timed while another is running become its
+    children, and consecutive phases with the same name and no children are
+    merged.
+    """
+
+    def __init__(self) -> None:
+        self.root = Phase("Total")
+        self._stack = [self.root]
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        # Django indents the names of nested phases, and prefixes others with
+        # "Total", which is redundant in a tree.
+        name = name.strip()
+        if name.startswith("Total "):
+            name = name.removeprefix("Total ").capitalize()
+        phase = Phase(name)
+        parent = self._stack[-1]
+        self._stack.append(phase)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase.duration = time.perf_counter() - start
+            self._stack.pop()
+            self._add_child(parent, phase)
+
+    def add(self, name: str, duration: float, count: int = 1) -> None:
+        """
+        Record a phase timed elsewhere, such as in a parallel worker, within
+        the phase currently running.
+        """
+        self._add_child(self._stack[-1], Phase(name, duration, count))
+
+    def _add_child(self, parent: Phase, phase: Phase) -> None:
+        previous = parent.children[-1] if parent.children else None
+        if (
+            previous is not None
+            and previous.name == phase.name
+            and not previous.children
+            and not phase.children
+        ):
+            previous.duration += phase.duration
+            previous.count += phase.count
+        else:
+            parent.children.append(phase)
+
+    def print_results(self) -> None:
+        # Called by DiscoverRunner.run_tests(). RichRunner prints the tree.
+        pass
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.root.as_dict(), f)
+
+
+@contextmanager
+def time_database_setup(timer: PhaseTimer) -> Iterator[None]:
+    """
+    Time the steps of creating test databases that Django doesn't time
+    itself: creating each database, the management commands run afterwards,
+    such as migrate, and serializing database contents.
+    """
+    original_call_command = management.call_command
+
+    def call_command(command_name: Any, *args: Any, **kwargs: Any) -> Any:
+        name = command_name if isinstance(command_name, str) else "command"
+        with timer.timed(f"{name} command"):
+            return original_call_command(command_name, *args, **kwargs)
+
+    with ExitStack() as stack:
+        # Database creation imports call_command when it runs.
+        stack.enter_context(mock.patch.object(management, "call_command", call_command))
+        for alias in connections:
+            creation = connections[alias].creation
+            for attr, name in (
+                ("_create_test_db", "Create database"),
+                ("serialize_db_to_string", f"Serializing '{alias}'"),
+            ):
+                wrapper = _timed(timer, name, getattr(creation, attr))
+                stack.enter_context(mock.patch.object(creation, attr, wrapper))
+        yield
+
+
+def _timed(
+    timer: PhaseTimer, name: str, func: Callable[..., Any]
+) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with timer.timed(name):
+            return func(*args, **kwargs)
+
+    return wrapper
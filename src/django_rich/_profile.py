@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import cProfile
+import heapq
+import os
+import pstats
+import sys
+import sysconfig
+from fnmatch import fnmatchcase
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from typing import Any, NamedTuple
+from unittest import TestCase
+from unittest.util import strclass
+
+from django.apps import apps
+
+# pstats function keys are (filename, line number, function name).
+_FunctionKey = tuple[str, int, str]
+
+
+class FunctionStats(NamedTuple):
+    function: str
+    app: str
+    calls: int
+    self_time: float
+    cumulative_time: float
+
+
+class AppStats(NamedTuple):
+    app: str
+    calls: int
+    self_time: float
+
+
+class Profiler:
+    """
+    Profile tests with cProfile, one profile per test case class, combining
+    them into overall statistics.
+
+    Tests are profiled when their ID matches ``pattern``, which is wrapped in
+    ``*`` when it has none, like the ``-k`` option. With ``dump_dir``, each
+    class's statistics are written there as a ``.pstats`` file.
+    """
+
+    def __init__(self, pattern: str | None = None, dump_dir: str | None = None):
+        if pattern is not None and "*" not in pattern:
+            pattern = f"*{pattern}*"
+        self.pattern = pattern
+        self.dump_dir = dump_dir
+        self.stats: pstats.Stats | None = None
+        self._profile: cProfile.Profile | None = None
+        self._class_label: str | None = None
+
+    def matches(self, test: TestCase) -> bool:
+        return self.pattern is None or fnmatchcase(test.id(), self.pattern)
+
+    def enable(self, test: TestCase) -> None:
+        class_label = strclass(type(test))
+        if class_label != self._class_label:
+            self._collect()
+            self._class_label = class_label
+            self._profile = cProfile.Profile()
+        assert self._profile is not None
+        self._profile.enable()
+
+    def disable(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+
+    def finish(self) -> pstats.Stats | None:
+        """
+        Collect the last class's profile and return the overall statistics,
+        or None if no tests were profiled.
+        """
+        self._collect()
+        return self.stats
+
+    def _collect(self) -> None:
+        profile = self._profile
+        if profile is None:
+            return
+        self._profile = None
+        stats = pstats.Stats(profile)
+        if self.dump_dir is not None:
+            assert self._class_label is not None
+            os.makedirs(self.dump_dir, exist_ok=True)
+            stats.dump_stats(Path(self.dump_dir) / f"{self._class_label}.pstats")
+        if self.stats is None:
+            self.stats = stats
+        else:
+            self.stats.add(stats)
+
+
+class AppResolver:
+    """
+    Map source files to the installed Django app containing them, or else the
+    installed package, "stdlib", or "builtins".
+    """
+
+    def __init__(self) -> None:
+        self._app_paths = sorted(
+            (
+                (os.path.join(config.path, ""), config.label)
+                for config in apps.get_app_configs()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._stdlib = os.path.join(sysconfig.get_paths()["stdlib"], "")
+        self._cache: dict[str, str] = {}
+
+    def __call__(self, filename: str) -> str:
+        try:
+            return self._cache[filename]
+        except KeyError:
+            app = self._cache[filename] = self._resolve(filename)
+            return app
+
+    def _resolve(self, filename: str) -> str:
+        if filename == "~":
+            return "builtins"
+        for path, label in self._app_paths:
+            if filename.startswith(path):
+                return label
+        for marker in ("site-packages", "dist-packages"):
+            _, found, rest = filename.partition(os.path.join(marker, ""))
+            if found:
+                return rest.split(os.sep, 1)[0].removesuffix(".py")
+        if filename.startswith((self._stdlib, "<frozen ")):
+            return "stdlib"
+        return "other"
+
+
+def get_import_paths() -> list[str]:
+    return sorted(
+        (os.path.join(os.path.abspath(path), "") for path in sys.path),
+        key=len,
+        reverse=True,
+    )
+
+
+def relative_filename(filename: str, import_paths: list[str]) -> str:
+    """
+    Show paths as importable, relative to the longest matching sys.path entry.
+    """
+    for path in import_paths:
+        if filename.startswith(path):
+            return filename[len(path) :]
+    return filename
+
+
+def _function_name(key: _FunctionKey, import_paths: list[str]) -> str:
+    filename, lineno, name = key
+    if filename == "~":
+        return name
+    return f"{relative_filename(filename, import_paths)}:{lineno}({name})"
+
+
+def summarize(
+    stats: pstats.Stats, limit: int
+) -> tuple[list[AppStats], list[FunctionStats], list[FunctionStats]]:
+    """
+    Total self time by app, and the ``limit`` functions with the most self
+    time and the most cumulative time.
+    """
+    resolve_app = AppResolver()
+    import_paths = get_import_paths()
+    raw: dict[_FunctionKey, Any] = stats.stats  # type: ignore [attr-defined]
+    app_totals: dict[str, list[float]] = {}
+    functions = []
+    for key, (_, calls, self_time, cumulative_time, _) in raw.items():
+        app = resolve_app(key[0])
+        total = app_totals.setdefault(app, [0, 0.0])
+        total[0] += calls
+        total[1] += self_time
+        functions.append((key, app, calls, self_time, cumulative_time))
+
+    app_stats = sorted(
+        (
+            AppStats(app, int(calls), self_time)
+            for app, (calls, self_time) in app_totals.items()
+        ),
+        key=attrgetter("self_time"),
+        reverse=True,
+    )
+    by_self, by_cumulative = (
+        [
+            FunctionStats(
+                _function_name(key, import_paths),
+                app,
+                calls,
+                self_time,
+                cumulative_time,
+            )
+            for key, app, calls, self_time, cumulative_time in heapq.nlargest(
+                limit, functions, key=itemgetter(index)
+            )
+        ]
+        for index in (3, 4)
+    )
+    return app_stats, by_self, by_cumulative
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from typing import Any, NamedTuple
+
+from django.db import connections
+
+
+class QueryStats(NamedTuple):
+    queries: int
+    time: float
+    # Queries whose SQL, ignoring parameters, already ran in the same test.
+    repeated: int
+    # Counts of each statement, only kept when asked for.
+    sql: dict[str, int] | None = None
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        if not self.sql:
+            return None
+        return max(self.sql.items(), key=lambda item: item[1])
+
+
+class QueryRecorder:
+    """
+    An execute_wrapper that counts queries, their total time, and repeated
+    statements. Only hashes of statements are kept, unless keep_sql is set.
+    """
+
+    __slots__ = ("count", "time", "repeated", "_seen", "_sql")
+
+    def __init__(self, keep_sql: bool = False) -> None:
+        self.count = 0
+        self.time = 0.0
+        self.repeated = 0
+        self._seen: set[int] = set()
+        self._sql: dict[str, int] | None = {} if keep_sql else None
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+            sql_hash = hash(sql)
+            if sql_hash in self._seen:
+                self.repeated += 1
+            else:
+                self._seen.add(sql_hash)
+            if self._sql is not None:
+                self._sql[sql] = self._sql.get(sql, 0) + 1
+
+    def install(self) -> ExitStack:
+        """
+        Install on all database connections, until the returned stack closes.
+        """
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+    def stats(self) -> QueryStats:
+        return QueryStats(self.count, self.time, self.repeated, self._sql)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import linecache
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+from xml.sax.saxutils import escape, quoteattr
+
+from rich.traceback import Trace
+
+from django_rich._spill import SpilledOutput
+
+
+class PlainTraceback(NamedTuple):
+    exc_type: str
+    message: str
+    text: str
+
+
+def plain_traceback(trace: Trace) -> PlainTraceback:
+    """
+    Format an extracted trace like Python's own tracebacks, without
+    rendering it with Rich.
+    """
+    lines = []
+    for index, stack in enumerate(reversed(trace.stacks)):
+        if stack.frames:
+            lines.append("Traceback (most recent call last):")
+        for frame in stack.frames:
+            lines.append(
+                f'  File "{frame.filename}", line {frame.lineno}, in {frame.name}'
+            )
+            source = linecache.getline(frame.filename, frame.lineno).strip()
+            if source:
+                lines.append(f"    {source}")
+        if stack.exc_value:
+            lines.append(f"{stack.exc_type}: {stack.exc_value}")
+        else:
+            lines.append(stack.exc_type)
+        lines.extend(stack.notes)
+        if index < len(trace.stacks) - 1:
+            if stack.is_cause:
+                lines.append(
+                    "\nThe above exception was the direct cause of the "
+                    + "following exception:\n"
+                )
+            else:
+                lines.append(
+                    "\nDuring handling of the above exception, another "
+                    + "exception occurred:\n"
+                )
+    final = trace.stacks[0]
+    return PlainTraceback(final.exc_type, final.exc_value, "\n".join(lines) + "\n")
+
+
+class Problem(NamedTuple):
+    # "failure" or "error".
+    kind: str
+    exc_type: str
+    message: str
+    traceback: str
+
+
+class ReportEntry(NamedTuple):
+    test_id: str
+    # "passed", "failed", "error", "skipped", "expected_failure", or
+    # "unexpected_success".
+    outcome: str
+    duration: float
+    problems: list[Problem]
+    skip_reason: str = ""
+    # Large output may have been spilled to a file, which is read when the
+    # report is written.
+    stdout: str | SpilledOutput = ""
+    stderr: str | SpilledOutput = ""
+    # For flaky tests, the rerun that passed.
+    reruns: int = 0
+
+
+class Reporter(ABC):
+    """
+    Write test reports to a file as they arrive, so memory use doesn't grow
+    with the number of tests.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.counts = dict.fromkeys(
+            (
+                "passed",
+                "failed",
+                "error",
+                "skipped",
+                "expected_failure",
+                "unexpected_success",
+            ),
+            0,
+        )
+        self.started_at = time.time()
+
+    def add(self, report: ReportEntry) -> None:
+        self.counts[report.outcome] += 1
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class JSONLinesReporter(Reporter):
+    """
+    Write a JSON object per test, then a summary object.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.file = open(path, "w", encoding="utf-8")  # noqa: SIM115  # closed in close()
+
+    def add(self, report: ReportEntry) -> None:
+        super().add(report)
+        data: dict[str, Any] = {
+            "type": "test",
+            "test": report.test_id,
+            "outcome": report.outcome,
+            "duration": round(report.duration, 6),
+            "problems": [problem._asdict() for problem in report.problems],
+        }
+        if report.skip_reason:
+            data["skip_reason"] = report.skip_reason
+        if report.reruns:
+            data["reruns"] = report.reruns
+        if report.stdout:
+            data["stdout"] = str(report.stdout)
+        if report.stderr:
+            data["stderr"] = str(report.stderr)
+        self.file.write(json.dumps(data) + "\n")
+
+    def close(self) -> None:
+        data = {
+            "type": "summary",
+            "tests": sum(self.counts.values()),
+            **self.counts,
+            "duration": round(time.time() - self.started_at, 6),
+        }
+        self.file.write(json.dumps(data) + "\n")
+        self.file.close()
+
+
+# XML 1.0 can't contain most control characters, even escaped.
+_INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _xml_text(text: str) -> str:
+    return escape(_INVALID_XML_RE.sub("\ufffd", text))
+
+
+def _xml_attr(text: str) -> str:
+    return quoteattr(_INVALID_XML_RE.sub("\ufffd", text))
+
+
+class JUnitXMLReporter(Reporter):
+    """
+    Write a JUnit XML file, with all tests in one <testsuite>.
+
+    The <testsuite> totals are only known at the end, so its start tag is
+    written with padding, which close() overwrites with the totals.
+    """
+
+    _totals_width = 160
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.file = open(path, "wb")  # noqa: SIM115  # closed in close()
+        self._write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._write(f'<testsuite name="django" timestamp="{timestamp}"')
+        self._totals_offset = self.file.tell()
+        self._write(" " * self._totals_width + ">\n")
+
+    def _write(self, text: str) -> None:
+        self.file.write(text.encode("utf-8"))
+
+    def add(self, report: ReportEntry) -> None:
+        super().add(report)
+        test_id = report.test_id
+        if " " in test_id:
+            # Errors outside tests, like "setUpClass (app.tests.BookTests)".
+            class_name, name = "", test_id
+        else:
+            class_name, _, name = test_id.rpartition(".")
+        parts = [
+            f"<testcase classname={_xml_attr(class_name)} name={_xml_attr(name)} "
+            + f'time="{report.duration:.6f}"'
+        ]
+        children = []
+        if report.reruns:
+            children.append(
+                "<properties>"
+                + f'<property name="reruns" value="{report.reruns}"/>'
+                + "</properties>"
+            )
+        for problem in report.problems:
+            children.append(
+                f"<{problem.kind} type={_xml_attr(problem.exc_type)} "
+                + f"message={_xml_attr(problem.message)}>"
+                + f"{_xml_text(problem.traceback)}</{problem.kind}>"
+            )
+        if report.outcome == "skipped":
+            children.append(f"<skipped message={_xml_attr(report.skip_reason)}/>")
+        elif report.outcome == "unexpected_success":
+            children.append(
+                '<failure type="UnexpectedSuccess" message="Unexpected success"/>'
+            )
+        if report.stdout:
+            children.append(f"<system-out>{_xml_text(str(report.stdout))}</system-out>")
+        if report.stderr:
+            children.append(f"<system-err>{_xml_text(str(report.stderr))}</system-err>")
+        if children:
+            parts.append(">\n" + "\n".join(children) + "\n</testcase>\n")
+        else:
+            parts.append("/>\n")
+        self._write("".join(parts))
+
+    def close(self) -> None:
+        self._write("</testsuite>\n</testsuites>\n")
+        counts = self.counts
+        totals = (
+            f' tests="{sum(counts.values())}"'
+            + f' failures="{counts["failed"] + counts["unexpected_success"]}"'
+            + f' errors="{counts["error"]}"'
+            + f' skipped="{counts["skipped"]}"'
+            + f' time="{time.time() - self.started_at:.3f}"'
+        )
+        self.file.seek(self._totals_offset)
+        self._write(totals.ljust(self._totals_width))
+        self.file.close()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import heapq
+from argparse import ArgumentTypeError
+from collections.abc import Sequence
+from typing import NamedTuple
+
+from django_rich._history import DurationHistory
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a shard given as ``INDEX/COUNT``, with INDEX counting from 1.
+    """
+    try:
+        index_str, count_str = value.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ArgumentTypeError(
+            f"Invalid shard {value!r}, expected INDEX/COUNT, like 1/4."
+        ) from None
+    if not 1 <= index <= count:
+        raise ArgumentTypeError(
+            f"Invalid shard {value!r}, INDEX must be between 1 and COUNT."
+        )
+    return index, count
+
+
+class ShardLoad(NamedTuple):
+    tests: int
+    expected: float
+
+
+def estimate_group(
+    history: DurationHistory, test_ids: Sequence[str], default: float
+) -> float:
+    """
+    Estimate the duration of a group of tests from the same class. Tests
+    without history are estimated from the average of the others in the
+    class, or ``default`` when none have history.
+    """
+    known = [d for d in map(history.get, test_ids) if d is not None]
+    unknown_estimate = sum(known) / len(known) if known else default
+    return sum(known) + unknown_estimate * (len(test_ids) - len(known))
+
+
+def assign_shards(
+    keys: Sequence[str], estimates: Sequence[float], count: int
+) -> list[int]:
+    """
+    Assign groups to ``count`` shards, balancing their estimated durations.
+    Groups are placed longest first on the least loaded shard. Ties are
+    broken by ``keys``, so every node computes the same assignment whatever
+    order the groups were discovered in.
+    """
+    loads = [(0.0, shard) for shard in range(count)]
+    assignments = [0] * len(estimates)
+    order = sorted(range(len(estimates)), key=lambda i: (-estimates[i], keys[i]))
+    for i in order:
+        load, shard = heapq.heappop(loads)
+        assignments[i] = shard
+        heapq.heappush(loads, (load + estimates[i], shard))
+    return assignments
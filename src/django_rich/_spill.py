@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import tempfile
+from collections.abc import Iterator
+
+# Characters kept in memory from each end of spilled output.
+EXCERPT_CHARS = 1000
+
+
+class SpilledOutput:
+    """
+    Captured output written to a temporary file, so errors and reports can
+    refer to it without holding it in memory. Excerpts from its start and end
+    are kept, in case the file is gone by the time it's read.
+    """
+
+    __slots__ = ("path", "size", "head", "tail")
+
+    def __init__(self, path: str, size: int, head: str, tail: str) -> None:
+        self.path = path
+        # In characters.
+        self.size = size
+        self.head = head
+        self.tail = tail
+
+    @classmethod
+    def write(
+        cls, directory: str, text: str, excerpt_chars: int = EXCERPT_CHARS
+    ) -> SpilledOutput:
+        fd, path = tempfile.mkstemp(suffix=".txt", dir=directory)
+        with open(fd, "w", encoding="utf-8", errors="surrogateescape") as f:
+            f.write(text)
+        if len(text) <= 2 * excerpt_chars:
+            head, tail = text, ""
+        else:
+            head, tail = text[:excerpt_chars], text[-excerpt_chars:]
+        return cls(path, len(text), head, tail)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SpilledOutput):
+            return NotImplemented
+        return self.path == other.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __getstate__(self) -> tuple[str, int, str, str]:
+        return (self.path, self.size, self.head, self.tail)
+
+    def __setstate__(self, state: tuple[str, int, str, str]) -> None:
+        self.path, self.size, self.head, self.tail = state
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __str__(self) -> str:
+        return "".join(self.chunks())
+
+    def excerpt(self) -> str:
+        if not self.tail:
+            return self.head
+        omitted = self.size - len(self.head) - len(self.tail)
+        return f"{self.head}\n… {omitted} more characters …\n{self.tail}"
+
+    def chunks(self, size: int = 65536) -> Iterator[str]:
+        """
+        Read the output back in chunks of ``size`` characters, or just the
+        excerpts if the file is gone.
+        """
+        try:
+            f = open(self.path, encoding="utf-8", errors="surrogateescape")  # noqa: SIM115
+        except OSError:
+            yield self.excerpt()
+            return
+        with f:
+            while chunk := f.read(size):
+                yield chunk
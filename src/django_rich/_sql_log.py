@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+# Each query logged by django.db.backends starts with its duration, like
+# "(0.001) SELECT ...; args=(1,); alias=default". Long statements may span
+# lines.
+_ENTRY_RE = re.compile(r"^\((\d+\.\d+)\) ", re.MULTILINE)
+
+
+class LoggedQuery(NamedTuple):
+    # The statement, with its parameters and alias, as logged.
+    sql: str
+    # Total duration, over all identical queries, or None for other text.
+    duration: float | None
+    runs: int = 1
+
+    def format(self) -> str:
+        if self.duration is None:
+            return self.sql
+        prefix = f"{self.runs}× " if self.runs > 1 else ""
+        return f"{prefix}({self.duration:.3f}) {self.sql}"
+
+
+class SQLLogSummary(NamedTuple):
+    queries: int
+    time: float
+    # Identical queries collapsed into one, in order of first execution.
+    unique: list[LoggedQuery]
+
+
+def summarize_sql_log(log: str) -> SQLLogSummary:
+    """
+    Parse the debug log of django.db.backends, counting queries and
+    collapsing identical ones. Text before the first query, such as from
+    another logger, is kept first, without a duration.
+    """
+    starts = list(_ENTRY_RE.finditer(log))
+    first = starts[0].start() if starts else len(log)
+    unique: dict[str, LoggedQuery] = {}
+    if log[:first].strip():
+        unique[""] = LoggedQuery(log[:first].rstrip("\n"), None)
+
+    total = 0.0
+    ends = [match.start() for match in starts[1:]] + [len(log)]
+    for match, end in zip(starts, ends):
+        sql = log[match.end() : end].rstrip("\n")
+        duration = float(match.group(1))
+        total += duration
+        query = unique.get(sql)
+        if query is None:
+            unique[sql] = LoggedQuery(sql, duration)
+        else:
+            assert query.duration is not None
+            unique[sql] = LoggedQuery(sql, query.duration + duration, query.runs + 1)
+    return SQLLogSummary(len(starts), total, list(unique.values()))
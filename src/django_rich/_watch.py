@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import ast
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from types import ModuleType
+
+
+class ImportGraph:
+    """
+    Which project modules import which, from the import statements in their
+    source files, for finding the modules affected by a changed file.
+
+    Project modules are those with a source file under ``root``, apart from
+    installed packages.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        # Module names to source files.
+        self.files: dict[str, str] = {}
+        # Module names to the names of the modules they import, which may not
+        # be project modules.
+        self.imports: dict[str, set[str]] = {}
+
+    def add_modules(self, modules: Iterable[ModuleType]) -> None:
+        """
+        Add modules, or parse their imports again, after they're reloaded.
+        """
+        for module in modules:
+            filename = getattr(module, "__file__", None)
+            if filename is None or not is_project_file(filename, self.root):
+                continue
+            self.files[module.__name__] = filename
+            self.imports[module.__name__] = _parse_imports(module.__name__, filename)
+
+    def module_for_file(self, filename: str) -> str | None:
+        for name, module_file in self.files.items():
+            if module_file == filename:
+                return name
+        return None
+
+    def dependents(self, names: Iterable[str]) -> set[str]:
+        """
+        The given modules and the modules that import them, directly or not.
+        """
+        importers: dict[str, set[str]] = {}
+        for name, imported in self.imports.items():
+            for dependency in imported:
+                importers.setdefault(dependency, set()).add(name)
+        found = set(names)
+        pending = list(found)
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in found:
+                    found.add(importer)
+                    pending.append(importer)
+        return found
+
+    def dependencies(self, names: Iterable[str]) -> set[str]:
+        """
+        The given modules and the project modules they import, directly or not.
+        """
+        found = set(names)
+        pending = list(found)
+        while pending:
+            for dependency in self.imports.get(pending.pop(), ()):
+                if dependency in self.files and dependency not in found:
+                    found.add(dependency)
+                    pending.append(dependency)
+        return found
+
+    def reload_order(self, names: Iterable[str]) -> list[str]:
+        """
+        The given modules ordered with the modules they import first, so each
+        is reloaded after its dependencies. Import cycles are broken
+        arbitrarily.
+        """
+        names = set(names)
+        ordered: list[str] = []
+        visited: set[str] = set()
+
+        def visit(name: str) -> None:
+            visited.add(name)
+            for dependency in sorted(self.imports.get(name, ())):
+                if dependency in names and dependency not in visited:
+                    visit(dependency)
+            ordered.append(name)
+
+        for name in sorted(names):
+            if name not in visited:
+                visit(name)
+        return ordered
+
+
+def is_project_file(filename: str, root: Path) -> bool:
+    """
+    Whether a module's source file is under ``root``, apart from installed
+    packages.
+    """
+    if not filename.endswith(".py"):
+        return False
+    path = Path(filename)
+    return path.is_relative_to(root) and not (
+        {"site-packages", "dist-packages"} & set(path.parts)
+    )
+
+
+def _parse_imports(name: str, filename: str) -> set[str]:
+    """
+    The names of the modules imported by a module, including the parent
+    packages that each import runs, and names imported from modules that may
+    be submodules.
+    """
+    try:
+        tree = ast.parse(Path(filename).read_bytes(), filename)
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    if os.path.basename(filename) == "__init__.py":
+        package = name
+    else:
+        package = name.rpartition(".")[0]
+    found: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                found.update(_with_parents(alias.name))
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".") if package else []
+                if node.level - 1 > len(parts):
+                    continue
+                prefix = ".".join(parts[: len(parts) - node.level + 1])
+                base = ".".join(part for part in (prefix, base) if part)
+            if not base:
+                continue
+            found.update(_with_parents(base))
+            found.update(f"{base}.{alias.name}" for alias in node.names)
+    found.discard(name)
+    return found
+
+
+def _with_parents(name: str) -> list[str]:
+    parts = name.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def _stamp(filename: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """
+    Poll files for changes to their modification times or sizes.
+    """
+
+    def __init__(self, filenames: Iterable[str] = ()) -> None:
+        self.stamps: dict[str, tuple[int, int] | None] = {}
+        self.add(filenames)
+
+    def add(self, filenames: Iterable[str]) -> None:
+        for filename in filenames:
+            if filename not in self.stamps:
+                self.stamps[filename] = _stamp(filename)
+
+    def changed(self) -> list[str]:
+        """
+        The files changed since the last call, or since they were added.
+        """
+        found = []
+        for filename, stamp in self.stamps.items():
+            current = _stamp(filename)
+            if current != stamp:
+                self.stamps[filename] = current
+                found.append(filename)
+        return found
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import signal
+import sys
+import threading
+import time
+import traceback
+import unittest
+from collections.abc import Callable
+from types import FrameType
+from typing import Any
+
+from rich.traceback import Frame, Stack, Trace
+
+# Sending a signal to the main thread is how a timed out test is stopped.
+CAN_INTERRUPT = hasattr(signal, "pthread_kill") and hasattr(signal, "SIGALRM")
+
+# The methods of TestCase that run a part of a test, where an exception fails
+# the test, rather than stopping the run.
+_TEST_PART_CODES = {
+    getattr(klass, name).__code__
+    for klass in (unittest.TestCase, unittest.IsolatedAsyncioTestCase)
+    for name in ("_callSetUp", "_callTestMethod", "_callTearDown", "_callCleanup")
+}
+
+
+class TestTimeoutError(Exception):
+    """
+    Raised in a test that runs for longer than the --timeout.
+    """
+
+
+class Watchdog:
+    """
+    A background thread watching the running test, which calls
+    ``on_warning`` once it has run for ``warning`` seconds, and
+    ``on_timeout`` once it has run for ``timeout`` seconds. After a timeout,
+    TestTimeoutError is raised in the test by sending SIGALRM to the main
+    thread, where the platform supports it.
+
+    The thread only wakes at deadlines, so watching each test is cheap.
+    """
+
+    # Seconds between signals while a timed out test is between its parts,
+    # such as setUp() and the test method, where raising would stop the run.
+    retry_interval = 0.1
+
+    def __init__(
+        self,
+        timeout: float | None,
+        warning: float | None,
+        on_timeout: Callable[[unittest.TestCase, float], None],
+        on_warning: Callable[[unittest.TestCase, float], None],
+    ) -> None:
+        self.timeout = timeout
+        self.warning = warning
+        self.on_timeout = on_timeout
+        self.on_warning = on_warning
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        # Whether the thread waits without a deadline, so must be woken.
+        self._idle = False
+        self._interrupting = False
+        self._previous_handler: Any = None
+        self._test: unittest.TestCase | None = None
+        self._started_at = 0.0
+        self._warned = False
+        self._timed_out = False
+        self._raised = False
+        self._next_interrupt = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if (
+            self.timeout is not None
+            and CAN_INTERRUPT
+            and threading.current_thread() is threading.main_thread()
+        ):
+            self._previous_handler = signal.signal(signal.SIGALRM, self._interrupt)
+            self._interrupting = True
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="django-rich-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._test = None
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+        if self._interrupting:
+            signal.signal(signal.SIGALRM, self._previous_handler)
+            self._interrupting = False
+
+    def watch(self, test: unittest.TestCase) -> None:
+        with self._condition:
+            self._test = test
+            self._started_at = time.perf_counter()
+            self._warned = False
+            self._timed_out = False
+            self._raised = False
+            if self._idle:
+                # Otherwise the thread finds this test at its next deadline,
+                # which is earlier than this test's.
+                self._condition.notify()
+
+    def unwatch(self) -> None:
+        # Cleared first, so a signal arriving meanwhile doesn't raise. The
+        # thread finds no test when it next wakes.
+        self._test = None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                fired = self._wait()
+            if fired is None:
+                return
+            test, elapsed, timed_out = fired
+            if not timed_out:
+                self.on_warning(test, elapsed)
+                continue
+            self.on_timeout(test, elapsed)
+            with self._condition:
+                if self._test is test:
+                    self._send_interrupt()
+
+    def _wait(self) -> tuple[unittest.TestCase, float, bool] | None:
+        """
+        Wait for the next deadline of the watched test, with the condition
+        held, and return the test, its elapsed time, and whether it timed out.
+        Return None once stopped.
+        """
+        while not self._stopping:
+            test = self._test
+            now = time.perf_counter()
+            self._idle = False
+            if test is None:
+                self._idle = True
+                self._condition.wait()
+            elif (
+                not self._warned
+                and self.warning is not None
+                and (self.timeout is None or self.warning < self.timeout)
+            ):
+                elapsed = now - self._started_at
+                if elapsed < self.warning:
+                    self._condition.wait(self.warning - elapsed)
+                else:
+                    self._warned = True
+                    return test, elapsed, False
+            elif not self._timed_out and self.timeout is not None:
+                elapsed = now - self._started_at
+                if elapsed < self.timeout:
+                    self._condition.wait(self.timeout - elapsed)
+                else:
+                    self._timed_out = True
+                    return test, elapsed, True
+            elif self._interrupting and not self._raised:
+                if now < self._next_interrupt:
+                    self._condition.wait(self._next_interrupt - now)
+                else:
+                    self._send_interrupt()
+            else:
+                self._idle = True
+                self._condition.wait()
+        return None
+
+    def _send_interrupt(self) -> None:
+        if not self._interrupting:
+            return
+        self._next_interrupt = time.perf_counter() + self.retry_interval
+        main_thread = threading.main_thread().ident
+        assert main_thread is not None
+        signal.pthread_kill(main_thread, signal.SIGALRM)
+
+    def _interrupt(self, signum: int, frame: FrameType | None) -> None:
+        if self._test is None or not self._timed_out or self._raised:
+            return
+        if not _in_test_part(frame):
+            # Retried by the thread, until the test reaches its next part.
+            return
+        self._raised = True
+        raise TestTimeoutError(f"Test timed out after {self.timeout:g}s.")
+
+
+def _in_test_part(frame: FrameType | None) -> bool:
+    while frame is not None:
+        if frame.f_code in _TEST_PART_CODES:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def thread_stacks(skip: int | None = None, limit: int | None = None) -> list[Trace]:
+    """
+    The current stacks of all threads, apart from the one with the ``skip``
+    ident, for rendering as Rich tracebacks, with the main thread first.
+    Stacks are cut to their innermost ``limit`` frames.
+    """
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    main_thread = threading.main_thread().ident
+    frames_by_thread = sorted(
+        sys._current_frames().items(), key=lambda item: item[0] != main_thread
+    )
+    traces = []
+    for ident, frame in frames_by_thread:
+        if ident == skip:
+            continue
+        frames = [
+            Frame(
+                filename=summary.filename, lineno=summary.lineno or 0, name=summary.name
+            )
+            for summary in traceback.extract_stack(frame, limit=limit)
+        ]
+        name = names.get(ident, "unknown")
+        traces.append(
+            Trace(
+                stacks=[Stack(exc_type=f"Thread {name!r}", exc_value="", frames=frames)]
+            )
+        )
+    return traces
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+from typing import TextIO
+
+# Queued after the last write, to stop the writer thread.
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    A text stream that hands writes to a background thread, so tests don't
+    block when the underlying stream is slow, such as a pipe to a CI log
+    collector. The thread joins all pending writes into one, and flushes after
+    each. Writes are kept in order, and block once ``max_pending`` are queued.
+
+    Writes go straight to the underlying stream until start() is called, and
+    again after close().
+    """
+
+    def __init__(self, stream: TextIO, max_pending: int = 1000) -> None:
+        self.stream = stream
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._error: OSError | None = None
+
+    @property
+    def encoding(self) -> str:
+        return self.stream.encoding
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+    def fileno(self) -> int:
+        return self.stream.fileno()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="django-rich-writer", daemon=True
+        )
+        self._thread.start()
+        # Daemon threads are killed at exit, so write out what is left first.
+        atexit.register(self.close)
+
+    def write(self, text: str) -> int:
+        if self._thread is None:
+            return self.stream.write(text)
+        if text:
+            self._queue.put(text)
+        return len(text)
+
+    def flush(self) -> None:
+        # The thread flushes after every write, so this doesn't need to wait.
+        if self._thread is None:
+            self.stream.flush()
+
+    def drain(self) -> None:
+        """
+        Wait until all queued text is written and flushed.
+        """
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """
+        Write out all queued text, and stop the thread.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        thread.join()
+        self._thread = None
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise error
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in items)
+            text = "".join(item for item in items if isinstance(item, str))
+            # After an error, keep consuming, so writers never block, but
+            # drop the text.
+            if text and self._error is None:
+                try:
+                    self.stream.write(text)
+                    self.stream.flush()
+                except OSError as exc:
+                    self._error = exc
+            for _ in items:
+                self._queue.task_done()
@@ -1,26 +1,109 @@
 from __future__ import annotations
 
+import importlib
 import io
+import os
+import pickle
+import shutil
 import sys
+import tempfile
+import threading
+import time
+import traceback
+import tracemalloc
 import unittest
+from argparse import ArgumentParser
 from collections.abc import Iterable
+from contextlib import ExitStack
+from functools import partial
+from itertools import chain
+from pathlib import Path
 from types import TracebackType
-from typing import Any, TypeAlias, cast
+from typing import Any, NamedTuple, TypeAlias, TypeVar, cast
 from unittest.case import (  # type: ignore [attr-defined]
     TestCase,
     _SubTest,
 )
 from unittest.result import STDERR_LINE, STDOUT_LINE, TestResult, failfast
 from unittest.runner import _WritelnDecorator
+from unittest.util import strclass
 
+from django.apps import apps
+from django.conf import settings
 from django.test import testcases
-from django.test.runner import DebugSQLTextTestResult, DiscoverRunner, PDBDebugResult
+from django.test.runner import (  # type: ignore [attr-defined]
+    DebugSQLTextTestResult,
+    DiscoverRunner,
+    ParallelTestSuite,
+    PDBDebugResult,
+    RemoteTestResult,
+    RemoteTestRunner,
+    _init_worker,
+    partition_suite_by_case,
+)
+from django.test.utils import iter_test_cases  # type: ignore [attr-defined]
 from rich.color import Color
-from rich.console import Console
+from rich.console import Console, Group, RenderableType
+from rich.progress import (
+    BarColumn,
+    Progress,
+    ProgressColumn,
+    Task,
+    TaskID,
+    TextColumn,
+    TimeRemainingColumn,
+)
 from rich.rule import Rule
 from rich.style import Style
+from rich.syntax import Syntax
 from rich.table import Table
-from rich.traceback import Traceback
+from rich.text import Text
+from rich.traceback import Trace, Traceback
+from rich.tree import Tree
+
+from django_rich._diff import DiffLimits as DiffLimits
+from django_rich._diff import structural_diffs
+from django_rich._discovery import DiscoveryIndex, DiscoveryStats, IndexedTestLoader
+from django_rich._durations import aggregate, slowest, write_durations_json
+from django_rich._failed import FailedTests
+from django_rich._fingerprint import error_fingerprint, subtest_fingerprint
+from django_rich._flaky import FlakyHistory, RerunResult
+from django_rich._history import DurationHistory
+from django_rich._impact import (
+    ImpactIndex,
+    ImpactRecorder,
+    ImpactSelection,
+    find_changed_files,
+)
+from django_rich._locals import LocalsLimits as LocalsLimits
+from django_rich._locals import extract_locals
+from django_rich._memory import (
+    MEMORY_MODES,
+    AllocationSite,
+    MemoryUsage,
+    format_size,
+    sample,
+    take_snapshot,
+    top_sites,
+)
+from django_rich._phases import Phase, PhaseTimer, time_database_setup
+from django_rich._profile import Profiler, summarize
+from django_rich._queries import QueryRecorder, QueryStats
+from django_rich._report import (
+    JSONLinesReporter,
+    JUnitXMLReporter,
+    PlainTraceback,
+    Problem,
+    ReportEntry,
+    Reporter,
+    plain_traceback,
+)
+from django_rich._shard import ShardLoad, assign_shards, estimate_group, parse_shard
+from django_rich._spill import SpilledOutput
+from django_rich._sql_log import summarize_sql_log
+from django_rich._watch import FileWatcher, ImportGraph, is_project_file
+from django_rich._watchdog import Watchdog, thread_stacks
+from django_rich._writer import BackgroundWriter
 
 _SysExcInfoType: TypeAlias = (
     tuple[type[BaseException], BaseException, TracebackType] | tuple[None, None, None]
@@ -30,11 +113,409 @@ DJANGO_GREEN = Style(color=Color.from_rgb(32, 170, 118))
 DJANGO_GREEN_RULE = Rule(style=DJANGO_GREEN)
 RED = Style(color="red")
 YELLOW = Style(color="yellow")
+DOT_STYLES = {
+    ".": DJANGO_GREEN,
+    "E": RED,
+    "F": RED,
+    "s": YELLOW,
+    "x": YELLOW,
+    "u": RED,
+}
+
+
+class TracebackSnapshot:
+    """
+    A compact, picklable record of a test error, rendered only when needed.
+
+    Frames are extracted up-front, with locals already reduced to bounded
+    reprs, so the snapshot holds no references to live frames or objects.
+    """
+
+    __slots__ = ("trace", "output")
+
+    def __init__(self, trace: Trace | None, output: str | SpilledOutput) -> None:
+        self.trace = trace
+        self.output = output
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TracebackSnapshot):
+            return NotImplemented
+        return self.trace == other.trace and self.output == other.output
+
+    def __getstate__(self) -> tuple[Trace | None, str | SpilledOutput]:
+        return (self.trace, self.output)
+
+    def __setstate__(self, state: tuple[Trace | None, str | SpilledOutput]) -> None:
+        self.trace, self.output = state
+
+    def __str__(self) -> str:
+        file = io.StringIO()
+        self.print(Console(file=file, color_system=None, width=100))
+        return file.getvalue()
+
+    def print(self, console: Console) -> None:
+        if self.trace is not None:
+            console.print(
+                Traceback(
+                    self.trace,
+                    suppress=[unittest, testcases],
+                    width=console.width,
+                )
+            )
+        if isinstance(self.output, SpilledOutput):
+            # Streamed from its file, rather than read whole.
+            for chunk in self.output.chunks():
+                console.out(chunk, end="", highlight=False)
+        elif self.output:
+            console.out(self.output, end="", highlight=False)
+
+
+class RenderedExcInfo(NamedTuple):
+    """
+    Stand-in for a sys.exc_info() tuple, holding an error that was already
+    rendered in a parallel test worker.
+    """
+
+    exc_type: type[BaseException]
+    rendered: str | TracebackSnapshot
+    traceback: None = None
+    fingerprint: str | None = None
+    plain: PlainTraceback | None = None
+
+
+_ExcInfoType: TypeAlias = _SysExcInfoType | RenderedExcInfo
+_ErrorEntry = TypeVar("_ErrorEntry", bound=tuple[Any, ...])
+
+
+class RichTracebackMixin(TestResult):
+    """
+    Render errors with Rich tracebacks, for any TestResult subclass.
+    """
+
+    console: Console
+    # Fingerprints of errors, by id() of their rendered form, which the error
+    # lists keep alive.
+    error_fingerprints: dict[int, str]
+    # Plain text tracebacks for reports, by id() of the rendered errors, when
+    # keep_plain_tracebacks is set.
+    plain_tracebacks: dict[int, PlainTraceback]
+    keep_plain_tracebacks = False
+
+    # Store TracebackSnapshot objects, rather than rendered strings, in the
+    # error lists, and only render them when printing.
+    deferred_tracebacks = False
+    locals_limits = LocalsLimits()
+
+    # With a directory, captured output over spill_size characters is written
+    # to a file in it, and errors keep a SpilledOutput, deferring the render.
+    spill_dir: str | None = None
+    spill_size = 0
+
+    # Render only the first failure of each pattern of subtests in full, as
+    # identified by subtest_fingerprint(), and the others as their exception.
+    aggregate_subtests = False
+    # Fingerprints of the subtest patterns already rendered in full.
+    rendered_subtest_patterns: set[str]
+
+    def _exc_info_to_string(
+        self, err: _ExcInfoType, test: TestCase
+    ) -> str | TracebackSnapshot:
+        """Converts a sys.exc_info()-style tuple of values into a string."""
+        if isinstance(err, RenderedExcInfo):
+            # Already rendered by a parallel test worker.
+            if err.fingerprint is not None:
+                self.error_fingerprints[id(err.rendered)] = err.fingerprint
+            if err.plain is not None:
+                self.plain_tracebacks[id(err.rendered)] = err.plain
+            return err.rendered
+
+        trace = self._extract_trace(err, test)
+        output = self._captured_output()
+        rendered = self._render_trace(trace, output)
+        if trace is not None:  # pragma: no branch
+            if isinstance(output, SpilledOutput):
+                output = output.excerpt()
+            self.error_fingerprints[id(rendered)] = error_fingerprint(trace, output)
+            if self.keep_plain_tracebacks:
+                # From the same extracted trace, rather than a second render.
+                self.plain_tracebacks[id(rendered)] = plain_traceback(trace)
+        return rendered
+
+    def _subtest_exc_info(
+        self, err: _SysExcInfoType, test: TestCase, subtest: TestCase
+    ) -> RenderedExcInfo:
+        exc_type, value, _ = err
+        assert exc_type is not None
+        fingerprint = subtest_fingerprint(subtest, exc_type)
+        if fingerprint not in self.rendered_subtest_patterns:
+            self.rendered_subtest_patterns.add(fingerprint)
+            rendered = self._exc_info_to_string(err, test)
+            self.error_fingerprints.pop(id(rendered), None)
+            return RenderedExcInfo(
+                exc_type,
+                rendered,
+                fingerprint=fingerprint,
+                plain=self.plain_tracebacks.pop(id(rendered), None),
+            )
+        message = "".join(traceback.format_exception_only(exc_type, value))
+        plain = None
+        if self.keep_plain_tracebacks:
+            plain = PlainTraceback(exc_type.__name__, str(value), message)
+        return RenderedExcInfo(exc_type, message, fingerprint=fingerprint, plain=plain)
+
+    def _render_trace(
+        self, trace: Trace | None, output: str | SpilledOutput
+    ) -> str | TracebackSnapshot:
+        if self.deferred_tracebacks or isinstance(output, SpilledOutput):
+            return TracebackSnapshot(trace, output)
+
+        msgLines = []
+        if trace is not None:  # pragma: no branch  # can't work when this isn't true
+            with self.console.capture() as capture:
+                self.console.print(
+                    Traceback(
+                        trace,
+                        suppress=[unittest, testcases],
+                        width=self.console.width,
+                    )
+                )
+            msgLines.append(capture.get())
+        msgLines.append(output)
+        return "".join(msgLines)
+
+    def _extract_trace(self, err: _SysExcInfoType, test: TestCase) -> Trace | None:
+        exctype, value, tb = err
+
+        if hasattr(self, "_clean_tracebacks"):
+            # Post-bpo-24959 - merged to Python 3.11, backported to 3.9 and 3.10
+            tb = self._clean_tracebacks(exctype, value, tb, test)
+        else:  # pragma: no cover
+            # needed on old 3.9 and 3.10 patch versions, but not testing those
+            # Skip test runner traceback levels
+            while tb and self._is_relevant_tb_level(tb):  # type: ignore [attr-defined]
+                tb = tb.tb_next
+
+        if exctype is None:  # pragma: no cover  # can't work when this is true
+            return None
+        assert value is not None
+        trace = Traceback.extract(exctype, value, tb, show_locals=False)
+        extract_locals(trace, value, tb, self.locals_limits)
+        return trace
+
+    def _captured_output(self) -> str | SpilledOutput:
+        if not self.buffer:
+            return ""
+
+        msgLines = []
+        assert isinstance(sys.stdout, io.StringIO)
+        output = sys.stdout.getvalue()
+        assert isinstance(sys.stderr, io.StringIO)
+        error = sys.stderr.getvalue()
+        if output:
+            if not output.endswith("\n"):
+                output += "\n"
+            msgLines.append(STDOUT_LINE % output)
+        if error:
+            if not error.endswith("\n"):
+                error += "\n"
+            msgLines.append(STDERR_LINE % error)
+        return self._spill("".join(msgLines))
+
+    def _spill(self, text: str) -> str | SpilledOutput:
+        if self.spill_dir is None or len(text) <= self.spill_size:
+            return text
+        return SpilledOutput.write(self.spill_dir, text)
+
+
+class RichQueryStatsMixin(TestResult):
+    """
+    Record database query statistics for each test, when record_queries is
+    set, and report them through addQueryStats().
+    """
+
+    record_queries = False
+    # Keep the text of each SQL statement, not only counters.
+    keep_query_sql = False
+
+    _query_recorder: QueryRecorder | None = None
+    _query_recording: ExitStack | None = None
+
+    def startTest(self, test: TestCase) -> None:
+        super().startTest(test)
+        if self.record_queries:
+            self._query_recorder = QueryRecorder(keep_sql=self.keep_query_sql)
+            self._query_recording = self._query_recorder.install()
+
+    def stopTest(self, test: TestCase) -> None:
+        if self._query_recording is not None:
+            assert self._query_recorder is not None
+            self._query_recording.close()
+            self._query_recording = None
+            if self._query_recorder.count:
+                self.addQueryStats(test, self._query_recorder.stats())
+            self._query_recorder = None
+        super().stopTest(test)
+
+    def addQueryStats(self, test: TestCase, stats: QueryStats) -> None:
+        pass
+
+
+class RichMemoryMixin(TestResult):
+    """
+    Measure the net memory growth of each test, when memory_mode is set, and
+    report it through addMemoryUsage().
+    """
+
+    # "rss" or "tracemalloc", see django_rich._memory.sample().
+    memory_mode: str | None = None
+
+    _memory_before: MemoryUsage | None = None
+
+    def startTest(self, test: TestCase) -> None:
+        super().startTest(test)
+        if self.memory_mode is not None:
+            if self.memory_mode == "tracemalloc" and not tracemalloc.is_tracing():
+                # Parallel test workers start tracing with their first test.
+                tracemalloc.start()
+            self._memory_before = sample(self.memory_mode)
+
+    def stopTest(self, test: TestCase) -> None:
+        if self._memory_before is not None:
+            assert self.memory_mode is not None
+            usage = sample(self.memory_mode).growth_since(self._memory_before)
+            self._memory_before = None
+            self.addMemoryUsage(test, usage)
+        super().stopTest(test)
+
+    def addMemoryUsage(self, test: TestCase, usage: MemoryUsage) -> None:
+        pass
 
 
-class RichTextTestResult(unittest.TextTestResult):
+class RichWatchdogMixin(TestResult):
+    """
+    Watch each test from a background thread, when timeout or slow_warning is
+    set, printing a warning to live_console once a test is slow, and the
+    stacks of all threads once it times out, before it's stopped with a
+    TestTimeoutError.
+    """
+
+    # Seconds.
+    timeout: float | None = None
+    slow_warning: float | None = None
+    # Innermost frames of each thread's stack shown for a timeout.
+    timeout_frames = 8
+    # Where warnings are printed as they happen.
+    live_console: Console
+
+    _watchdog: Watchdog | None = None
+
+    def start_watchdog(self) -> None:
+        if self.timeout is None and self.slow_warning is None:
+            return
+        self.stop_watchdog()
+        self._watchdog = Watchdog(
+            self.timeout,
+            self.slow_warning,
+            on_timeout=self._print_timeout,
+            on_warning=self._print_slow_warning,
+        )
+        self._watchdog.start()
+
+    def stop_watchdog(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+
+    def startTest(self, test: TestCase) -> None:
+        super().startTest(test)
+        if self._watchdog is not None:
+            self._watchdog.watch(test)
+
+    def stopTest(self, test: TestCase) -> None:
+        if self._watchdog is not None:
+            self._watchdog.unwatch()
+        super().stopTest(test)
+
+    def _print_live(self, *renderables: RenderableType) -> None:
+        # In one write, so output from parallel workers doesn't interleave,
+        # and on a new line, after any progress characters or test description.
+        self.live_console.print(Group(Text(), *renderables))
+
+    def _print_slow_warning(self, test: TestCase, elapsed: float) -> None:
+        self._print_live(
+            Text(f"SLOW: {test.id()} has been running for {elapsed:.1f}s.", YELLOW)
+        )
+
+    def _print_timeout(self, test: TestCase, elapsed: float) -> None:
+        width = self.live_console.width
+        self._print_live(
+            DJANGO_GREEN_RULE,
+            Text(f"TIMEOUT: {test.id()} has been running for {elapsed:.1f}s"),
+            DJANGO_GREEN_RULE,
+            *(
+                Traceback(trace, suppress=[unittest, testcases], width=width)
+                for trace in thread_stacks(threading.get_ident(), self.timeout_frames)
+            ),
+            Text(),
+        )
+
+
+class _TestsPerSecondColumn(ProgressColumn):
+    def render(self, task: Task) -> Text:
+        speed = task.speed
+        if speed is None:
+            return Text("")
+        return Text(f"{speed:.1f} tests/s", style="progress.data.speed")
+
+
+class _TimeRemainingColumn(TimeRemainingColumn):
+    # Prefer an estimate from the duration history, when available, over one
+    # from the current speed.
+    def render(self, task: Task) -> Text:
+        eta = task.fields.get("eta")
+        if eta is None:
+            return super().render(task)
+        minutes, seconds = divmod(int(eta), 60)
+        hours, minutes = divmod(minutes, 60)
+        return Text(
+            f"{hours:d}:{minutes:02d}:{seconds:02d}", style="progress.remaining"
+        )
+
+
+class RichTextTestResult(
+    RichTracebackMixin,
+    RichQueryStatsMixin,
+    RichMemoryMixin,
+    RichWatchdogMixin,
+    unittest.TextTestResult,
+):
     # Declaring attribute as _newline was added in Python 3.11.
     _newline: bool
+    # Entries may hold a TracebackSnapshot when deferred_tracebacks is set.
+    errors: list[tuple[TestCase, str | TracebackSnapshot]]  # type: ignore [assignment]
+    failures: list[tuple[TestCase, str | TracebackSnapshot]]  # type: ignore [assignment]
+    expectedFailures: list[tuple[TestCase, str | TracebackSnapshot]]  # type: ignore [assignment]
+
+    # In dots mode, progress characters are buffered and written once this
+    # many are pending, or this many seconds have passed since the last write.
+    dots_flush_size = 100
+    dots_flush_interval = 0.1
+
+    # Progress bar mode replaces dots and status lines with a live display,
+    # printing errors above it as they happen.
+    progress_refresh_per_second = 4.0
+
+    # Print errors with the same fingerprint once, followed by a table of the
+    # other tests that raised them.
+    collapse_duplicate_errors = False
+
+    # Limits for structural diffs in assertion messages, which are enabled
+    # while tests run when set, including in parallel workers.
+    diff_limits: DiffLimits | None = None
+
+    # With reruns, reports of failed tests are held until the reruns finish,
+    # then written by release_reports() with their final outcomes.
+    hold_failed_reports = False
 
     def __init__(
         self,
@@ -47,74 +528,505 @@ class RichTextTestResult(unittest.TextTestResult):
             # Get underlying stream from _WritelnDecorator, normally sys.stderr:
             file=self.stream.stream,
         )
+        self.live_console = self.console
         with self.console.capture() as cap:
             self.console.print(Rule(characters="═", style=DJANGO_GREEN))
         self.separator1 = cap.get().rstrip("\n")
         with self.console.capture() as cap:
             self.console.print(Rule(characters="━", style=DJANGO_GREEN))
         self.separator2 = cap.get().rstrip("\n")
+        # Pre-render progress characters, so writing one is a list append.
+        self._dot_strings = {}
+        for char, style in DOT_STYLES.items():
+            with self.console.capture() as cap:
+                self.console.print(char, style=style, end="")
+            self._dot_strings[char] = cap.get()
+        self._pending_dots: list[str] = []
+        self._dots_flushed_at = time.perf_counter()
+        self.progress: Progress | None = None
+        self._progress_task: TaskID | None = None
+        self._progress_total: int | None = None
+        self._progress_completed = 0
+        self._progress_updated_at = 0.0
+        self._current_test: TestCase | None = None
+        self._printed_counts: dict[int, int] = {}
+        self.error_fingerprints = {}
+        self.plain_tracebacks = {}
+        self.rendered_subtest_patterns = set()
+        # Reporters writing machine-readable results, fed as each test stops.
+        self.reporters: list[Reporter] = []
+        self._report_test: TestCase | None = None
+        self._report_outcome = "passed"
+        self._report_problems: list[Problem] = []
+        self._report_skip_reason = ""
+        self._report_output: tuple[str | SpilledOutput, str | SpilledOutput] = ("", "")
+        self._held_reports: list[ReportEntry] = []
+        # Descriptions of the first test with each error fingerprint printed.
+        self._printed_fingerprints: dict[str, str] = {}
+        # Durations by test ID, on all Python versions.
+        self.test_durations: dict[str, float] = {}
+        # Durations of class fixtures, by test case class.
+        self.fixture_durations: dict[str, float] = {}
+        # Query statistics by test ID, for tests that ran queries.
+        self.query_stats: dict[str, QueryStats] = {}
+        # Net memory growth by test ID, when memory_mode is set.
+        self.memory_usage: dict[str, MemoryUsage] = {}
+        # Time taken to start each parallel worker.
+        self.worker_startups: list[float] = []
+        self.profiler: Profiler | None = None
+        # Records the files each test case class runs, with --record-impact.
+        self.impact_recorder: ImpactRecorder | None = None
+        self._test_started_at = 0.0
+        self._duration_added = False
+        # Outcomes of the current test, with aggregate_subtests.
+        self._test_passed = False
+        self._test_failed = False
+        self._subtests_passed = 0
+        self._subtests_failed = 0
+        self._subtests_errored = 0
+        self.duration_history: DurationHistory | None = None
+        # Tests that failed, then passed when rerun, by ID, with the number
+        # of the rerun that passed.
+        self.flaky_tests: dict[str, int] = {}
+        self._expected_total = 0.0
+        self._expected_done = 0.0
+        self._expected_default = 0.0
+        self._progress_started_at = 0.0
         if sys.version_info < (3, 11):
             self._newline = True
 
+    def enable_progress(
+        self, total: int | None, expected_duration: float = 0.0
+    ) -> None:
+        """
+        Use a live progress bar instead of dots or status lines.
+
+        With an ``expected_duration`` from the duration history, the time
+        remaining is estimated from the expected durations of remaining tests.
+        """
+        self.dots = False
+        self.showAll = False
+        self.progress = Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            TextColumn("{task.completed:.0f}/{task.total:.0f}"),
+            TextColumn("[red]{task.fields[failures]} failed"),
+            _TestsPerSecondColumn(),
+            _TimeRemainingColumn(),
+            TextColumn("{task.fields[current]}"),
+            console=self.console,
+            refresh_per_second=self.progress_refresh_per_second,
+        )
+        self._progress_total = total
+        self._expected_total = expected_duration
+        if self.duration_history is not None:
+            self._expected_default = self.duration_history.default()
+
+    def startTestRun(self) -> None:
+        super().startTestRun()
+        self.start_watchdog()
+        if self.progress is not None:
+            self._progress_task = self.progress.add_task(
+                "Testing",
+                total=self._progress_total,
+                failures=0,
+                current="",
+                eta=None,
+            )
+            self._progress_started_at = time.perf_counter()
+            self.progress.start()
+
     def startTest(self, test: TestCase) -> None:
         super().startTest(test)
         if sys.version_info < (3, 11):
             self._newline = False
+        if (
+            self._pending_dots
+            and time.perf_counter() - self._dots_flushed_at >= self.dots_flush_interval
+        ):
+            # Before a test that may be slow.
+            self._flush_dots()
+        self._current_test = test
+        self._test_started_at = time.perf_counter()
+        self._duration_added = False
+        if self.aggregate_subtests:
+            self._test_passed = False
+            self._test_failed = False
+            self._subtests_passed = 0
+            self._subtests_failed = 0
+            self._subtests_errored = 0
+        if self.reporters:
+            self._report_test = test
+            self._report_outcome = "passed"
+            self._report_problems = []
+            self._report_skip_reason = ""
+            self._report_output = ("", "")
+        if self.profiler is not None and self.profiler.matches(test):
+            self.profiler.enable(test)
+
+    def stopTest(self, test: TestCase) -> None:
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.aggregate_subtests:
+            self._write_subtest_summary(test)
+        if self.reporters and self.buffer and self._stdout_buffer is not None:  # type: ignore [attr-defined]
+            # Read before unittest clears the buffers. In parallel runs, the
+            # workers send their output instead.
+            stdout = self._stdout_buffer.getvalue()  # type: ignore [attr-defined]
+            stderr = self._stderr_buffer.getvalue()  # type: ignore [attr-defined]
+            if stdout or stderr:
+                self.addCapturedOutput(test, stdout, stderr)
+        super().stopTest(test)
+        if not self._duration_added:
+            # Before Python 3.12, unittest doesn't call addDuration().
+            self.addDuration(test, time.perf_counter() - self._test_started_at)
+        if self.reporters:
+            self._write_report(test, self.test_durations.get(test.id(), 0.0))
+            self._report_test = None
+        if self.progress is not None:
+            self._progress_completed += 1
+            if self.duration_history is not None:
+                expected = self.duration_history.get(test.id())
+                if expected is None:
+                    expected = self._expected_default
+                self._expected_done += expected
+            # Print new errors above the progress bar.
+            self.printErrorList("ERROR", self.errors)
+            self.printErrorList("FAIL", self.failures)
+            now = time.perf_counter()
+            if now - self._progress_updated_at >= 1 / self.progress_refresh_per_second:
+                self._update_progress()
+                self._progress_updated_at = now
+
+    def addDuration(self, test: TestCase, elapsed: float) -> None:
+        self._duration_added = True
+        if sys.version_info >= (3, 12):
+            super().addDuration(test, elapsed)
+        self.test_durations[test.id()] = elapsed
+
+    def addQueryStats(self, test: TestCase, stats: QueryStats) -> None:
+        self.query_stats[test.id()] = stats
+
+    def addWorkerStartup(self, test: TestCase, elapsed: float) -> None:
+        self.worker_startups.append(elapsed)
+
+    def addPassedSubTests(self, test: TestCase, count: int) -> None:
+        """
+        Called with the number of subtests of the given test that passed in a
+        parallel worker, with aggregate_subtests.
+        """
+        self._subtests_passed += count
+
+    def addMemoryUsage(self, test: TestCase, usage: MemoryUsage) -> None:
+        self.memory_usage[test.id()] = usage
+
+    def addCapturedOutput(
+        self,
+        test: TestCase,
+        stdout: str | SpilledOutput,
+        stderr: str | SpilledOutput,
+    ) -> None:
+        """
+        Called with the output captured by --buffer, for reporters.
+        """
+        self._report_output = (stdout, stderr)
+
+    def _report(
+        self,
+        test: TestCase,
+        outcome: str | None = None,
+        kind: str | None = None,
+        rendered: str | TracebackSnapshot | None = None,
+        prefix: str = "",
+    ) -> None:
+        if not self.reporters:
+            return
+        if isinstance(test, _SubTest):
+            # Report subtests as part of their test, as in parallel runs.
+            test = test.test_case
+        if kind is not None:
+            assert rendered is not None
+            plain = self.plain_tracebacks.pop(id(rendered), None)
+            if plain is None:
+                plain = PlainTraceback("", "", str(rendered))
+            message = f"{prefix} {plain.message}" if prefix else plain.message
+            self._report_problems.append(
+                Problem(kind, plain.exc_type, message, plain.text)
+            )
+        if outcome is not None and self._report_outcome == "passed":
+            # Subtests may be skipped before the test passes.
+            self._report_outcome = outcome
+        if test is not self._report_test:
+            # Errors outside of tests, such as in setUpClass().
+            self._write_report(test, 0.0)
+
+    def _write_report(self, test: TestCase, duration: float) -> None:
+        problem_kinds = {problem.kind for problem in self._report_problems}
+        if "error" in problem_kinds:
+            outcome = "error"
+        elif "failure" in problem_kinds:
+            outcome = "failed"
+        else:
+            outcome = self._report_outcome
+        stdout, stderr = self._report_output
+        entry = ReportEntry(
+            test.id(),
+            outcome,
+            duration,
+            self._report_problems,
+            self._report_skip_reason,
+            stdout,
+            stderr,
+        )
+        if self.hold_failed_reports and outcome in ("failed", "error"):
+            self._held_reports.append(entry)
+        else:
+            for reporter in self.reporters:
+                reporter.add(entry)
+        self._report_outcome = "passed"
+        self._report_problems = []
+        self._report_skip_reason = ""
+        self._report_output = ("", "")
+
+    def release_reports(self) -> None:
+        """
+        Write the held reports of failed tests, as passed for those that
+        passed when rerun.
+        """
+        for entry in self._held_reports:
+            rerun = self.flaky_tests.get(entry.test_id)
+            if rerun is not None:
+                entry = entry._replace(outcome="passed", problems=[], reruns=rerun)
+            for reporter in self.reporters:
+                reporter.add(entry)
+        self._held_reports = []
+
+    def addClassFixtureDuration(self, test: TestCase, elapsed: float) -> None:
+        """
+        Called by RichTestSuite with the time taken by the class fixtures of
+        the given test's class, such as setUpClass() and setUpTestData().
+        """
+        label = strclass(type(test))
+        self.fixture_durations[label] = self.fixture_durations.get(label, 0.0) + elapsed
+
+    def _update_progress(self) -> None:
+        assert self.progress is not None
+        assert self._progress_task is not None
+        current = self._current_test
+        eta = None
+        if self._expected_total and self._expected_done:
+            # Scale the expected time left by how the run compares so far,
+            # which accounts for parallelism and machine speed.
+            elapsed = time.perf_counter() - self._progress_started_at
+            remaining = max(self._expected_total - self._expected_done, 0.0)
+            eta = remaining * elapsed / self._expected_done
+        self.progress.update(
+            self._progress_task,
+            completed=self._progress_completed,
+            failures=(
+                len(self.errors) + len(self.failures) + len(self.unexpectedSuccesses)
+            ),
+            current="" if current is None else current.id(),
+            eta=eta,
+        )
+
+    def _stop_progress(self) -> None:
+        if self.progress is not None and self._progress_task is not None:
+            self._current_test = None
+            self._update_progress()
+            self.progress.stop()
+            self._progress_task = None
 
     def addSuccess(self, test: TestCase) -> None:
-        if self.showAll:
+        self._report(test, "passed")
+        if self.aggregate_subtests:
+            # Written by stopTest(), with the number of subtests.
+            self._test_passed = True
+        elif self.showAll:
             self._write_status(test, "ok")
         elif self.dots:
-            self.console.print(".", style=DJANGO_GREEN, end="")
+            self._write_dot(".")
 
     @failfast
-    def addError(self, test: TestCase, err: _SysExcInfoType) -> None:
-        self.errors.append((test, self._exc_info_to_string(err, test)))
+    def addError(self, test: TestCase, err: _ExcInfoType) -> None:
+        rendered = self._exc_info_to_string(err, test)
+        self.errors.append((test, rendered))
+        self._report(test, kind="error", rendered=rendered)
         self._mirrorOutput = True
+        self._test_failed = True
         if self.showAll:
             self._write_status(test, "ERROR")
         elif self.dots:
-            self.console.print("E", style=RED, end="")
+            self._write_dot("E")
 
     @failfast
-    def addFailure(self, test: TestCase, err: _SysExcInfoType) -> None:
-        self.failures.append((test, self._exc_info_to_string(err, test)))
+    def addFailure(self, test: TestCase, err: _ExcInfoType) -> None:
+        rendered = self._exc_info_to_string(err, test)
+        self.failures.append((test, rendered))
+        self._report(test, kind="failure", rendered=rendered)
         self._mirrorOutput = True
+        self._test_failed = True
         if self.showAll:
             self._write_status(test, "FAIL")
         elif self.dots:
-            self.console.print("F", style=RED, end="")
+            self._write_dot("F")
 
     def addSkip(self, test: TestCase, reason: str) -> None:
         self.skipped.append((test, reason))
+        self._report_skip_reason = reason
+        self._report(test, "skipped")
         if self.showAll:
             self._write_status(test, f"skipped {reason!r}")
         elif self.dots:
-            self.console.print("s", style=YELLOW, end="")
+            self._write_dot("s")
 
-    def addExpectedFailure(self, test: TestCase, err: _SysExcInfoType) -> None:
-        self.expectedFailures.append((test, self._exc_info_to_string(err, test)))
+    def addExpectedFailure(self, test: TestCase, err: _ExcInfoType) -> None:
+        rendered = self._exc_info_to_string(err, test)
+        self.expectedFailures.append((test, rendered))
+        self.plain_tracebacks.pop(id(rendered), None)
+        self._report(test, "expected_failure")
         if self.showAll:
             self.console.print("expected failure", style=YELLOW)
         elif self.dots:
-            self.console.print("x", style=YELLOW, end="")
+            self._write_dot("x")
 
     @failfast
     def addUnexpectedSuccess(self, test: TestCase) -> None:
         self.unexpectedSuccesses.append(test)
+        self._report(test, "unexpected_success")
         if self.showAll:
             self.console.print("unexpected success", style=RED)
         elif self.dots:
-            self.console.print("u", style=RED, end="")
+            self._write_dot("u")
+
+    def _print_live(self, *renderables: RenderableType) -> None:
+        # After the progress characters of tests that already finished.
+        self._flush_dots()
+        if self.progress is not None:
+            # The live display keeps to the bottom of the console.
+            self.console.print(*renderables)
+            return
+        super()._print_live(*renderables)
+        # Repeat the description of the test with its status.
+        self._newline = True
+
+    def _write_dot(self, char: str) -> None:
+        self._pending_dots.append(self._dot_strings[char])
+        if (
+            len(self._pending_dots) >= self.dots_flush_size
+            or time.perf_counter() - self._dots_flushed_at >= self.dots_flush_interval
+        ):
+            self._flush_dots()
+
+    def _flush_dots(self) -> None:
+        if self._pending_dots:
+            # Swapped first, as warnings may flush from the watchdog thread.
+            pending, self._pending_dots = self._pending_dots, []
+            self.stream.write("".join(pending))
+            self.stream.flush()
+        self._dots_flushed_at = time.perf_counter()
+
+    def stopTestRun(self) -> None:
+        self.stop_watchdog()
+        self._flush_dots()
+        self._stop_progress()
+        super().stopTestRun()
+
+    def printErrors(self) -> None:
+        self._flush_dots()
+        super().printErrors()
+
+    def stop(self) -> None:
+        super().stop()
+        # Show everything so far, such as the error that triggered failfast,
+        # before the run winds down.
+        self._drain_output()
+
+    def _drain_output(self) -> None:
+        self._flush_dots()
+        if isinstance(self.stream.stream, BackgroundWriter):
+            self.stream.stream.drain()
 
     def printErrorList(
         self,
         flavour: str,
-        errors: Iterable[tuple[TestCase, str]],
+        errors: Iterable[tuple[TestCase, str | TracebackSnapshot]],
     ) -> None:
-        for test, err in errors:
-            title = f"{flavour}: {self.getDescription(test)}"
-            self.console.print(DJANGO_GREEN_RULE, title, DJANGO_GREEN_RULE)
+        for group in self._group_duplicates(self._unprinted(errors)):
+            test, err = group[0][:2]
+            description = self.getDescription(test)
+            fingerprint = self.error_fingerprints.get(id(err))
+            first = None
+            if fingerprint is not None:
+                # Already printed, in progress mode.
+                first = self._printed_fingerprints.get(fingerprint)
+            if first is None:
+                title = f"{flavour}: {description}"
+                self.console.print(DJANGO_GREEN_RULE, title, DJANGO_GREEN_RULE)
+                self._print_error_entry(group[0])
+                if fingerprint is not None and self._collapses(test):
+                    self._printed_fingerprints[fingerprint] = description
+                group = group[1:]
+            if group:
+                self._print_duplicates(flavour, group, first or description)
+
+    def _group_duplicates(
+        self, errors: Iterable[_ErrorEntry]
+    ) -> Iterable[list[_ErrorEntry]]:
+        """
+        Group errors by fingerprint, in order of their first occurrence.
+        """
+        if not self.collapse_duplicate_errors and not self.aggregate_subtests:
+            return ([entry] for entry in errors)
+        groups: dict[object, list[_ErrorEntry]] = {}
+        for entry in errors:
+            key: object = id(entry)
+            if self._collapses(entry[0]):
+                key = self.error_fingerprints.get(id(entry[1]), key)
+            groups.setdefault(key, []).append(entry)
+        return groups.values()
+
+    def _collapses(self, test: TestCase) -> bool:
+        # With aggregate_subtests, failing subtests are grouped by pattern.
+        return self.collapse_duplicate_errors or (
+            self.aggregate_subtests and isinstance(test, _SubTest)
+        )
+
+    def _print_duplicates(
+        self, flavour: str, errors: list[_ErrorEntry], first: str
+    ) -> None:
+        table = Table(
+            title=f"{flavour}: {len(errors)} more with the same error",
+            title_style=RED,
+            caption=f"As in {first}.",
+            caption_justify="left",
+        )
+        table.add_column("Test", overflow="fold")
+        for entry in errors:
+            table.add_row(Text(self.getDescription(entry[0])))
+        self.console.print(table)
+        self.console.print()
+
+    def _unprinted(self, errors: Iterable[_ErrorEntry]) -> Iterable[_ErrorEntry]:
+        # In progress mode, errors are printed as they happen, so skip those
+        # already printed when printing the full lists at the end.
+        if self.progress is None or not isinstance(errors, list):
+            return errors
+        start = self._printed_counts.get(id(errors), 0)
+        self._printed_counts[id(errors)] = len(errors)
+        return errors[start:]
+
+    def _print_error_entry(self, entry: tuple[Any, ...]) -> None:
+        self._print_error(entry[1])
+
+    def _print_error(self, err: str | TracebackSnapshot) -> None:
+        if isinstance(err, TracebackSnapshot):
+            err.print(self.console)
+            self.console.print()
+        elif self.progress is not None:
+            # Go through the console, so the live display is kept below.
+            self.console.print(Text.from_ansi(err), soft_wrap=True)
+        else:
             self.stream.write(f"{err}\n")
 
     def _write_status(self, test: TestCase, status: str) -> None:
@@ -126,20 +1038,49 @@ class RichTextTestResult(unittest.TextTestResult):
                 self.console.print("  ", end="")
             self.console.print(self.getDescription(test), end="")
             self.console.print(" ... ", end="")
-        if status == "FAIL":
-            self.console.print("FAIL", style=RED)
-        elif status == "ERROR":
-            self.console.print("ERROR", style=RED)
+        if status.startswith(("FAIL", "ERROR")):
+            self.console.print(status, style=RED)
         elif status.startswith("skipped"):
             self.console.print(status, style=YELLOW)
         else:
             self.console.print(status, style=DJANGO_GREEN)
         self._newline = True
 
+    def _write_subtest_summary(self, test: TestCase) -> None:
+        failed = self._subtests_failed + self._subtests_errored
+        total = self._subtests_passed + failed
+        if self._test_passed:
+            status, char = ("ok", ".")
+            if total:
+                status = f"ok ({total} subtests)"
+        elif failed and not self._test_failed:
+            if self._subtests_failed:
+                status, char = ("FAIL", "F")
+            else:
+                status, char = ("ERROR", "E")
+            status = f"{status} ({failed} of {total} subtests)"
+        else:
+            return
+        if self.showAll:
+            self._write_status(test, status)
+        elif self.dots:
+            self._write_dot(char)
+
     def addSubTest(
-        self, test: TestCase, subtest: TestCase, err: _SysExcInfoType | None
+        self, test: TestCase, subtest: TestCase, err: _ExcInfoType | None
     ) -> None:
-        if err is not None:
+        if self.aggregate_subtests:
+            # Count subtests, for one status per test from stopTest().
+            if err is None:
+                self._subtests_passed += 1
+            else:
+                if not isinstance(err, RenderedExcInfo):
+                    err = self._subtest_exc_info(err, test, subtest)
+                if issubclass(err[0], subtest.failureException):
+                    self._subtests_failed += 1
+                else:
+                    self._subtests_errored += 1
+        elif err is not None:
             if self.showAll:
                 if issubclass(err[0], subtest.failureException):  # type: ignore [arg-type]
                     self._write_status(subtest, "FAIL")
@@ -147,72 +1088,428 @@ class RichTextTestResult(unittest.TextTestResult):
                     self._write_status(subtest, "ERROR")
             elif self.dots:
                 if issubclass(err[0], subtest.failureException):  # type: ignore [arg-type]
-                    self.console.print("F", style=RED, end="")
+                    self._write_dot("F")
                 else:
-                    self.console.print("E", style=RED, end="")
-        TestResult.addSubTest(self, test, subtest, err)
-
-    def _exc_info_to_string(self, err: _SysExcInfoType, test: TestCase) -> str:
-        """Converts a sys.exc_info()-style tuple of values into a string."""
-        exctype, value, tb = err
-
-        if hasattr(self, "_clean_tracebacks"):
-            # Post-bpo-24959 - merged to Python 3.11, backported to 3.9 and 3.10
-            tb = self._clean_tracebacks(exctype, value, tb, test)
-        else:  # pragma: no cover
-            # needed on old 3.9 and 3.10 patch versions, but not testing those
-            # Skip test runner traceback levels
-            while tb and self._is_relevant_tb_level(tb):  # type: ignore [attr-defined]
-                tb = tb.tb_next
-
-        msgLines = []
-        if exctype is not None:  # pragma: no branch  # can't work when this isn't true
-            assert value is not None
-            extract = Traceback.extract(exctype, value, tb, show_locals=True)
-            with self.console.capture() as capture:
-                self.console.print(
-                    Traceback(
-                        extract,
-                        suppress=[unittest, testcases],
-                        width=self.console.width,
-                    )
-                )
-            msgLines.append(capture.get())
+                    self._write_dot("E")
+        TestResult.addSubTest(self, test, subtest, err)  # type: ignore [arg-type]
+        if err is not None and self.reporters:
+            if issubclass(err[0], subtest.failureException):  # type: ignore [arg-type]
+                kind, rendered = "failure", self.failures[-1][1]
+            else:
+                kind, rendered = "error", self.errors[-1][1]
+            self._report(
+                test,
+                kind=kind,
+                rendered=rendered,
+                prefix=_subtest_description(subtest),
+            )
 
-        if self.buffer:
-            assert isinstance(sys.stdout, io.StringIO)
-            output = sys.stdout.getvalue()
-            assert isinstance(sys.stderr, io.StringIO)
-            error = sys.stderr.getvalue()
-            if output:
-                if not output.endswith("\n"):
-                    output += "\n"
-                msgLines.append(STDOUT_LINE % output)
-            if error:
-                if not error.endswith("\n"):
-                    error += "\n"
-                msgLines.append(STDERR_LINE % error)
 
-        return "".join(msgLines)
+def _subtest_description(subtest: TestCase) -> str:
+    # Like _SubTest._subDescription(), but the default message isn't kept by
+    # subtests from parallel test workers.
+    parts = []
+    message = subtest._message  # type: ignore [attr-defined]
+    if isinstance(message, str):
+        parts.append(f"[{message}]")
+    params = subtest.params  # type: ignore [attr-defined]
+    if params:
+        parts.append(
+            "(" + ", ".join(f"{key}={value!r}" for key, value in params.items()) + ")"
+        )
+    return " ".join(parts)
 
 
 class RichDebugSQLTextTestResult(DebugSQLTextTestResult, RichTextTestResult):
+    # Queries shown from the start and end of a long SQL log, after collapsing
+    # identical queries.
+    sql_head = 10
+    sql_tail = 10
+    # Characters of SQL above which it's shown without syntax highlighting.
+    sql_highlight_limit = 20_000
+
     # DebugSQLTextTestResult adds sql_debug to errors in type-incompatible way
     def printErrorList(  # type: ignore [override]
         self,
         flavour: str,
-        errors: Iterable[tuple[TestCase, str, str]],
+        errors: Iterable[tuple[TestCase, str | TracebackSnapshot, str]],
     ) -> None:
-        for test, err, sql_debug in errors:
-            title = f"{flavour}: {self.getDescription(test)}"
-            self.console.print(DJANGO_GREEN_RULE, title, DJANGO_GREEN_RULE)
-            self.stream.write(f"{err}\n")
-            self.console.print(DJANGO_GREEN_RULE)
-            self.console.print(sql_debug)
+        # Rather than DebugSQLTextTestResult's, which comes first.
+        RichTextTestResult.printErrorList(self, flavour, errors)  # type: ignore [arg-type]
+
+    def _print_error_entry(self, entry: tuple[Any, ...]) -> None:
+        _, err, sql_debug = entry
+        self._print_error(err)
+        self.console.print(DJANGO_GREEN_RULE)
+        self._print_sql_log(sql_debug)
+
+    def _print_sql_log(self, sql_debug: str) -> None:
+        summary = summarize_sql_log(sql_debug)
+        unique = summary.unique
+        hidden = len(unique) - self.sql_head - self.sql_tail
+        if hidden <= 0 and len(unique) == summary.queries:
+            self.console.print(self._highlight_sql(sql_debug))
+            return
+        if hidden > 0:
+            head = unique[: self.sql_head]
+            tail = unique[len(unique) - self.sql_tail :]
+        else:
+            head, tail = unique, []
+        size = sum(len(query.sql) for query in chain(head, tail))
+        highlight = size <= self.sql_highlight_limit
+        self.console.print(
+            self._highlight_sql("\n".join(q.format() for q in head), highlight)
+        )
+        if tail:
+            self.console.print(
+                f"… {hidden} more unique queries …", style="dim", highlight=False
+            )
+            self.console.print(
+                self._highlight_sql("\n".join(q.format() for q in tail), highlight)
+            )
+        queries = "query" if summary.queries == 1 else "queries"
+        self.console.print(
+            f"{summary.queries} {queries} in {summary.time:.3f}s, "
+            + f"{len(unique)} unique.",
+            style="table.caption",
+            highlight=False,
+        )
+        self.console.print()
+
+    def _highlight_sql(self, sql: str, highlight: bool = True) -> Text:
+        if not highlight or len(sql) > self.sql_highlight_limit:
+            return Text(sql)
+        text = _SQL_SYNTAX.highlight(sql)
+        if not sql.endswith("\n"):
+            # Highlighting adds a final newline.
+            text.rstrip()
+        return text
+
+
+# Only used to highlight SQL, with the colours of Rich tracebacks.
+_SQL_SYNTAX = Syntax("", "sql", theme="ansi_dark", background_color="default")
 
 
 class RichPDBDebugResult(PDBDebugResult, RichTextTestResult):
-    pass
+    def debug(self, error: tuple[type[BaseException], BaseException, Any]) -> None:
+        self._drain_output()
+        super().debug(error)
+
+
+class RichRemoteTestResult(
+    RichTracebackMixin,
+    RichQueryStatsMixin,
+    RichMemoryMixin,
+    RichWatchdogMixin,
+    RemoteTestResult,
+):
+    """
+    Render Rich tracebacks in parallel test workers, where the live frames are
+    available, and send the rendered text to the main process.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        console_options: dict[str, Any] | None = None,
+        deferred_tracebacks: bool = False,
+        locals_limits: LocalsLimits | None = None,
+        record_queries: bool = False,
+        keep_query_sql: bool = False,
+        memory_mode: str | None = None,
+        reporting: bool = False,
+        aggregate_subtests: bool = False,
+        timeout: float | None = None,
+        slow_warning: float | None = None,
+        spill_dir: str | None = None,
+        spill_size: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        # Match the main process console, so rendering is identical.
+        self.console = Console(file=io.StringIO(), **(console_options or {}))
+        # Warnings from the watchdog can't wait for the main process.
+        self.live_console = Console(file=sys.__stderr__, **(console_options or {}))
+        self.timeout = timeout
+        self.slow_warning = slow_warning
+        self.spill_dir = spill_dir
+        self.spill_size = spill_size
+        self.deferred_tracebacks = deferred_tracebacks
+        if locals_limits is not None:
+            self.locals_limits = locals_limits
+        self.record_queries = record_queries
+        self.keep_query_sql = keep_query_sql
+        self.memory_mode = memory_mode
+        self.error_fingerprints = {}
+        self.plain_tracebacks = {}
+        self.rendered_subtest_patterns = set()
+        # With reporters in the main process, send plain tracebacks and
+        # captured output too.
+        self.keep_plain_tracebacks = reporting
+        # With aggregate_subtests, passing subtests are counted, and the count
+        # sent when the test stops.
+        self.aggregate_subtests = aggregate_subtests
+        self._subtests_passed = 0
+        # Indexes of the subsuite's tests, set by RichRemoteTestRunner.
+        self.test_indexes: dict[int, int] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = cast(dict[str, Any], super().__getstate__())
+        state.pop("console", None)
+        state.pop("live_console", None)
+        state.pop("_watchdog", None)
+        return state
+
+    def startTest(self, test: TestCase) -> None:
+        super().startTest(test)
+        self._test_started_at = time.perf_counter()
+        self._subtests_passed = 0
+
+    def stopTest(self, test: TestCase) -> None:
+        if self._subtests_passed:
+            self.events.append(
+                ("addPassedSubTests", self.test_index, self._subtests_passed)
+            )
+        if sys.version_info < (3, 12):
+            # unittest only reports durations from Python 3.12, so send them
+            # to the main process here.
+            elapsed = time.perf_counter() - self._test_started_at
+            self.events.append(("addDuration", self.test_index, elapsed))
+        if (
+            self.keep_plain_tracebacks
+            and self.buffer
+            and self._stdout_buffer is not None  # type: ignore [attr-defined]
+        ):
+            stdout = self._stdout_buffer.getvalue()  # type: ignore [attr-defined]
+            stderr = self._stderr_buffer.getvalue()  # type: ignore [attr-defined]
+            if stdout or stderr:
+                # Large output goes to files, rather than being held in the
+                # events until the subsuite finishes.
+                self.events.append(
+                    (
+                        "addCapturedOutput",
+                        self.test_index,
+                        self._spill(stdout),
+                        self._spill(stderr),
+                    )
+                )
+        super().stopTest(test)
+
+    def addQueryStats(self, test: TestCase, stats: QueryStats) -> None:
+        self.events.append(("addQueryStats", self.test_index, stats))
+
+    def addMemoryUsage(self, test: TestCase, usage: MemoryUsage) -> None:
+        self.events.append(("addMemoryUsage", self.test_index, usage))
+
+    def addClassFixtureDuration(self, test: TestCase, elapsed: float) -> None:
+        # Class fixtures run outside of any test, so refer to the test by its
+        # index rather than the current test_index.
+        index = self.test_indexes.get(id(test))
+        if index is not None:
+            self.events.append(("addClassFixtureDuration", index, elapsed))
+
+    def _render_exc_info(
+        self, err: _SysExcInfoType, test: TestCase, subtest: TestCase | None = None
+    ) -> RenderedExcInfo:
+        exc_type = err[0]
+        assert exc_type is not None
+        try:
+            pickle.dumps(exc_type)
+        except Exception:
+            # Dynamically created exception classes cannot be sent to the main
+            # process, but a stand-in type suffices to classify the error.
+            if issubclass(exc_type, test.failureException):
+                exc_type = test.failureException
+            else:
+                exc_type = Exception
+        if subtest is not None and self.aggregate_subtests:
+            return self._subtest_exc_info(err, test, subtest)._replace(
+                exc_type=exc_type
+            )
+        rendered = self._exc_info_to_string(err, test)
+        return RenderedExcInfo(
+            exc_type,
+            rendered,
+            fingerprint=self.error_fingerprints.pop(id(rendered), None),
+            plain=self.plain_tracebacks.pop(id(rendered), None),
+        )
+
+    def addError(self, test: TestCase, err: _SysExcInfoType) -> None:
+        super().addError(test, self._render_exc_info(err, test))
+
+    def addFailure(self, test: TestCase, err: _SysExcInfoType) -> None:
+        super().addFailure(test, self._render_exc_info(err, test))
+
+    def addSubTest(
+        self, test: TestCase, subtest: TestCase, err: _SysExcInfoType | None
+    ) -> None:
+        if err is not None:
+            err = self._render_exc_info(err, test, subtest)  # type: ignore [assignment]
+        elif self.aggregate_subtests:
+            self._subtests_passed += 1
+        super().addSubTest(test, subtest, err)
+
+    def addExpectedFailure(self, test: TestCase, err: _SysExcInfoType) -> None:
+        # Skip RemoteTestResult, which drops the traceback when tblib is not
+        # installed, since the rendered error is always picklable.
+        rendered = self._render_exc_info(err, test)
+        self.check_picklable(test, rendered)
+        self.events.append(("addExpectedFailure", self.test_index, rendered))
+        TestResult.addExpectedFailure(self, test, rendered)  # type: ignore [arg-type]
+
+
+class RichRemoteTestRunner(RemoteTestRunner):
+    resultclass = RichRemoteTestResult
+
+    def __init__(
+        self,
+        failfast: bool = False,
+        resultclass: type[RichRemoteTestResult] | None = None,
+        buffer: bool = False,
+        *,
+        console_options: dict[str, Any] | None = None,
+        deferred_tracebacks: bool = False,
+        locals_limits: LocalsLimits | None = None,
+        record_queries: bool = False,
+        keep_query_sql: bool = False,
+        memory_mode: str | None = None,
+        reporting: bool = False,
+        aggregate_subtests: bool = False,
+        timeout: float | None = None,
+        slow_warning: float | None = None,
+        spill_dir: str | None = None,
+        spill_size: int = 0,
+        diff_limits: DiffLimits | None = None,
+    ) -> None:
+        super().__init__(failfast=failfast, resultclass=resultclass, buffer=buffer)
+        self.console_options = console_options
+        self.deferred_tracebacks = deferred_tracebacks
+        self.locals_limits = locals_limits
+        self.record_queries = record_queries
+        self.keep_query_sql = keep_query_sql
+        self.memory_mode = memory_mode
+        self.reporting = reporting
+        self.aggregate_subtests = aggregate_subtests
+        self.timeout = timeout
+        self.slow_warning = slow_warning
+        self.spill_dir = spill_dir
+        self.spill_size = spill_size
+        self.diff_limits = diff_limits
+
+    def run(self, test: unittest.TestSuite) -> RichRemoteTestResult:
+        result = self.resultclass(
+            console_options=self.console_options,
+            deferred_tracebacks=self.deferred_tracebacks,
+            locals_limits=self.locals_limits,
+            record_queries=self.record_queries,
+            keep_query_sql=self.keep_query_sql,
+            memory_mode=self.memory_mode,
+            reporting=self.reporting,
+            aggregate_subtests=self.aggregate_subtests,
+            timeout=self.timeout,
+            slow_warning=self.slow_warning,
+            spill_dir=self.spill_dir,
+            spill_size=self.spill_size,
+        )
+        result.test_indexes = {id(t): i for i, t in enumerate(test)}
+        global _worker_startup
+        if _worker_startup is not None:
+            # Sent with the first subsuite this worker runs.
+            result.events.append(("addWorkerStartup", 0, _worker_startup))
+            _worker_startup = None
+        unittest.registerResult(result)
+        result.failfast = self.failfast
+        result.buffer = self.buffer
+        result.start_watchdog()
+        try:
+            with ExitStack() as stack:
+                if self.diff_limits is not None:
+                    stack.enter_context(structural_diffs(self.diff_limits))
+                test(result)
+        finally:
+            result.stop_watchdog()
+        return result
+
+
+class RichTestSuite(unittest.TestSuite):
+    """
+    Time class fixtures, such as setUpClass(), setUpTestData(), and
+    tearDownClass(), for results with an addClassFixtureDuration() method.
+    For results with an impact recorder, switch it to each class before its
+    fixtures run.
+    """
+
+    def _tearDownPreviousClass(self, test: TestCase | None, result: TestResult) -> None:
+        previous_class = getattr(result, "_previousTestClass", None)
+        if previous_class is None or previous_class is type(test):
+            super()._tearDownPreviousClass(test, result)  # type: ignore [misc]
+            return
+        start = time.perf_counter()
+        super()._tearDownPreviousClass(test, result)  # type: ignore [misc]
+        previous_test = getattr(result, "_previousTest", None)
+        add_duration = getattr(result, "addClassFixtureDuration", None)
+        if previous_test is not None and add_duration is not None:
+            add_duration(previous_test, time.perf_counter() - start)
+
+    def _handleClassSetUp(self, test: TestCase, result: TestResult) -> None:
+        if getattr(result, "_previousTestClass", None) is type(test):
+            super()._handleClassSetUp(test, result)  # type: ignore [misc]
+            return
+        recorder = getattr(result, "impact_recorder", None)
+        if recorder is not None:
+            recorder.switch(strclass(type(test)))
+        start = time.perf_counter()
+        super()._handleClassSetUp(test, result)  # type: ignore [misc]
+        add_duration = getattr(result, "addClassFixtureDuration", None)
+        if add_duration is not None:
+            add_duration(test, time.perf_counter() - start)
+        # Like unittest's _previousTestClass, for timing tearDownClass().
+        result._previousTest = test  # type: ignore [attr-defined]
+
+
+# Time taken by _init_worker() in this parallel worker, until sent to the main
+# process.
+_worker_startup: float | None = None
+
+
+def _init_timed_worker(*args: Any) -> None:
+    global _worker_startup
+    start = time.perf_counter()
+    _init_worker(*args)
+    _worker_startup = time.perf_counter() - start
+
+
+class RichParallelTestSuite(ParallelTestSuite):
+    runner_class = RichRemoteTestRunner
+    init_worker = _init_timed_worker
+
+    def run(self, result: TestResult) -> TestResult:  # type: ignore [override]
+        if isinstance(result, RichTextTestResult):
+            console = result.console
+            # Instance attribute, pickled with each subsuite for the workers.
+            self.runner_class = partial(  # type: ignore [assignment]
+                RichRemoteTestRunner,
+                console_options={
+                    "width": console.width,
+                    "color_system": console.color_system,
+                    "force_terminal": console.is_terminal,
+                },
+                deferred_tracebacks=result.deferred_tracebacks,
+                locals_limits=result.locals_limits,
+                record_queries=result.record_queries,
+                keep_query_sql=result.keep_query_sql,
+                memory_mode=result.memory_mode,
+                reporting=bool(result.reporters),
+                aggregate_subtests=result.aggregate_subtests,
+                timeout=result.timeout,
+                slow_warning=result.slow_warning,
+                spill_dir=result.spill_dir,
+                spill_size=result.spill_size,
+                diff_limits=result.diff_limits,
+            )
+            # The workers watch their tests.
+            result.stop_watchdog()
+        return cast(TestResult, super().run(result))
 
 
 class RichTestRunner(unittest.TextTestRunner):
@@ -220,12 +1517,450 @@ class RichTestRunner(unittest.TextTestRunner):
     # the types of TextTestResult.
     resultclass = RichTextTestResult  # type: ignore [assignment]
 
+    # With a duration history, tests are flagged as slower than usual when
+    # they take over this factor times their average, and at least this many
+    # seconds longer, once they have this many runs recorded.
+    slowdown_factor = 2.0
+    slowdown_min_increase = 0.1
+    slowdown_min_runs = 3
+    slowdown_limit = 10
+
+    # Rows in each table of hottest functions from --profile.
+    profile_limit = 20
+
+    # Rows in each table from --memory.
+    memory_limit = 10
+
+    def __init__(
+        self,
+        *args: Any,
+        deferred_tracebacks: bool = False,
+        locals_limits: LocalsLimits | None = None,
+        progress: bool = False,
+        duration_history: DurationHistory | None = None,
+        class_durations: int | None = None,
+        module_durations: int | None = None,
+        export_durations: str | None = None,
+        query_counts: int | None = None,
+        keep_query_sql: bool = False,
+        profiler: Profiler | None = None,
+        memory: str | None = None,
+        async_output: bool = False,
+        junit_xml: str | None = None,
+        jsonl: str | None = None,
+        aggregate_subtests: bool = False,
+        collapse_errors: bool = False,
+        timeout: float | None = None,
+        slow_warning: float | None = None,
+        spill_output: int | None = None,
+        diff_limits: DiffLimits | None = None,
+        reruns: int = 0,
+        flaky_history: FlakyHistory | None = None,
+        impact_index: ImpactIndex | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.junit_xml = junit_xml
+        self.jsonl = jsonl
+        self.aggregate_subtests = aggregate_subtests
+        self.collapse_errors = collapse_errors
+        self.timeout = timeout
+        self.slow_warning = slow_warning
+        self.spill_output = spill_output
+        self.diff_limits = diff_limits
+        self.reruns = reruns
+        self.flaky_history = flaky_history
+        self.impact_index = impact_index
+        self._impact_recorder: ImpactRecorder | None = None
+        # Directory for captured output spilled to files, during run().
+        self._spill_dir: str | None = None
+        self._reporters: list[Reporter] = []
+        self.writer: BackgroundWriter | None = None
+        if async_output:
+            self.writer = BackgroundWriter(self.stream.stream)
+            self.stream = _WritelnDecorator(self.writer)
+        self.deferred_tracebacks = deferred_tracebacks
+        self.locals_limits = locals_limits
+        self.progress = progress
+        self.duration_history = duration_history
+        self.class_durations = class_durations
+        self.module_durations = module_durations
+        self.export_durations = export_durations
+        self.query_counts = query_counts
+        self.keep_query_sql = keep_query_sql
+        self.profiler = profiler
+        self.memory = memory
+        self._test_count: int | None = None
+        self._expected_duration = 0.0
+
+    def run(self, test: unittest.TestSuite | TestCase) -> unittest.TextTestResult:
+        history = self.duration_history
+        if self.progress:
+            self._test_count = test.countTestCases()
+            if history is not None:
+                self._expected_duration = history.estimate(
+                    t.id() for t in iter_test_cases(test)
+                )
+        snapshot = None
+        started_tracing = False
+        if self.memory == "tracemalloc":
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            if not isinstance(test, ParallelTestSuite):
+                # Allocation sites are only known for tests in this process.
+                snapshot = take_snapshot()
+        if self.junit_xml is not None:
+            self._reporters.append(JUnitXMLReporter(self.junit_xml))
+        if self.jsonl is not None:
+            self._reporters.append(JSONLinesReporter(self.jsonl))
+        if self.writer is not None:
+            self.writer.start()
+        if self.spill_output is not None and self.buffer:
+            self._spill_dir = tempfile.mkdtemp(prefix="django-rich-output-")
+        try:
+            if self.reruns:
+                suite = test
+
+                def test(result: TestResult) -> None:  # type: ignore [misc]
+                    # Rerun failed tests before errors are printed.
+                    try:
+                        suite(result)
+                        self._rerun_failed(cast(RichTextTestResult, result))
+                    finally:
+                        cast(RichTextTestResult, result).release_reports()
+
+            with ExitStack() as stack:
+                if self.diff_limits is not None:
+                    stack.enter_context(structural_diffs(self.diff_limits))
+                if self.impact_index is not None:
+                    self._impact_recorder = stack.enter_context(
+                        ImpactRecorder(Path.cwd())
+                    )
+                result = super().run(test)
+            sites = None
+            if snapshot is not None:
+                sites = top_sites(snapshot, take_snapshot(), self.memory_limit)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            for reporter in self._reporters:
+                reporter.close()
+            self._reporters = []
+            if self.writer is not None:
+                self.writer.close()
+            if self._spill_dir is not None:
+                # Errors and reports are written by now.
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+            recorder = self._impact_recorder
+            self._impact_recorder = None
+        assert isinstance(result, RichTextTestResult)
+        if self.class_durations is not None or self.module_durations is not None:
+            self._printGroupedDurations(result)
+        if self.query_counts is not None:
+            self._printQueryStats(result)
+        if self.profiler is not None:
+            self._printProfile(result)
+        if self.memory is not None:
+            self._printMemoryUsage(result, sites)
+        if self.export_durations is not None:
+            write_durations_json(
+                self.export_durations, result.test_durations, result.fixture_durations
+            )
+        if history is not None:
+            self._printSlowdowns(result)
+            history.update(result.test_durations)
+            history.save()
+        if self.flaky_history is not None:
+            self.flaky_history.update(result.test_durations, result.flaky_tests)
+            self.flaky_history.save()
+        if self.reruns:
+            self._printFlaky(result)
+        if self.impact_index is not None and recorder is not None:
+            self.impact_index.update(recorder.classes)
+            self.impact_index.save()
+        return result
+
+    def _rerun_failed(self, result: RichTextTestResult) -> None:
+        """
+        Rerun failed tests in this process, up to ``reruns`` times, and move
+        those that pass from the error lists to ``result.flaky_tests``.
+        Errors in class and module fixtures are not rerun.
+        """
+        if result.shouldStop:
+            return
+        failing: dict[str, TestCase] = {}
+        for entry in chain(result.errors, result.failures):
+            # Entries of debug SQL results also hold the queries.
+            test = entry[0]
+            if isinstance(test, _SubTest):
+                test = test.test_case
+            if isinstance(test, TestCase):
+                failing.setdefault(test.id(), test)
+        if not failing:
+            return
+        result._flush_dots()
+        result._print_live(
+            Text(f"Rerunning {len(failing)} failed test(s)...", style=YELLOW)
+        )
+        # With --parallel, the workers watched the tests.
+        result.start_watchdog()
+        for rerun in range(1, self.reruns + 1):
+            rerun_result = RerunResult(result._watchdog)
+            rerun_result.buffer = self.buffer
+            # Grouped by class, so class fixtures run once.
+            tests = sorted(failing.values(), key=lambda t: strclass(type(t)))
+            RichTestSuite(tests)(rerun_result)
+            for test_id in rerun_result.passed & failing.keys():
+                result.flaky_tests[test_id] = rerun
+                del failing[test_id]
+            if not failing:
+                break
+
+        def is_flaky(entry: tuple[TestCase, Any]) -> bool:
+            test = entry[0]
+            if isinstance(test, _SubTest):
+                test = test.test_case
+            return test.id() in result.flaky_tests
+
+        # In place, as progress mode tracks the printed errors of each list.
+        result.errors[:] = [entry for entry in result.errors if not is_flaky(entry)]
+        result.failures[:] = [entry for entry in result.failures if not is_flaky(entry)]
+        # Drop entries keyed by id() of removed errors, as the ids may be
+        # reused.
+        kept = {
+            id(entry[1])
+            for entry in chain(result.errors, result.failures, result.expectedFailures)
+        }
+        result.error_fingerprints = {
+            key: value
+            for key, value in result.error_fingerprints.items()
+            if key in kept
+        }
+        result.plain_tracebacks = {
+            key: value for key, value in result.plain_tracebacks.items() if key in kept
+        }
+
+    def _makeResult(self) -> RichTextTestResult:
+        result = cast(RichTextTestResult, super()._makeResult())
+        result.deferred_tracebacks = self.deferred_tracebacks
+        if self.locals_limits is not None:
+            result.locals_limits = self.locals_limits
+        result.duration_history = self.duration_history
+        result.record_queries = self.query_counts is not None
+        result.keep_query_sql = self.keep_query_sql
+        result.profiler = self.profiler
+        result.memory_mode = self.memory
+        result.aggregate_subtests = self.aggregate_subtests
+        if self.collapse_errors:
+            result.collapse_duplicate_errors = True
+        result.timeout = self.timeout
+        result.slow_warning = self.slow_warning
+        result.diff_limits = self.diff_limits
+        result.impact_recorder = self._impact_recorder
+        if self._spill_dir is not None:
+            assert self.spill_output is not None
+            result.spill_dir = self._spill_dir
+            result.spill_size = self.spill_output
+        if self._reporters:
+            result.reporters = self._reporters
+            result.keep_plain_tracebacks = True
+            result.hold_failed_reports = bool(self.reruns)
+        if self.progress:
+            result.enable_progress(self._test_count, self._expected_duration)
+        return result
+
+    def _printGroupedDurations(self, result: RichTextTestResult) -> None:
+        classes, modules = aggregate(result.test_durations, result.fixture_durations)
+        for title, totals, count, name in (
+            ("Slowest test classes", classes, self.class_durations, "Class"),
+            ("Slowest test modules", modules, self.module_durations, "Module"),
+        ):
+            if count is None or not totals:
+                continue
+            table = Table(title=title, title_style=YELLOW)
+            table.add_column("Duration", justify="right", no_wrap=True)
+            table.add_column("Fixtures", justify="right", no_wrap=True)
+            table.add_column("Tests", justify="right", no_wrap=True)
+            table.add_column(name)
+            durations = ((label, total.duration) for label, total in totals.items())
+            for label, duration in slowest(durations, count):
+                total = totals[label]
+                table.add_row(
+                    f"{duration:.3f}s",
+                    f"{total.fixtures:.3f}s",
+                    f"{total.tests}",
+                    label,
+                )
+            result.console.print(table)
+
+    def _printQueryStats(self, result: RichTextTestResult) -> None:
+        assert self.query_counts is not None
+        if not result.query_stats:
+            return
+        counts = (
+            (test_id, stats.queries) for test_id, stats in result.query_stats.items()
+        )
+        table = Table(title="Most database queries", title_style=YELLOW)
+        table.add_column("Queries", justify="right", no_wrap=True)
+        table.add_column("Repeated", justify="right", no_wrap=True)
+        table.add_column("Time", justify="right", no_wrap=True)
+        table.add_column("Test", overflow="fold")
+        if self.keep_query_sql:
+            table.add_column("Most repeated SQL", overflow="ellipsis", no_wrap=True)
+        for test_id, count in slowest(counts, self.query_counts):
+            stats = result.query_stats[test_id]
+            row: list[str | Text] = [
+                f"{count}",
+                f"{stats.repeated}",
+                f"{stats.time:.3f}s",
+                Text(test_id),
+            ]
+            if self.keep_query_sql:
+                most_repeated = stats.most_repeated()
+                if most_repeated is not None and most_repeated[1] > 1:
+                    sql, times = most_repeated
+                    row.append(Text(f"{times}× {' '.join(sql.split())}"))
+                else:
+                    row.append("")
+            table.add_row(*row)
+        result.console.print(table)
+
+    def _printProfile(self, result: RichTextTestResult) -> None:
+        assert self.profiler is not None
+        stats = self.profiler.finish()
+        if stats is None:
+            result.console.print("No tests were profiled.", style=YELLOW)
+            return
+        app_stats, by_self, by_cumulative = summarize(stats, self.profile_limit)
+
+        table = Table(title="Profile by app", title_style=YELLOW)
+        table.add_column("Self time", justify="right", no_wrap=True)
+        table.add_column("Calls", justify="right", no_wrap=True)
+        table.add_column("App")
+        for app, calls, self_time in app_stats:
+            table.add_row(f"{self_time:.3f}s", f"{calls}", Text(app))
+        result.console.print(table)
+
+        for title, functions in (
+            ("Hottest functions by self time", by_self),
+            ("Hottest functions by cumulative time", by_cumulative),
+        ):
+            table = Table(title=title, title_style=YELLOW)
+            table.add_column("Self time", justify="right", no_wrap=True)
+            table.add_column("Cumulative", justify="right", no_wrap=True)
+            table.add_column("Calls", justify="right", no_wrap=True)
+            table.add_column("App", no_wrap=True)
+            table.add_column("Function", overflow="fold")
+            for function, app, calls, self_time, cumulative_time in functions:
+                table.add_row(
+                    f"{self_time:.3f}s",
+                    f"{cumulative_time:.3f}s",
+                    f"{calls}",
+                    Text(app),
+                    Text(function),
+                )
+            result.console.print(table)
+
+    def _printMemoryUsage(
+        self, result: RichTextTestResult, sites: list[AllocationSite] | None
+    ) -> None:
+        if not result.memory_usage:
+            return
+        size_column = "Traced" if self.memory == "tracemalloc" else "RSS"
+
+        table = Table(title="Most memory growth", title_style=YELLOW)
+        table.add_column(size_column, justify="right", no_wrap=True)
+        table.add_column("Blocks", justify="right", no_wrap=True)
+        table.add_column("Test", overflow="fold")
+        sizes = (
+            (test_id, usage.size) for test_id, usage in result.memory_usage.items()
+        )
+        for test_id, size in slowest(sizes, self.memory_limit):
+            if size <= 0:
+                break
+            blocks = result.memory_usage[test_id].blocks
+            table.add_row(format_size(int(size)), f"{blocks:+d}", Text(test_id))
+        if table.rows:
+            result.console.print(table)
+
+        class_totals: dict[str, list[int]] = {}
+        for test_id, (size, blocks) in result.memory_usage.items():
+            total = class_totals.setdefault(test_id.rpartition(".")[0], [0, 0, 0])
+            total[0] += size
+            total[1] += blocks
+            total[2] += 1
+        table = Table(title="Most memory growth by class", title_style=YELLOW)
+        table.add_column(size_column, justify="right", no_wrap=True)
+        table.add_column("Blocks", justify="right", no_wrap=True)
+        table.add_column("Tests", justify="right", no_wrap=True)
+        table.add_column("Class", overflow="fold")
+        sizes = ((label, total[0]) for label, total in class_totals.items())
+        for label, size in slowest(sizes, self.memory_limit):
+            if size <= 0:
+                break
+            _, blocks, tests = class_totals[label]
+            table.add_row(
+                format_size(int(size)), f"{blocks:+d}", f"{tests}", Text(label)
+            )
+        if table.rows:
+            result.console.print(table)
+
+        if sites:
+            table = Table(title="Top allocation sites", title_style=YELLOW)
+            table.add_column("Size", justify="right", no_wrap=True)
+            table.add_column("Blocks", justify="right", no_wrap=True)
+            table.add_column("Location", overflow="fold")
+            for location, size, blocks in sites:
+                table.add_row(format_size(size), f"{blocks:+d}", Text(location))
+            result.console.print(table)
+
+    def _printSlowdowns(self, result: RichTextTestResult) -> None:
+        assert self.duration_history is not None
+        slowdowns, count = self.duration_history.slowdowns(
+            result.test_durations,
+            factor=self.slowdown_factor,
+            min_increase=self.slowdown_min_increase,
+            min_runs=self.slowdown_min_runs,
+            limit=self.slowdown_limit,
+        )
+        if not slowdowns:
+            return
+
+        table = Table(title="Tests slower than usual", title_style=YELLOW)
+        table.add_column("Duration", justify="right", no_wrap=True)
+        table.add_column("Average", justify="right", no_wrap=True)
+        table.add_column("Test")
+        for test_id, elapsed, average in slowdowns:
+            table.add_row(f"{elapsed:.3f}s", f"{average:.3f}s", test_id)
+        if count > len(slowdowns):
+            table.caption = f"{count - len(slowdowns)} more not shown."
+        result.console.print(table)
+
+    def _printFlaky(self, result: RichTextTestResult) -> None:
+        if not result.flaky_tests:
+            return
+        table = Table(title="Flaky tests", title_style=YELLOW)
+        table.add_column("Passed on", justify="right", no_wrap=True)
+        if self.flaky_history is not None:
+            table.add_column("Flake rate", justify="right", no_wrap=True)
+        table.add_column("Test")
+        for test_id, rerun in result.flaky_tests.items():
+            row = [f"rerun {rerun}"]
+            if self.flaky_history is not None:
+                entry = self.flaky_history.get(test_id)
+                assert entry is not None
+                rate, runs = entry
+                row.append(f"{rate:.0%} of {runs} run(s)")
+            table.add_row(*row, test_id)
+        result.console.print(table)
+
     def _printDurations(self, result: RichTextTestResult) -> None:
         if not result.collectedDurations:
             return
-        ls = sorted(result.collectedDurations, key=lambda x: x[1], reverse=True)
-        if cast(int, self.durations) > 0:  # typeshed has a bad hint (?!)
-            ls = ls[: cast(int, self.durations)]
+        # typeshed has a bad hint (?!)
+        ls = slowest(result.collectedDurations, cast(int, self.durations))
 
         table = Table(title="Slowest test durations", title_style=YELLOW)
         table.add_column("Duration", justify="right", no_wrap=True)
@@ -250,7 +1985,940 @@ class RichTestRunner(unittest.TextTestRunner):
 
 
 class RichRunner(DiscoverRunner):
+    test_suite = RichTestSuite
+    parallel_test_suite = RichParallelTestSuite
     test_runner = RichTestRunner
+    # Limits for rendering local variables in failure tracebacks.
+    locals_limits = LocalsLimits()
+    # Limits for the structural diffs from --structural-diffs.
+    diff_limits = DiffLimits()
+    # Directory for files kept between runs, relative to the working directory.
+    cache_dir = ".django_rich_cache"
+    # Seconds between checks for changed files, with --watch.
+    watch_interval = 0.5
+
+    def __init__(
+        self,
+        *args: Any,
+        deferred_tracebacks: bool = False,
+        progress: bool = False,
+        duration_history: bool = False,
+        shard: tuple[int, int] | None = None,
+        class_durations: int | None = None,
+        module_durations: int | None = None,
+        export_durations: str | None = None,
+        query_counts: int | None = None,
+        query_sql: bool = False,
+        profile: str | None = None,
+        profile_dir: str | None = None,
+        memory: str | None = None,
+        async_output: bool = False,
+        junit_xml: str | None = None,
+        jsonl: str | None = None,
+        last_failed: bool = False,
+        failed_first: bool = False,
+        discovery_cache: bool = False,
+        timing_json: str | None = None,
+        aggregate_subtests: bool = False,
+        collapse_errors: bool = False,
+        timeout: float | None = None,
+        slow_warning: float | None = None,
+        spill_output: int | None = None,
+        structural_diffs: bool = False,
+        reruns: int = 0,
+        watch: bool = False,
+        record_impact: bool = False,
+        changed_since: str | None = None,
+        changed_files: list[str] | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.timing_json = timing_json
+        if kwargs.get("timing") or timing_json:
+            self.time_keeper = PhaseTimer()
+        # The console of the test result, to print the timing breakdown.
+        self._console: Console | None = None
+        self._timed_workers = False
+        self.deferred_tracebacks = deferred_tracebacks
+        self.progress = progress
+        if self.pdb and self.progress:
+            raise ValueError("You cannot use --pdb with --progress.")
+        self.duration_history = (
+            DurationHistory.load(self.cache_dir) if duration_history else None
+        )
+        self.shard = shard
+        self.class_durations = class_durations
+        self.module_durations = module_durations
+        self.export_durations = export_durations
+        self.query_counts = query_counts
+        self.query_sql = query_sql
+        self.profiler = None
+        if profile is not None or profile_dir is not None:
+            if self.parallel > 1:
+                raise ValueError(
+                    "You cannot use --profile with parallel tests; pass "
+                    + "--parallel=1 to use it."
+                )
+            self.profiler = Profiler(
+                pattern=profile if profile else None, dump_dir=profile_dir
+            )
+        self.memory = memory
+        self.async_output = async_output
+        self.junit_xml = junit_xml
+        self.jsonl = jsonl
+        self.last_failed = last_failed
+        self.failed_first = failed_first
+        self.aggregate_subtests = aggregate_subtests
+        self.collapse_errors = collapse_errors
+        self.timeout = timeout
+        self.slow_warning = slow_warning
+        self.spill_output = spill_output
+        self.structural_diffs = structural_diffs
+        self.reruns = reruns
+        self.flaky_history = FlakyHistory.load(self.cache_dir) if reruns else None
+        self.watch = watch
+        if self.pdb and self.watch:
+            raise ValueError("You cannot use --pdb with --watch.")
+        self._watching = False
+        self.record_impact = record_impact
+        if self.record_impact:
+            if self.parallel > 1:
+                raise ValueError(
+                    "You cannot use --record-impact with parallel tests; pass "
+                    + "--parallel=1 to use it."
+                )
+            if self.profiler is not None and sys.version_info < (3, 12):
+                raise ValueError(
+                    "You cannot use --profile with --record-impact before "
+                    + "Python 3.12."
+                )
+        # Files changed, to select the tests affected by them.
+        self.changed: set[str] | None = None
+        if changed_since is not None or changed_files:
+            self.changed = find_changed_files(changed_since, changed_files or ())
+        self.impact_index = None
+        if self.record_impact or self.changed is not None:
+            self.impact_index = ImpactIndex.load(self.cache_dir)
+        # Counts of selected and skipped tests, set by build_suite().
+        self.impact_selection: ImpactSelection | None = None
+        # Failed tests are always recorded, for later runs. The cache
+        # directory is only created once a test fails.
+        self.failed_tests = FailedTests.load(self.cache_dir)
+        self.discovery_index = None
+        if discovery_cache:
+            self.discovery_index = DiscoveryIndex.load(self.cache_dir)
+            self.test_loader = IndexedTestLoader(
+                self.discovery_index, self.tags, self.exclude_tags
+            )
+        # Time taken to load each label, and to build the whole suite, set by
+        # build_suite() when using the discovery cache.
+        self.discovery_stats: list[DiscoveryStats] = []
+        self.discovery_duration = 0.0
+        # Tests and expected duration for each shard, set by build_suite().
+        self.shard_loads: list[ShardLoad] = []
+        self._shard_has_history = False
+
+    @classmethod
+    def add_arguments(cls, parser: ArgumentParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--deferred-tracebacks",
+            action="store_true",
+            help=(
+                "Store compact snapshots of failure tracebacks and only render "
+                "them when printing the error list."
+            ),
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            help=(
+                "Show a live progress bar instead of dots or status lines, with "
+                "errors and failures printed as they happen."
+            ),
+        )
+        parser.add_argument(
+            "--duration-history",
+            action="store_true",
+            help=(
+                "Record test durations between runs, to run the slowest parallel "
+                "test cases first, estimate the time remaining, and report tests "
+                "slower than usual."
+            ),
+        )
+        parser.add_argument(
+            "--shard",
+            type=parse_shard,
+            metavar="INDEX/COUNT",
+            help=(
+                "Only run shard INDEX of COUNT, such as 1/4, balanced by recorded "
+                "test durations. Test case classes are kept together."
+            ),
+        )
+        parser.add_argument(
+            "--class-durations",
+            type=int,
+            metavar="N",
+            help=(
+                "Show the N slowest test case classes, including class fixtures "
+                "such as setUpClass() and setUpTestData() (N=0 for all)."
+            ),
+        )
+        parser.add_argument(
+            "--module-durations",
+            type=int,
+            metavar="N",
+            help="Show the N slowest test modules (N=0 for all).",
+        )
+        parser.add_argument(
+            "--export-durations",
+            metavar="PATH",
+            help="Write all test, class, and module durations to a JSON file.",
+        )
+        parser.add_argument(
+            "--query-counts",
+            type=int,
+            metavar="N",
+            help=(
+                "Record database queries for each test, and show the N tests "
+                "with the most queries (N=0 for all)."
+            ),
+        )
+        parser.add_argument(
+            "--query-sql",
+            action="store_true",
+            help=(
+                "With --query-counts, keep the SQL of each query, to show the "
+                "most repeated statement for each test."
+            ),
+        )
+        parser.add_argument(
+            "--profile",
+            nargs="?",
+            const="",
+            metavar="PATTERN",
+            help=(
+                "Profile tests with cProfile, or only those matching PATTERN, "
+                "and show the hottest functions."
+            ),
+        )
+        parser.add_argument(
+            "--profile-dir",
+            metavar="DIR",
+            help="Profile tests and write a .pstats file for each test class to DIR.",
+        )
+        parser.add_argument(
+            "--memory",
+            choices=MEMORY_MODES,
+            help=(
+                "Measure the net memory growth of each test, from its resident "
+                "set size (rss), or with tracemalloc, which is slower but also "
+                "shows the top allocation sites."
+            ),
+        )
+        parser.add_argument(
+            "--async-output",
+            action="store_true",
+            help=(
+                "Write test output from a background thread, so a slow output "
+                "stream doesn't block tests."
+            ),
+        )
+        parser.add_argument(
+            "--junit-xml",
+            metavar="PATH",
+            help="Write a JUnit XML report of test results to PATH.",
+        )
+        parser.add_argument(
+            "--jsonl",
+            metavar="PATH",
+            help="Write a JSON Lines report of test results to PATH.",
+        )
+        parser.add_argument(
+            "--last-failed",
+            "--lf",
+            action="store_true",
+            help=(
+                "Only run the tests that failed in previous runs, or all tests "
+                "if none did."
+            ),
+        )
+        parser.add_argument(
+            "--failed-first",
+            "--ff",
+            action="store_true",
+            help="Run the tests that failed in previous runs first, then the rest.",
+        )
+        parser.add_argument(
+            "--timing-json",
+            metavar="PATH",
+            help=(
+                "Write the timing breakdown of the run to a JSON file. Implies "
+                "--timing."
+            ),
+        )
+        parser.add_argument(
+            "--discovery-cache",
+            action="store_true",
+            help=(
+                "Index the tests in each test module between runs, to skip "
+                "importing unchanged modules without tests matching -k, --tag, "
+                "or --exclude-tag, and show how long discovery took."
+            ),
+        )
+        parser.add_argument(
+            "--aggregate-subtests",
+            action="store_true",
+            help=(
+                "Report subtests as one status per test, with counts of passed "
+                "and failed subtests, and group failing subtests with the same "
+                "message, parameter names, and exception."
+            ),
+        )
+        parser.add_argument(
+            "--collapse-errors",
+            action="store_true",
+            help=(
+                "Print the traceback of errors with the same exception, "
+                "message, innermost frames, and captured output once, followed "
+                "by a table of the other tests that raised them."
+            ),
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            metavar="SECONDS",
+            help=(
+                "Fail tests that run for longer than SECONDS with an error, after "
+                "printing the stacks of all threads."
+            ),
+        )
+        parser.add_argument(
+            "--slow-warning",
+            type=float,
+            metavar="SECONDS",
+            help="Print a warning while a test has run for longer than SECONDS.",
+        )
+        parser.add_argument(
+            "--spill-output",
+            type=int,
+            metavar="CHARS",
+            help=(
+                "With --buffer, write captured output over CHARS characters to "
+                "temporary files, read back only to print errors and write "
+                "reports."
+            ),
+        )
+        parser.add_argument(
+            "--structural-diffs",
+            action="store_true",
+            help=(
+                "Show failures of assertEqual() on dicts, lists, tuples, and "
+                "strings as bounded diffs of the changed paths, rather than "
+                "unittest's full diffs."
+            ),
+        )
+        parser.add_argument(
+            "--reruns",
+            type=int,
+            default=0,
+            metavar="N",
+            help=(
+                "Rerun failed tests up to N times in the same process, reporting "
+                "those that then pass as flaky, rather than failed, and recording "
+                "their flake rates."
+            ),
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help=(
+                "After running the tests, watch the project's modules for "
+                "changes, then reload them and rerun the test modules that "
+                "import them, keeping the test databases."
+            ),
+        )
+        parser.add_argument(
+            "--record-impact",
+            action="store_true",
+            help=(
+                "Record the project's source files that each test case class "
+                "runs, to select tests with --changed-since or --changed-files."
+            ),
+        )
+        parser.add_argument(
+            "--changed-since",
+            metavar="REF",
+            help=(
+                "Only run the tests that ran files changed since the git commit "
+                "REF, as recorded by --record-impact, and tests not recorded."
+            ),
+        )
+        parser.add_argument(
+            "--changed-files",
+            action="append",
+            metavar="PATH",
+            help=(
+                "Only run the tests that ran the file PATH, as recorded by "
+                "--record-impact, and tests not recorded. Can be repeated."
+            ),
+        )
+
+    def get_test_runner_kwargs(self) -> dict[str, Any]:
+        kwargs = super().get_test_runner_kwargs()
+        kwargs["deferred_tracebacks"] = self.deferred_tracebacks
+        kwargs["locals_limits"] = self.locals_limits
+        kwargs["progress"] = self.progress
+        kwargs["duration_history"] = self.duration_history
+        kwargs["class_durations"] = self.class_durations
+        kwargs["module_durations"] = self.module_durations
+        kwargs["export_durations"] = self.export_durations
+        kwargs["query_counts"] = self.query_counts
+        kwargs["keep_query_sql"] = self.query_sql
+        kwargs["profiler"] = self.profiler
+        kwargs["memory"] = self.memory
+        kwargs["async_output"] = self.async_output
+        kwargs["junit_xml"] = self.junit_xml
+        kwargs["jsonl"] = self.jsonl
+        kwargs["aggregate_subtests"] = self.aggregate_subtests
+        kwargs["collapse_errors"] = self.collapse_errors
+        kwargs["timeout"] = self.timeout
+        kwargs["slow_warning"] = self.slow_warning
+        kwargs["spill_output"] = self.spill_output
+        if self.structural_diffs:
+            kwargs["diff_limits"] = self.diff_limits
+        kwargs["reruns"] = self.reruns
+        kwargs["flaky_history"] = self.flaky_history
+        if self.record_impact:
+            kwargs["impact_index"] = self.impact_index
+        return kwargs
+
+    def run_tests(self, *args: Any, **kwargs: Any) -> int:
+        timer = self.time_keeper
+        if not isinstance(timer, PhaseTimer):
+            return super().run_tests(*args, **kwargs)
+        start = time.perf_counter()
+        failures = super().run_tests(*args, **kwargs)
+        timer.root.duration = time.perf_counter() - start
+        self._print_phases(timer)
+        if self.timing_json is not None:
+            timer.write_json(self.timing_json)
+        return failures
+
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        with self.time_keeper.timed("Test environment setup"):
+            super().setup_test_environment(**kwargs)
+
+    def setup_databases(self, **kwargs: Any) -> list[tuple[Any, str, bool]]:
+        timer = self.time_keeper
+        if not isinstance(timer, PhaseTimer):
+            return super().setup_databases(**kwargs)
+        with time_database_setup(timer):
+            return super().setup_databases(**kwargs)
+
+    def run_checks(self, databases: set[str]) -> None:
+        with self.time_keeper.timed("System checks"):
+            super().run_checks(databases)
+
+    def teardown_test_environment(self, **kwargs: Any) -> None:
+        with self.time_keeper.timed("Test environment teardown"):
+            super().teardown_test_environment(**kwargs)
+
+    def load_tests_for_label(
+        self, label: str, discover_kwargs: dict[str, Any]
+    ) -> unittest.TestSuite:
+        loader = self.test_loader
+        if not isinstance(loader, IndexedTestLoader):
+            return super().load_tests_for_label(label, discover_kwargs)
+        loader.reset_counts()
+        start = time.perf_counter()
+        tests = super().load_tests_for_label(label, discover_kwargs)
+        self.discovery_stats.append(
+            DiscoveryStats(
+                label,
+                loader.imported,
+                loader.skipped,
+                tests.countTestCases(),
+                time.perf_counter() - start,
+            )
+        )
+        return tests
+
+    def build_suite(self, *args: Any, **kwargs: Any) -> unittest.TestSuite:
+        start = time.perf_counter()
+        with self.time_keeper.timed("Test discovery"):
+            suite = super().build_suite(*args, **kwargs)
+        if self.discovery_index is not None:
+            self.discovery_duration = time.perf_counter() - start
+            self.discovery_index.save()
+        if self.changed is not None and not self._watching:
+            suite = self._select_changed(suite)
+        if self.last_failed or self.failed_first:
+            suite = self._select_failed(suite)
+        if self.shard is not None:
+            suite = self._select_shard(suite)
+        if (
+            self.duration_history is not None
+            and isinstance(suite, ParallelTestSuite)
+            and not self.shuffle
+            and not self.reverse
+        ):
+            suite.subsuites = self._order_subsuites(suite.subsuites)
+        return suite
+
+    def _select_shard(self, suite: unittest.TestSuite) -> unittest.TestSuite:
+        """
+        Keep only the test cases in this runner's shard. Test cases are
+        assigned to shards balancing their expected durations, from the
+        duration history if there is one, or else their number of tests.
+        """
+        assert self.shard is not None
+        index, count = self.shard
+        if isinstance(suite, ParallelTestSuite):
+            groups = suite.subsuites
+        else:
+            groups = partition_suite_by_case(suite)
+
+        history = self.duration_history
+        if history is None:
+            history = DurationHistory.load(self.cache_dir)
+        self._shard_has_history = bool(history.entries)
+        default = history.default() if history.entries else 1.0
+        group_ids = [[t.id() for t in iter_test_cases(group)] for group in groups]
+        estimates = [estimate_group(history, ids, default) for ids in group_ids]
+        assignments = assign_shards([ids[0] for ids in group_ids], estimates, count)
+
+        loads = [[0, 0.0] for _ in range(count)]
+        for ids, estimate, shard in zip(group_ids, estimates, assignments):
+            loads[shard][0] += len(ids)
+            loads[shard][1] += estimate
+        self.shard_loads = [
+            ShardLoad(int(tests), expected) for tests, expected in loads
+        ]
+
+        selected = [g for g, shard in zip(groups, assignments) if shard == index - 1]
+        self.log(
+            f"Running shard {index}/{count}: "
+            + f"{self.shard_loads[index - 1].tests} test(s)."
+        )
+        if isinstance(suite, ParallelTestSuite):
+            suite.subsuites = selected
+            suite.processes = max(1, min(suite.processes, len(selected)))
+            return suite
+        return self.test_suite(t for group in selected for t in group)
+
+    def _select_changed(self, suite: unittest.TestSuite) -> unittest.TestSuite:
+        """
+        Keep only the test cases that ran the changed files, according to the
+        impact index, and those missing from it. All tests are kept when
+        Python files changed that no recorded test case ran, such as settings
+        or modules that only run when imported.
+        """
+        assert self.changed is not None and self.impact_index is not None
+        index = self.impact_index
+        if not index.classes:
+            self.log(
+                "No impact index, running all tests. "
+                + "Use --record-impact to record one."
+            )
+            return suite
+        if isinstance(suite, ParallelTestSuite):
+            groups = suite.subsuites
+        else:
+            groups = partition_suite_by_case(suite)
+
+        root = Path.cwd()
+        labels = []
+        known_files = index.files()
+        for group in groups:
+            test_class = type(next(iter_test_cases(group)))
+            labels.append(strclass(test_class))
+            module = sys.modules.get(test_class.__module__)
+            filename = getattr(module, "__file__", None)
+            if filename is not None and is_project_file(filename, root):
+                known_files.add(Path(filename).relative_to(root).as_posix())
+        unknown = sorted(
+            path
+            for path in self.changed
+            if path.endswith(".py") and path not in known_files
+        )
+        if unknown:
+            self.log(
+                "Running all tests, as no recorded tests ran these changed "
+                + f"files: {', '.join(unknown)}"
+            )
+            return suite
+
+        affected = index.affected(self.changed)
+        selected = []
+        skipped = []
+        unrecorded = 0
+        for group, label in zip(groups, labels):
+            if label not in index.classes:
+                unrecorded += 1
+                selected.append(group)
+            elif label in affected:
+                selected.append(group)
+            else:
+                skipped.append(group)
+        selected_tests = sum(group.countTestCases() for group in selected)
+        self.impact_selection = ImpactSelection(
+            changed_files=len(self.changed),
+            selected_classes=len(selected),
+            selected_tests=selected_tests,
+            skipped_classes=len(skipped),
+            skipped_tests=sum(group.countTestCases() for group in skipped),
+            unrecorded_classes=unrecorded,
+        )
+        self.log(
+            f"Running {selected_tests} test(s) affected by "
+            + f"{len(self.changed)} changed file(s)."
+        )
+        if isinstance(suite, ParallelTestSuite):
+            suite.subsuites = selected
+            suite.processes = max(1, min(suite.processes, len(selected)))
+            return suite
+        return self.test_suite(t for group in selected for t in group)
+
+    def _select_failed(self, suite: unittest.TestSuite) -> unittest.TestSuite:
+        """
+        With --last-failed, keep only previously failed tests. Otherwise, with
+        --failed-first, run them first. Test cases are kept together, with
+        failed tests first, and Django's ordering of test types is kept.
+        """
+        if isinstance(suite, ParallelTestSuite):
+            groups = suite.subsuites
+        else:
+            groups = partition_suite_by_case(suite)
+
+        split_groups = []
+        failed_count = 0
+        for group in groups:
+            failed: list[TestCase] = []
+            passed: list[TestCase] = []
+            for test in iter_test_cases(group):
+                (failed if self.failed_tests.matches(test) else passed).append(test)
+            split_groups.append((group, failed, passed))
+            failed_count += len(failed)
+        if not failed_count:
+            if self.last_failed:
+                self.log("No tests failed previously, running all tests.")
+            return suite
+
+        if self.last_failed:
+            self.log(f"Running {failed_count} test(s) that failed previously.")
+            selected = [
+                (False, type(group)(failed))
+                for group, failed, _ in split_groups
+                if failed
+            ]
+        else:
+            self.log(f"Running {failed_count} test(s) that failed previously first.")
+            selected = sorted(
+                (
+                    (not failed, type(group)(failed + passed))
+                    for group, failed, passed in split_groups
+                ),
+                key=lambda item: (
+                    self._type_index(next(iter_test_cases(item[1]))),
+                    item[0],
+                ),
+            )
+        subsuites = [group for _, group in selected]
+        if isinstance(suite, ParallelTestSuite):
+            suite.subsuites = subsuites
+            suite.processes = max(1, min(suite.processes, len(subsuites)))
+            return suite
+        return self.test_suite(t for group in subsuites for t in group)
+
+    def _order_subsuites(
+        self, subsuites: list[unittest.TestSuite]
+    ) -> list[unittest.TestSuite]:
+        """
+        Order test cases longest first, so the slowest don't start last and
+        leave other workers idle. Django's ordering of test types is kept.
+        """
+        assert self.duration_history is not None
+        history = self.duration_history
+        default = history.default()
+
+        def key(subsuite: unittest.TestSuite) -> tuple[int, float]:
+            tests = list(iter_test_cases(subsuite))
+            estimate = history.estimate((t.id() for t in tests), default)
+            return (self._type_index(tests[0]), -estimate)
+
+        return sorted(subsuites, key=key)
+
+    def _type_index(self, test: TestCase) -> int:
+        """
+        The position of the test's type in Django's ordering of test types.
+        """
+        test_types = (unittest.loader._FailedTest, *self.reorder_by)  # type: ignore [attr-defined]
+        return next(
+            (i for i, t in enumerate(test_types) if isinstance(test, t)),
+            len(test_types),
+        )
+
+    def run_suite(
+        self, suite: unittest.TestSuite, **kwargs: Any
+    ) -> unittest.TextTestResult:
+        start = time.perf_counter()
+        watch = self.watch and not self._watching
+        if watch:
+            # Suites drop their tests as they run.
+            test_modules = {type(test).__module__ for test in iter_test_cases(suite)}
+        with self.time_keeper.timed("Tests"):
+            result = super().run_suite(suite, **kwargs)
+            if isinstance(result, RichTextTestResult) and result.worker_startups:
+                self._add_worker_startups(result.worker_startups)
+        if isinstance(result, RichTextTestResult):
+            self._console = result.console
+            self._record_failed(result)
+        if self.shard is not None and isinstance(result, RichTextTestResult):
+            self._print_shard_summary(result.console, time.perf_counter() - start)
+        if self.discovery_index is not None and isinstance(result, RichTextTestResult):
+            self._print_discovery(result.console)
+        if (
+            self.impact_selection is not None
+            and not self._watching
+            and isinstance(result, RichTextTestResult)
+        ):
+            self._print_impact(result.console)
+        if watch:
+            self._watching = True
+            try:
+                result = self._watch_changes(test_modules, result)
+            finally:
+                self._watching = False
+        return result
+
+    def _watch_changes(
+        self, test_modules: set[str], result: unittest.TextTestResult
+    ) -> unittest.TextTestResult:
+        """
+        Until interrupted, wait for changes to the project's modules, then
+        reload them, and rerun the test modules that import them. Return the
+        result of the last run.
+        """
+        console = self._console or Console(stderr=True)
+        graph = ImportGraph(Path.cwd())
+        graph.add_modules(list(sys.modules.values()))
+        watcher = FileWatcher(graph.files.values())
+        # Reloading these would register models or change settings again.
+        restart_modules = {
+            app_config.models_module.__name__
+            for app_config in apps.get_app_configs()
+            if app_config.models_module is not None
+        }
+        restart_modules.add(settings.SETTINGS_MODULE)
+        try:
+            while True:
+                changed = self._wait_for_changes(console, watcher)
+                changed_modules = {
+                    name
+                    for filename in changed
+                    if (name := graph.module_for_file(filename)) is not None
+                }
+                console.print(
+                    Rule(
+                        "Changed: "
+                        + ", ".join(os.path.relpath(f) for f in sorted(changed)),
+                        style=DJANGO_GREEN,
+                    )
+                )
+                if changed_modules & restart_modules:
+                    console.print(
+                        "Restart to use changes to models or settings.", style=YELLOW
+                    )
+                    continue
+                affected = graph.dependents(changed_modules)
+                rerun = sorted(affected & test_modules)
+                if not rerun:
+                    console.print("No test modules import the changed files.")
+                    continue
+                # Only modules that tests depend on, so others, such as admin
+                # modules, don't run their registrations again.
+                to_reload = affected & graph.dependencies(rerun)
+                try:
+                    for name in graph.reload_order(to_reload):
+                        importlib.reload(sys.modules[name])
+                except Exception:
+                    console.print(Traceback(suppress=[importlib]))
+                    continue
+                finally:
+                    graph.add_modules(sys.modules[name] for name in to_reload)
+                suite = self.build_suite(rerun)
+                test_modules.update(
+                    type(test).__module__ for test in iter_test_cases(suite)
+                )
+                result = self.run_suite(suite)
+                # Watch modules imported for the first time.
+                graph.add_modules(
+                    module
+                    for name, module in list(sys.modules.items())
+                    if name not in graph.files
+                )
+                watcher.add(graph.files.values())
+        except KeyboardInterrupt:
+            console.print()
+        return result
+
+    # Without unittest's handler, which only stops the running tests, so that
+    # Ctrl+C stops watching at once.
+    @unittest.removeHandler
+    def _wait_for_changes(self, console: Console, watcher: FileWatcher) -> set[str]:
+        console.print(
+            f"Watching {len(watcher.stamps)} files for changes. "
+            + "Press Ctrl+C to stop.",
+            style="table.caption",
+            highlight=False,
+        )
+        changed: set[str] = set()
+        while True:
+            time.sleep(self.watch_interval)
+            found = watcher.changed()
+            if not found and changed:
+                # Editors have finished writing.
+                return changed
+            changed.update(found)
+
+    def _record_failed(self, result: RichTextTestResult) -> None:
+        failed = [
+            test.test_case.id() if isinstance(test, _SubTest) else test.id()
+            for test in chain(
+                # Debug SQL results add the queries to each error.
+                (error[0] for error in result.errors),
+                (failure[0] for failure in result.failures),
+                result.unexpectedSuccesses,
+            )
+        ]
+        self.failed_tests.update(result.test_durations, failed)
+        self.failed_tests.save()
+
+    def _print_shard_summary(self, console: Console, actual: float) -> None:
+        assert self.shard is not None
+        index, count = self.shard
+        table = Table(title=f"Shard {index}/{count}", title_style=DJANGO_GREEN)
+        table.add_column("Shard", justify="right")
+        table.add_column("Tests", justify="right")
+        table.add_column("Expected", justify="right")
+        table.add_column("Actual", justify="right")
+        for i, (tests, expected) in enumerate(self.shard_loads, start=1):
+            is_current = i == index
+            table.add_row(
+                f"{i}",
+                f"{tests}",
+                f"{expected:.2f}s" if self._shard_has_history else "-",
+                f"{actual:.2f}s" if is_current else "",
+                style="bold" if is_current else None,
+            )
+        console.print(table)
+        if not self._shard_has_history:
+            console.print(
+                "No duration history, so shards were balanced by test count. "
+                + "Use --duration-history to record durations.",
+                style="table.caption",
+                highlight=False,
+            )
+
+    def _print_impact(self, console: Console) -> None:
+        selection = self.impact_selection
+        assert selection is not None
+        table = Table(title="Test impact", title_style=DJANGO_GREEN)
+        table.add_column("")
+        table.add_column("Classes", justify="right")
+        table.add_column("Tests", justify="right")
+        table.add_row(
+            "Selected",
+            f"{selection.selected_classes}",
+            f"{selection.selected_tests}",
+        )
+        table.add_row(
+            "Skipped",
+            f"{selection.skipped_classes}",
+            f"{selection.skipped_tests}",
+        )
+        console.print(table)
+        caption = (
+            f"Selected classes ran any of the {selection.changed_files} "
+            + "changed file(s)"
+        )
+        if selection.unrecorded_classes:
+            caption += (
+                ", or are missing from the impact index "
+                + f"({selection.unrecorded_classes})"
+            )
+        console.print(caption + ".", style="table.caption", highlight=False)
+
+    def _add_worker_startups(self, startups: list[float]) -> None:
+        timer = self.time_keeper
+        if isinstance(timer, PhaseTimer):
+            # Workers start concurrently, so the slowest delays the run.
+            timer.add("Worker startup", max(startups), count=len(startups))
+            self._timed_workers = True
+
+    def _print_phases(self, timer: PhaseTimer) -> None:
+        console = self._console
+        if console is None:
+            console = Console(stderr=True)
+        total = timer.root.duration
+
+        def label(phase: Phase) -> Text:
+            text = Text(phase.name)
+            if phase.count > 1:
+                text.append(f" ×{phase.count}", style="dim")
+            text.append(f"  {phase.duration:.3f}s")
+            if total:
+                text.append(f" ({phase.duration / total:.0%})", style="dim")
+            return text
+
+        def add(tree: Tree, phase: Phase) -> None:
+            for child in phase.children:
+                add(tree.add(label(child)), child)
+
+        tree = Tree(label(timer.root), guide_style=DJANGO_GREEN)
+        add(tree, timer.root)
+        console.print(Text("Timing", style=DJANGO_GREEN))
+        console.print(tree)
+        if self._timed_workers:
+            console.print(
+                "Worker startup is the slowest parallel worker's setup, "
+                + "including connecting to its cloned databases.",
+                style="table.caption",
+                highlight=False,
+            )
+
+    def _print_discovery(self, console: Console) -> None:
+        table = Table(title="Test discovery", title_style=DJANGO_GREEN)
+        table.add_column("Label")
+        table.add_column("Imported", justify="right")
+        table.add_column("Skipped", justify="right")
+        table.add_column("Tests", justify="right")
+        table.add_column("Time", justify="right")
+        for stats in self.discovery_stats:
+            table.add_row(
+                stats.label,
+                f"{stats.imported}",
+                f"{stats.skipped}",
+                f"{stats.tests}",
+                f"{stats.duration:.3f}s",
+            )
+        table.add_section()
+        table.add_row(
+            "Total",
+            f"{sum(stats.imported for stats in self.discovery_stats)}",
+            f"{sum(stats.skipped for stats in self.discovery_stats)}",
+            f"{sum(stats.tests for stats in self.discovery_stats)}",
+            f"{self.discovery_duration:.3f}s",
+            style="bold",
+        )
+        console.print(table)
+        console.print(
+            "Imported and skipped count test modules found by discovery. "
+            + "Total time includes filtering and ordering tests.",
+            style="table.caption",
+            highlight=False,
+        )
 
     def get_resultclass(self) -> type[unittest.TextTestResult] | None:
         if self.debug_sql:
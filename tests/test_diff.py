@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import random
+import unittest
+
+from django.test import SimpleTestCase
+
+from django_rich._diff import DiffLimits, _opcodes, structural_diff, structural_diffs
+
+
+class StructuralDiffTests(SimpleTestCase):
+    def test_dicts(self):
+        lines = structural_diff(
+            {"a": 1, "b": {"c": [1, 2, 3]}, "d": "x"},
+            {"a": 2, "b": {"c": [1, 3, 4]}, "e": "y"},
+            DiffLimits(),
+        )
+        assert lines == [
+            "~ ['a']: 1 != 2",
+            "- ['b']['c'][1]: 2",
+            "+ ['b']['c'][2]: 4",
+            "- ['d']: 'x'",
+            "+ ['e']: 'y'",
+        ]
+
+    def test_long_list(self):
+        first = [{"id": i, "name": f"User {i}"} for i in range(100_000)]
+        second = [dict(item) for item in first]
+        second[10]["name"] = "Changed"
+        del second[50_000]
+        second.insert(80_000, {"id": -1})
+        lines = structural_diff(first, second, DiffLimits(time_budget=None))
+        assert lines == [
+            "~ [10]['name']: 'User 10' != 'Changed'",
+            "- [50000]: {'id': 50000, 'name': 'User 50000'}",
+            "+ [80000]: {'id': -1}",
+        ]
+
+    def test_strings(self):
+        first = "".join(f"line {i}\n" for i in range(20))
+        second = first.replace("line 10\n", "line ten\n")
+        lines = structural_diff({"body": first}, {"body": second}, DiffLimits())
+        assert lines == [
+            "~ ['body']:",
+            "  @@ -9,5 +9,5 @@",
+            "    line 8",
+            "    line 9",
+            "  - line 10",
+            "  + line ten",
+            "    line 11",
+            "    line 12",
+        ]
+
+    def test_strings_repeated_lines(self):
+        first = "".join(f"row {i % 3}\n" for i in range(150)) + "end\n"
+        second = "start\n" + "".join(f"row {i % 3}\n" for i in range(150))
+        lines = structural_diff(first, second, DiffLimits(time_budget=None))
+        assert lines == [
+            "@@ -1,2 +1,3 @@",
+            "+ start",
+            "  row 0",
+            "  row 1",
+            "@@ -149,3 +150,2 @@",
+            "  row 1",
+            "  row 2",
+            "- end",
+        ]
+
+    def test_strings_line_endings(self):
+        lines = structural_diff("a\nb \nc\n", "a\nb\nc\n", DiffLimits(context=0))
+        assert lines == ["@@ -2,1 +2,1 @@", "- 'b \\n'", "+ 'b\\n'"]
+
+    def test_long_string(self):
+        first = "x" * 500 + "a" + "y" * 500
+        second = "x" * 500 + "b" + "y" * 500
+        [line] = structural_diff(first, second, DiffLimits())
+        assert line.startswith("~ differs at character 500: …'xxx")
+        assert "a" + "y" * 29 + "'…" in line
+        assert len(line) < 200
+
+    def test_max_lines(self):
+        lines = structural_diff(
+            list(range(100)), [-i for i in range(100)], DiffLimits(max_lines=3)
+        )
+        assert lines == [
+            "~ [1]: 1 != -1",
+            "~ [2]: 2 != -2",
+            "~ [3]: 3 != -3",
+            "… diff cut short at 3 lines",
+        ]
+
+    def test_time_budget(self):
+        lines = structural_diff(
+            list(range(10_000)), list(range(1, 10_000)) + [0], DiffLimits(time_budget=0)
+        )
+        assert lines == ["… diff stopped after 0s"]
+
+
+class OpcodesTests(SimpleTestCase):
+    def test_reconstructs(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            first = [rng.randrange(5) for _ in range(rng.randrange(30))]
+            second = [rng.randrange(5) for _ in range(rng.randrange(30))]
+            rebuilt = []
+            for tag, i1, i2, j1, j2 in _opcodes(first, second, lambda: None):
+                if tag == "equal":
+                    assert first[i1:i2] == second[j1:j2]
+                rebuilt.extend(second[j1:j2])
+            assert rebuilt == second
+
+    def test_no_unique_elements(self):
+        first = [i % 3 for i in range(200)] + ["x"]
+        second = ["y"] + [i % 3 for i in range(1, 201)]
+        codes = _opcodes(first, second, lambda: None)
+        assert [code for code in codes if code[0] != "equal"] == [
+            ("replace", 0, 1, 0, 1),
+            ("replace", 200, 201, 200, 201),
+        ]
+
+    def test_no_unique_elements_reconstructs(self):
+        rng = random.Random(42)
+        first = [rng.randrange(3) for _ in range(1000)]
+        second = [rng.randrange(3) for _ in range(900)]
+        rebuilt = []
+        for tag, i1, i2, j1, j2 in _opcodes(first, second, lambda: None):
+            if tag == "equal":
+                assert first[i1:i2] == second[j1:j2]
+            rebuilt.extend(second[j1:j2])
+        assert rebuilt == second
+
+    def test_long_sequences(self):
+        first = list(range(100_000))
+        second = first[:10] + [-1] + first[10:70_000] + first[70_001:]
+        codes = _opcodes(first, second, lambda: None)
+        assert [code for code in codes if code[0] != "equal"] == [
+            ("insert", 10, 10, 10, 11),
+            ("delete", 70_000, 70_001, 70_001, 70_001),
+        ]
+
+
+class StructuralDiffsTests(SimpleTestCase):
+    def test_message(self):
+        class Example(unittest.TestCase):
+            def runTest(self):
+                pass
+
+        test = Example()
+        with (
+            structural_diffs(DiffLimits()),
+            self.assertRaises(AssertionError) as context,
+        ):
+            test.assertEqual({"a": [1, 2]}, {"a": [1, 3]}, "Oops")
+        assert str(context.exception) == (
+            "{'a': [1, 2]} != {'a': [1, 3]}\n~ ['a'][1]: 2 != 3 : Oops"
+        )
+        with self.assertRaises(AssertionError) as context:
+            test.assertEqual({"a": [1, 2]}, {"a": [1, 3]})
+        assert "?" in str(context.exception)
+
+    def test_wrong_type(self):
+        with (
+            structural_diffs(DiffLimits()),
+            self.assertRaisesMessage(AssertionError, "First sequence is not"),
+        ):
+            self.assertListEqual((1,), [1])  # type: ignore [arg-type]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.test import SimpleTestCase, tag
+from django.test.utils import iter_test_cases  # type: ignore [attr-defined]
+
+from django_rich._discovery import (
+    CachedTest,
+    DiscoveryIndex,
+    IndexedTestLoader,
+    get_test_tags,
+)
+
+MODULE_ONE = """\
+from django.test import SimpleTestCase, tag
+
+
+class OneTests(SimpleTestCase):
+    def test_a(self):
+        pass
+
+    @tag("slow")
+    def test_b(self):
+        pass
+"""
+
+MODULE_TWO = """\
+from django.test import SimpleTestCase
+
+
+class TwoTests(SimpleTestCase):
+    def test_c(self):
+        pass
+"""
+
+
+@contextmanager
+def temp_test_dir() -> Iterator[Path]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir)
+        (path / "test_discovery_one.py").write_text(MODULE_ONE)
+        (path / "test_discovery_two.py").write_text(MODULE_TWO)
+        try:
+            yield path
+        finally:
+            sys.modules.pop("test_discovery_one", None)
+            sys.modules.pop("test_discovery_two", None)
+            if tmp_dir in sys.path:
+                sys.path.remove(tmp_dir)
+
+
+def discover(
+    index: DiscoveryIndex,
+    path: Path,
+    patterns: list[str] | None = None,
+    tags: list[str] | None = None,
+) -> tuple[IndexedTestLoader, list[str]]:
+    loader = IndexedTestLoader(index, tags or ())
+    loader.testNamePatterns = patterns
+    suite = loader.discover(str(path), top_level_dir=str(path))
+    return loader, sorted(test.id() for test in iter_test_cases(suite))
+
+
+class DiscoveryIndexTests(SimpleTestCase):
+    def test_load_missing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index = DiscoveryIndex.load(Path(tmp_dir) / "cache")
+            assert index.entries == {}
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir) / "cache"
+            index = DiscoveryIndex.load(cache_dir)
+            index.record(__file__, [self])
+            index.save()
+            data = json.loads((cache_dir / "discovery.json").read_text())
+            assert data["version"] == 1
+            assert DiscoveryIndex.load(cache_dir).get(__file__) == [
+                CachedTest(self.id(), frozenset())
+            ]
+
+    def test_save_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir) / "cache"
+            DiscoveryIndex.load(cache_dir).save()
+            assert not cache_dir.exists()
+
+    def test_save_forgets_deleted(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            module = Path(tmp_dir) / "test_deleted.py"
+            index = DiscoveryIndex(Path(tmp_dir) / "discovery.json", {})
+            index.entries[str(module)] = {"files": {}, "tests": []}
+            index.save()
+            assert index.entries == {}
+
+    def test_get_changed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            module = Path(tmp_dir) / "test_changed.py"
+            module.write_text("")
+            index = DiscoveryIndex(Path(tmp_dir) / "discovery.json", {})
+            index.record(str(module), [])
+            assert index.get(str(module)) == []
+            module.write_text("# Changed\n")
+            assert DiscoveryIndex(index.path, index.entries).get(str(module)) is None
+
+    def test_get_tags(self):
+        # Defined here, as pytest-django turns tags into unknown markers.
+        class ExampleTests(SimpleTestCase):
+            @tag("a")
+            def test_tagged(self):
+                pass
+
+        @tag("b")
+        class TaggedTests(ExampleTests):
+            pass
+
+        assert get_test_tags(ExampleTests("test_tagged")) == {"a"}
+        assert get_test_tags(TaggedTests("test_tagged")) == {"a", "b"}
+
+
+class IndexedTestLoaderTests(SimpleTestCase):
+    def test_patterns(self):
+        with temp_test_dir() as path:
+            index = DiscoveryIndex(path / "discovery.json", {})
+            loader, test_ids = discover(index, path, ["*test_b*"])
+            assert test_ids == ["test_discovery_one.OneTests.test_b"]
+            assert (loader.imported, loader.skipped) == (2, 0)
+
+            sys.modules.pop("test_discovery_one")
+            sys.modules.pop("test_discovery_two")
+            loader, test_ids = discover(index, path, ["*test_b*"])
+            assert test_ids == ["test_discovery_one.OneTests.test_b"]
+            assert (loader.imported, loader.skipped) == (1, 1)
+
+    def test_tags(self):
+        with temp_test_dir() as path:
+            index = DiscoveryIndex(path / "discovery.json", {})
+            discover(index, path)
+            loader, test_ids = discover(index, path, tags=["slow"])
+            # Tags are filtered later, by DiscoverRunner.build_suite().
+            assert test_ids == [
+                "test_discovery_one.OneTests.test_a",
+                "test_discovery_one.OneTests.test_b",
+            ]
+            assert (loader.imported, loader.skipped) == (1, 1)
+
+    def test_no_filters(self):
+        with temp_test_dir() as path:
+            index = DiscoveryIndex(path / "discovery.json", {})
+            discover(index, path)
+            loader, test_ids = discover(index, path)
+            assert len(test_ids) == 3
+            assert (loader.imported, loader.skipped) == (2, 0)
+
+    def test_changed(self):
+        with temp_test_dir() as path:
+            index = DiscoveryIndex(path / "discovery.json", {})
+            discover(index, path, ["*test_b*"])
+            (path / "test_discovery_two.py").write_text(
+                MODULE_TWO + "\n    def test_b(self):\n        pass\n"
+            )
+            sys.modules.pop("test_discovery_two")
+            index = DiscoveryIndex(index.path, index.entries)
+            loader, test_ids = discover(index, path, ["*test_b*"])
+            assert test_ids == [
+                "test_discovery_one.OneTests.test_b",
+                "test_discovery_two.TwoTests.test_b",
+            ]
+            assert (loader.imported, loader.skipped) == (2, 0)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.test import SimpleTestCase
+
+from django_rich._durations import (
+    DurationTotal,
+    aggregate,
+    slowest,
+    write_durations_json,
+)
+from django_rich.test import RichTestRunner, RichTestSuite
+from tests.utils import make_result
+
+
+class SlowestTests(SimpleTestCase):
+    items = [("a", 1.0), ("b", 3.0), ("c", 2.0)]
+
+    def test_bounded(self):
+        assert slowest(self.items, 2) == [("b", 3.0), ("c", 2.0)]
+
+    def test_all(self):
+        assert slowest(self.items, 0) == [("b", 3.0), ("c", 2.0), ("a", 1.0)]
+
+
+class AggregateTests(SimpleTestCase):
+    def test_aggregate(self):
+        classes, modules = aggregate(
+            {
+                "app.tests.ATests.test_1": 1.0,
+                "app.tests.ATests.test_2": 2.0,
+                "app.tests.BTests.test_1": 0.5,
+                "other.tests.CTests.test_1": 0.25,
+            },
+            {"app.tests.ATests": 0.5, "other.tests.DTests": 0.125},
+        )
+        assert classes == {
+            "app.tests.ATests": DurationTotal(3.5, 0.5, 2),
+            "app.tests.BTests": DurationTotal(0.5, 0.0, 1),
+            "other.tests.CTests": DurationTotal(0.25, 0.0, 1),
+            "other.tests.DTests": DurationTotal(0.125, 0.125, 0),
+        }
+        assert modules == {
+            "app.tests": DurationTotal(4.0, 0.5, 3),
+            "other.tests": DurationTotal(0.375, 0.125, 1),
+        }
+
+    def test_write_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "durations.json")
+            write_durations_json(
+                path, {"app.tests.ATests.test_1": 1.0}, {"app.tests.ATests": 0.5}
+            )
+            data = json.loads(Path(path).read_text())
+        assert data == {
+            "tests": {"app.tests.ATests.test_1": 1.0},
+            "classes": {
+                "app.tests.ATests": {"duration": 1.5, "fixtures": 0.5, "tests": 1}
+            },
+            "modules": {"app.tests": {"duration": 1.5, "fixtures": 0.5, "tests": 1}},
+        }
+
+
+@pytest.mark.skip(reason="Run below via RichTestSuite.")
+class SlowFixtureTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        time.sleep(0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        time.sleep(0.01)
+        super().tearDownClass()
+
+    def test_1(self):
+        pass
+
+    def test_2(self):
+        pass
+
+
+@pytest.mark.skip(reason="Run below via RichTestSuite.")
+class OtherFixtureTests(SimpleTestCase):
+    def test_1(self):
+        pass
+
+
+class RichTestSuiteTests(SimpleTestCase):
+    def test_fixture_durations(self):
+        suite = RichTestSuite(
+            [
+                SlowFixtureTests("test_1"),
+                SlowFixtureTests("test_2"),
+                OtherFixtureTests("test_1"),
+            ]
+        )
+        result = make_result(verbosity=0)
+        suite.run(result)
+        assert set(result.fixture_durations) == {
+            f"{__name__}.SlowFixtureTests",
+            f"{__name__}.OtherFixtureTests",
+        }
+        assert result.fixture_durations[f"{__name__}.SlowFixtureTests"] >= 0.02
+        assert result.fixture_durations[f"{__name__}.OtherFixtureTests"] < 0.01
+        assert len(result.test_durations) == 3
+
+
+class RichTestRunnerGroupedDurationsTests(SimpleTestCase):
+    test_durations = {"app.tests.ATests.test_1": 1.0, "app.tests.BTests.test_1": 0.5}
+    fixture_durations = {"app.tests.ATests": 0.25}
+
+    def test_classes(self):
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, class_durations=1)
+        runner._printGroupedDurations(
+            make_result(
+                stream,
+                test_durations=self.test_durations,
+                fixture_durations=self.fixture_durations,
+            )
+        )
+        output = stream.getvalue()
+        assert "Slowest test classes" in output
+        assert "app.tests.ATests" in output
+        assert "1.250s" in output
+        assert "0.250s" in output
+        assert "app.tests.BTests" not in output
+        assert "Slowest test modules" not in output
+
+    def test_modules(self):
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, module_durations=0)
+        runner._printGroupedDurations(
+            make_result(
+                stream,
+                test_durations=self.test_durations,
+                fixture_durations=self.fixture_durations,
+            )
+        )
+        output = stream.getvalue()
+        assert "Slowest test classes" not in output
+        assert "Slowest test modules" in output
+        assert "1.750s" in output
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from django.test import SimpleTestCase, TestCase
+from django.test.runner import ParallelTestSuite
+from django.test.utils import iter_test_cases  # type: ignore [attr-defined]
+
+from django_rich._failed import FailedTests
+from django_rich.test import RichRunner
+from tests.utils import temp_cache_dir
+
+
+class FailedTestsTests(SimpleTestCase):
+    def test_load_missing(self):
+        with temp_cache_dir() as cache_dir:
+            assert FailedTests.load(cache_dir).failed == set()
+            assert not cache_dir.exists()
+
+    def test_load_other_version(self):
+        with temp_cache_dir() as cache_dir:
+            cache_dir.mkdir()
+            (cache_dir / "failed.json").write_text(
+                json.dumps({"version": 0, "failed": ["a.B.test_c"]})
+            )
+            assert FailedTests.load(cache_dir).failed == set()
+
+    def test_save_load(self):
+        with temp_cache_dir() as cache_dir:
+            failed_tests = FailedTests.load(cache_dir)
+            failed_tests.update([], ["a.B.test_d", "a.B.test_c"])
+            failed_tests.save()
+            assert json.loads((cache_dir / "failed.json").read_text()) == {
+                "version": 1,
+                "failed": ["a.B.test_c", "a.B.test_d"],
+            }
+            assert FailedTests.load(cache_dir).failed == {"a.B.test_c", "a.B.test_d"}
+
+    def test_save_empty(self):
+        with temp_cache_dir() as cache_dir:
+            FailedTests.load(cache_dir).save()
+            assert not cache_dir.exists()
+
+    def test_update(self):
+        failed_tests = FailedTests(Path("unused"), {"a.B.test_c", "a.B.test_d"})
+        failed_tests.update(["a.B.test_c", "a.B.test_e"], ["a.B.test_e"])
+        assert failed_tests.failed == {"a.B.test_d", "a.B.test_e"}
+
+    def test_update_fixture_errors(self):
+        failed_tests = FailedTests(Path("unused"), set())
+        failed_tests.update(
+            [], ["setUpClass (a.B)", "setUpModule (a)", "tearDownClass (a.C)"]
+        )
+        assert failed_tests.failed == {"a.B", "a", "a.C"}
+        # Fixture errors are forgotten once a test in the class or module ran.
+        failed_tests.update(["a.B.test_c"], [])
+        assert failed_tests.failed == {"a.C"}
+
+    def test_matches(self):
+        test = ExampleTests("test_a")
+        assert not FailedTests(Path("unused"), set()).matches(test)
+        assert not FailedTests(Path("unused"), {"other.Tests"}).matches(test)
+        assert FailedTests(Path("unused"), {test.id()}).matches(test)
+        assert FailedTests(Path("unused"), {f"{__name__}.ExampleTests"}).matches(test)
+        assert FailedTests(Path("unused"), {__name__}).matches(test)
+
+
+class ExampleTests(SimpleTestCase):
+    def test_a(self):
+        pass
+
+    def test_b(self):
+        pass
+
+
+class OtherTests(SimpleTestCase):
+    def test_c(self):
+        pass
+
+
+class DatabaseTests(TestCase):
+    def test_d(self):
+        pass
+
+
+class SelectFailedTests(SimpleTestCase):
+    labels = [
+        f"{__name__}.ExampleTests",
+        f"{__name__}.OtherTests",
+        f"{__name__}.DatabaseTests",
+    ]
+
+    def build_suite(self, failed: set[str], **kwargs: Any) -> list[str]:
+        with temp_cache_dir() as cache_dir:
+
+            class Runner(RichRunner):
+                pass
+
+            Runner.cache_dir = str(cache_dir)
+            runner = Runner(verbosity=0, **kwargs)
+            runner.failed_tests.failed = failed
+            suite = runner.build_suite(self.labels)
+        return [test.id().rpartition(".")[2] for test in iter_test_cases(suite)]
+
+    def test_last_failed(self):
+        failed = {f"{__name__}.ExampleTests.test_b", f"{__name__}.OtherTests"}
+        assert self.build_suite(failed, last_failed=True) == ["test_b", "test_c"]
+
+    def test_last_failed_none(self):
+        assert self.build_suite(set(), last_failed=True) == [
+            "test_d",
+            "test_a",
+            "test_b",
+            "test_c",
+        ]
+
+    def test_failed_first(self):
+        failed = {f"{__name__}.ExampleTests.test_b", f"{__name__}.OtherTests"}
+        # TestCase classes still run before SimpleTestCase classes.
+        assert self.build_suite(failed, failed_first=True) == [
+            "test_d",
+            "test_b",
+            "test_a",
+            "test_c",
+        ]
+
+    def test_failed_first_parallel(self):
+        failed = {f"{__name__}.OtherTests.test_c"}
+        with temp_cache_dir() as cache_dir:
+
+            class Runner(RichRunner):
+                pass
+
+            Runner.cache_dir = str(cache_dir)
+            runner = Runner(verbosity=0, parallel=2, failed_first=True)
+            runner.failed_tests.failed = failed
+            suite = runner.build_suite(self.labels)
+        assert isinstance(suite, ParallelTestSuite)
+        assert [
+            type(next(iter(subsuite))).__name__ for subsuite in suite.subsuites
+        ] == ["DatabaseTests", "OtherTests", "ExampleTests"]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sys
+from io import StringIO
+
+from django.test import SimpleTestCase
+from rich.traceback import Trace, Traceback
+
+from django_rich._fingerprint import error_fingerprint, subtest_fingerprint
+from django_rich.test import RichTextTestResult
+from tests.utils import make_result
+
+
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+def extract(message: str) -> Trace:
+    try:
+        fail(message)
+    except ValueError as exc:
+        return Traceback.extract(type(exc), exc, exc.__traceback__)
+    raise AssertionError("unreachable")
+
+
+class ErrorFingerprintTests(SimpleTestCase):
+    def test_same(self):
+        assert error_fingerprint(extract("Woops")) == error_fingerprint(
+            extract("Woops")
+        )
+
+    def test_message(self):
+        assert error_fingerprint(extract("Woops")) != error_fingerprint(
+            extract("Oh no")
+        )
+
+    def test_addresses_ignored(self):
+        assert error_fingerprint(
+            extract("<Book object at 0x7f3a1c2b>")
+        ) == error_fingerprint(extract("<Book object at 0x7f99aa00>"))
+
+    def test_output(self):
+        trace = extract("Woops")
+        assert error_fingerprint(trace, "\nStdout:\na\n") != error_fingerprint(
+            trace, "\nStdout:\nb\n"
+        )
+
+
+class SubtestFingerprintTests(SimpleTestCase):
+    def fingerprint(
+        self,
+        message: str | None = None,
+        exc_type: type[BaseException] = ValueError,
+        **params: object,
+    ) -> str:
+        with self.subTest(message, **params):
+            return subtest_fingerprint(self._subtest, exc_type)  # type: ignore [attr-defined]
+
+    def test_values_ignored(self):
+        assert self.fingerprint(i=1) == self.fingerprint(i=2)
+
+    def test_message(self):
+        assert self.fingerprint("a", i=1) != self.fingerprint("b", i=1)
+
+    def test_params(self):
+        assert self.fingerprint(i=1) != self.fingerprint(j=1)
+
+    def test_exc_type(self):
+        assert self.fingerprint(i=1) != self.fingerprint(exc_type=TypeError, i=1)
+
+
+class DuplicateErrorsTests(SimpleTestCase):
+    def add_error(
+        self, result: RichTextTestResult, test: SimpleTestCase, message: str
+    ) -> None:
+        try:
+            fail(message)
+        except ValueError:
+            result.addError(test, sys.exc_info())
+
+    def test_collapsed(self):
+        stream = StringIO()
+        result = make_result(stream, verbosity=0)
+        result.console.width = 200
+        result.collapse_duplicate_errors = True
+        for test in (self, DuplicateErrorsTests("test_separate")):
+            self.add_error(result, test, "Woops")
+        self.add_error(result, self, "Oh no")
+        result.printErrors()
+        output = stream.getvalue()
+        assert output.count("ValueError: Woops") == 1
+        assert output.count("ValueError: Oh no") == 1
+        assert "ERROR: 1 more with the same error" in output
+        assert "DuplicateErrorsTests.test_separate" in output
+        assert "As in test_collapsed" in output
+
+    def test_separate(self):
+        stream = StringIO()
+        result = make_result(stream, verbosity=0)
+        result.console.width = 200
+        for test in (self, DuplicateErrorsTests("test_collapsed")):
+            self.add_error(result, test, "Woops")
+        result.printErrors()
+        output = stream.getvalue()
+        assert output.count("ValueError: Woops") == 2
+        assert "more with the same error" not in output
+
+    def test_progress(self):
+        stream = StringIO()
+        result = make_result(stream, verbosity=0)
+        result.console.width = 200
+        result.collapse_duplicate_errors = True
+        result.enable_progress(2)
+        self.add_error(result, self, "Woops")
+        result.printErrorList("ERROR", result.errors)
+        self.add_error(result, DuplicateErrorsTests("test_separate"), "Woops")
+        result.printErrorList("ERROR", result.errors)
+        output = stream.getvalue()
+        assert output.count("ValueError: Woops") == 1
+        assert "ERROR: 1 more with the same error" in output
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from django_rich._flaky import FlakyHistory
+
+
+class FlakyHistoryTests(SimpleTestCase):
+    def test_load_missing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir) / "cache"
+            history = FlakyHistory.load(cache_dir)
+            assert history.entries == {}
+            history.save()
+            assert not cache_dir.exists()
+
+    def test_update(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history = FlakyHistory.load(tmp_dir)
+            history.update(["a", "b"], ["a"])
+            history.update(["a", "b"], [])
+            history.save()
+            loaded = FlakyHistory.load(tmp_dir)
+        # Only tests that have been flaky are recorded.
+        assert loaded.entries == {"a": [0.5, 2]}
+        assert loaded.get("a") == (0.5, 2)
+        assert loaded.get("b") is None
+
+    def test_window(self):
+        history = FlakyHistory(Path("unused"), {"a": [0.5, FlakyHistory.window]})
+        history.update(["a"], ["a"])
+        assert history.entries["a"] == [0.525, FlakyHistory.window]
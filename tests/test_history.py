@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+from django.test import SimpleTestCase, TestCase
+from django.test.runner import ParallelTestSuite
+
+from django_rich._history import DurationHistory, Slowdown
+from django_rich.test import RichRunner, RichTestRunner
+from tests.utils import make_result, temp_cache_dir
+
+
+class DurationHistoryTests(SimpleTestCase):
+    def test_load_missing(self):
+        with temp_cache_dir() as cache_dir:
+            history = DurationHistory.load(cache_dir)
+            assert history.entries == {}
+            assert not cache_dir.exists()
+
+    def test_load_corrupt(self):
+        with temp_cache_dir() as cache_dir:
+            cache_dir.mkdir()
+            (cache_dir / "durations.json").write_text("{")
+            assert DurationHistory.load(cache_dir).entries == {}
+
+    def test_load_other_version(self):
+        with temp_cache_dir() as cache_dir:
+            cache_dir.mkdir()
+            (cache_dir / "durations.json").write_text(
+                json.dumps({"version": 0, "durations": {"a": [1.0, 1]}})
+            )
+            assert DurationHistory.load(cache_dir).entries == {}
+
+    def test_save_load(self):
+        with temp_cache_dir() as cache_dir:
+            history = DurationHistory.load(cache_dir)
+            history.update({"a": 0.5, "b": 1.25})
+            history.save()
+            assert (cache_dir / ".gitignore").exists()
+            assert DurationHistory.load(cache_dir).entries == {
+                "a": [0.5, 1],
+                "b": [1.25, 1],
+            }
+
+    def test_update_rolling_average(self):
+        history = DurationHistory(Path("unused"), {})
+        history.update({"a": 1.0})
+        history.update({"a": 2.0})
+        assert history.entries["a"] == [1.5, 2]
+
+    def test_update_window(self):
+        history = DurationHistory(Path("unused"), {"a": [1.0, 10]})
+        history.update({"a": 2.0})
+        assert history.entries["a"] == [1.1, 10]
+
+    def test_get(self):
+        history = DurationHistory(Path("unused"), {"a": [1.0, 1]})
+        assert history.get("a") == 1.0
+        assert history.get("b") is None
+
+    def test_estimate(self):
+        history = DurationHistory(Path("unused"), {"a": [1.0, 1], "b": [3.0, 1]})
+        assert history.default() == 2.0
+        assert history.estimate(["a", "b", "c"]) == 6.0
+        assert history.estimate(["a", "c"], default=0.5) == 1.5
+
+    def test_estimate_empty(self):
+        history = DurationHistory(Path("unused"), {})
+        assert history.estimate(["a"]) == 0.0
+
+    def test_slowdowns(self):
+        history = DurationHistory(
+            Path("unused"),
+            {
+                "slower": [0.1, 5],
+                "much_slower": [0.1, 5],
+                "same": [0.1, 5],
+                "small_increase": [0.001, 5],
+                "few_runs": [0.1, 1],
+            },
+        )
+        slowdowns, count = history.slowdowns(
+            {
+                "slower": 0.3,
+                "much_slower": 1.0,
+                "same": 0.1,
+                "small_increase": 0.01,
+                "few_runs": 1.0,
+                "new": 1.0,
+            },
+            factor=2.0,
+            min_increase=0.1,
+            min_runs=3,
+            limit=1,
+        )
+        assert slowdowns == [Slowdown("much_slower", 1.0, 0.1)]
+        assert count == 2
+
+
+class RichTestRunnerSlowdownTests(SimpleTestCase):
+    def test_print(self):
+        stream = StringIO()
+        history = DurationHistory(Path("unused"), {"a": [0.1, 5], "b": [0.1, 5]})
+        runner = RichTestRunner(stream=stream, duration_history=history)
+        runner.slowdown_limit = 1
+        result = make_result(stream)
+        result.test_durations = {"a": 1.0, "b": 0.5}
+        runner._printSlowdowns(result)
+        output = stream.getvalue()
+        assert "Tests slower than usual" in output
+        assert "1.000s" in output
+        assert "0.100s" in output
+        assert "1 more not shown." in output
+
+    def test_none(self):
+        stream = StringIO()
+        history = DurationHistory(Path("unused"), {"a": [0.1, 5]})
+        runner = RichTestRunner(stream=stream, duration_history=history)
+        result = make_result(stream)
+        result.test_durations = {"a": 0.1}
+        runner._printSlowdowns(result)
+        assert stream.getvalue() == ""
+
+
+class ProgressEstimateTests(SimpleTestCase):
+    def test_eta(self):
+        history = DurationHistory(
+            Path("unused"), {f"{__name__}.ProgressEstimateTests.test_eta": [1.0, 1]}
+        )
+        result = make_result()
+        result.duration_history = history
+        result.enable_progress(2, expected_duration=3.0)
+        result.startTestRun()
+        result.startTest(self)
+        result.stopTest(self)
+        result._update_progress()
+        assert result.progress is not None
+        task = result.progress.tasks[0]
+        result.stopTestRun()
+        # 1s of 3s expected is done, so some time remains.
+        assert task.fields["eta"] is not None
+        assert task.fields["eta"] >= 0.0
+
+
+class SlowTests(TestCase):
+    def test_a(self):
+        pass
+
+
+class FastTests(TestCase):
+    def test_b(self):
+        pass
+
+
+class OrderTests(SimpleTestCase):
+    def test_c(self):
+        pass
+
+
+class OrderSubsuitesTests(SimpleTestCase):
+    def build_suite(
+        self, cache_dir: Path, labels: list[str], **kwargs: Any
+    ) -> ParallelTestSuite:
+        class Runner(RichRunner):
+            pass
+
+        Runner.cache_dir = str(cache_dir)
+        runner = Runner(duration_history=True, parallel=2, verbosity=0, **kwargs)
+        assert runner.duration_history is not None
+        runner.duration_history.entries = {
+            f"{__name__}.SlowTests.test_a": [2.0, 1],
+            f"{__name__}.FastTests.test_b": [1.0, 1],
+            f"{__name__}.OrderTests.test_c": [5.0, 1],
+        }
+        suite = runner.build_suite([f"{__name__}.{label}" for label in labels])
+        assert isinstance(suite, ParallelTestSuite)
+        return suite
+
+    def class_names(self, suite: ParallelTestSuite) -> list[str]:
+        return [type(next(iter(subsuite))).__name__ for subsuite in suite.subsuites]
+
+    def test_longest_first(self):
+        with temp_cache_dir() as cache_dir:
+            suite = self.build_suite(
+                cache_dir, ["FastTests", "SlowTests", "OrderTests"]
+            )
+        # TestCase classes still run before SimpleTestCase classes.
+        assert self.class_names(suite) == ["SlowTests", "FastTests", "OrderTests"]
+
+    def test_reverse(self):
+        with temp_cache_dir() as cache_dir:
+            suite = self.build_suite(
+                cache_dir, ["SlowTests", "FastTests", "OrderTests"], reverse=True
+            )
+        # Kept in Django's order.
+        assert self.class_names(suite) == ["FastTests", "SlowTests", "OrderTests"]
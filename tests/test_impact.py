@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from django_rich._impact import ImpactIndex, ImpactRecorder, find_changed_files
+
+
+class ImpactIndexTests(SimpleTestCase):
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index = ImpactIndex.load(tmp_dir)
+            assert index.classes == {}
+            index.update(
+                {
+                    "app.tests.ViewTests": {"app/views.py", "app/tests.py"},
+                    "app.tests.ModelTests": {"app/models.py", "app/tests.py"},
+                }
+            )
+            index.save()
+            data = json.loads(Path(tmp_dir, "impact.json").read_text())
+            loaded = ImpactIndex.load(tmp_dir)
+        assert data == {
+            "version": 1,
+            "files": ["app/models.py", "app/tests.py", "app/views.py"],
+            "classes": {
+                "app.tests.ModelTests": [0, 1],
+                "app.tests.ViewTests": [1, 2],
+            },
+        }
+        assert loaded.classes == index.classes
+
+    def test_load_other_version(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            Path(tmp_dir, "impact.json").write_text('{"version": 0}')
+            assert ImpactIndex.load(tmp_dir).classes == {}
+
+    def test_affected(self):
+        index = ImpactIndex(
+            Path("impact.json"),
+            {
+                "app.tests.ViewTests": {"app/views.py", "app/tests.py"},
+                "app.tests.ModelTests": {"app/models.py", "app/tests.py"},
+            },
+        )
+        assert index.affected({"app/views.py", "README.rst"}) == {"app.tests.ViewTests"}
+        assert index.affected({"app/tests.py"}) == {
+            "app.tests.ViewTests",
+            "app.tests.ModelTests",
+        }
+        assert index.files() == {"app/models.py", "app/tests.py", "app/views.py"}
+
+
+class ImpactRecorderTests(SimpleTestCase):
+    def test_record(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            path = root / "helpers.py"
+            path.write_text("def double(x):\n    return x * 2\n")
+            spec = importlib.util.spec_from_file_location("helpers", path)
+            assert spec is not None and spec.loader is not None
+            helpers = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(helpers)
+            with ImpactRecorder(root) as recorder:
+                helpers.double(1)
+                recorder.switch("first")
+                helpers.double(1)
+                recorder.switch("second")
+                helpers.double(1)
+                recorder.switch("third")
+                os.path.join("a", "b")
+        assert recorder.classes == {
+            "first": {"helpers.py"},
+            "second": {"helpers.py"},
+            "third": set(),
+        }
+
+
+class FindChangedFilesTests(SimpleTestCase):
+    def git(self, *args: str, cwd: Path) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+            + list(args),
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+        )
+
+    def test_changed_since(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "app").mkdir()
+            for name in ("views.py", "old.py", "models.py"):
+                (root / "app" / name).write_text("")
+            self.git("init", "-q", cwd=root)
+            self.git("add", ".", cwd=root)
+            self.git("commit", "-q", "-m", "Initial", cwd=root)
+            (root / "app/views.py").write_text("VALUE = 1\n")
+            self.git("mv", "app/old.py", "app/new.py", cwd=root)
+            (root / "app/untracked.py").write_text("")
+            cwd = os.getcwd()
+            os.chdir(root / "app")
+            try:
+                changed = find_changed_files("HEAD", ["../README.rst"])
+                with self.assertRaisesMessage(ValueError, "git diff failed: "):
+                    find_changed_files("nonexistent", [])
+            finally:
+                os.chdir(cwd)
+        assert changed == {
+            "../README.rst",
+            "views.py",
+            "old.py",
+            "new.py",
+            "untracked.py",
+        }
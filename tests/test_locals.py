@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from unittest import mock
+
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+from django.test import TestCase
+from django.utils.functional import SimpleLazyObject
+from rich.pretty import Node
+from rich.traceback import Trace, Traceback
+
+from django_rich._locals import LocalsLimits, extract_locals
+from tests.testapp.models import Book
+
+
+def extract(exc: BaseException, limits: LocalsLimits | None = None) -> Trace:
+    trace = Traceback.extract(type(exc), exc, exc.__traceback__, show_locals=False)
+    extract_locals(trace, exc, exc.__traceback__, limits or LocalsLimits())
+    return trace
+
+
+def frame_locals(trace: Trace, stack: int = 0) -> dict[str, Node]:
+    frame_locals = trace.stacks[stack].frames[-1].locals
+    assert frame_locals is not None
+    return frame_locals
+
+
+def repr_of(node: Node) -> str:
+    return "".join(node.iter_tokens())
+
+
+@contextmanager
+def assert_no_queries_executed() -> Iterator[None]:
+    with mock.patch.object(CursorWrapper, "_execute") as mock_execute:
+        yield
+    mock_execute.assert_not_called()
+
+
+class ExtractLocalsTests(TestCase):
+    def raise_with(self, **kwargs: Any) -> BaseException:
+        try:
+            locals().update(kwargs)
+            raise ValueError("Woops")
+        except ValueError as exc:
+            return exc
+
+    def test_basic(self):
+        try:
+            number = 123  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc)
+
+        assert repr_of(frame_locals(trace)["number"]) == "123"
+
+    def test_unevaluated_queryset(self):
+        try:
+            books = Book.objects.filter(title="Dune")  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            with assert_no_queries_executed():
+                trace = extract(exc, LocalsLimits(max_string=None))
+
+        books_repr = repr_of(frame_locals(trace)["books"])
+        assert books_repr.startswith("<QuerySet (unevaluated) model=testapp.Book sql=")
+        assert "WHERE" in books_repr
+
+    def test_unevaluated_queryset_sql_truncated(self):
+        try:
+            books = Book.objects.filter(title="Dune")  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc, LocalsLimits(max_string=10))
+
+        books_repr = repr_of(frame_locals(trace)["books"])
+        assert "sql='SELECT \"te+" in books_repr
+
+    def test_evaluated_queryset(self):
+        Book.objects.create(title="Dune")
+        try:
+            books = Book.objects.all()
+            list(books)
+            raise ValueError("Woops")
+        except ValueError as exc:
+            with assert_no_queries_executed():
+                trace = extract(exc)
+
+        assert repr_of(frame_locals(trace)["books"]) == "<QuerySet [<Book: Dune>]>"
+
+    def test_model_deferred_field(self):
+        Book.objects.create(title="Dune")
+        try:
+            book = Book.objects.defer("title").get()
+            raise ValueError("Woops")
+        except ValueError as exc:
+            with assert_no_queries_executed():
+                trace = extract(exc)
+
+        assert repr_of(frame_locals(trace)["book"]) == f"<Book: pk={book.pk}>"
+
+    def test_nested_query_blocked(self):
+        try:
+            books = [Book.objects.filter(title="Dune")]  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            with assert_no_queries_executed():
+                trace = extract(exc)
+
+        books_repr = repr_of(frame_locals(trace)["books"])
+        assert "Database access blocked while rendering locals." in books_repr
+
+    def test_lazy_object_unevaluated(self):
+        def setup() -> None:
+            raise AssertionError("Should not be evaluated")
+
+        try:
+            lazy = SimpleLazyObject(setup)  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc)
+
+        assert repr_of(frame_locals(trace)["lazy"]) == "<SimpleLazyObject: unevaluated>"
+
+    def test_lazy_object_evaluated(self):
+        try:
+            lazy = SimpleLazyObject(lambda: [1, 2])
+            len(lazy)
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc)
+
+        assert repr_of(frame_locals(trace)["lazy"]) == "[1, 2]"
+
+    def test_max_length(self):
+        try:
+            items = list(range(100))  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc, LocalsLimits(max_length=3))
+
+        assert repr_of(frame_locals(trace)["items"]) == "[0, 1, 2, ... +97]"
+
+    def test_max_depth(self):
+        try:
+            nested = [[[[1]]]]  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc, LocalsLimits(max_depth=2))
+
+        assert repr_of(frame_locals(trace)["nested"]) == "[[[...]]]"
+
+    def test_time_budget(self):
+        class Slow:
+            def __repr__(self) -> str:
+                time.sleep(0.02)
+                return "Slow()"
+
+        try:
+            a = Slow()  # noqa: F841
+            b = Slow()  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            trace = extract(exc, LocalsLimits(time_budget=0.01))
+
+        assert repr_of(frame_locals(trace)["a"]) == "Slow()"
+        assert (
+            repr_of(frame_locals(trace)["b"]) == "<not rendered, time budget exceeded>"
+        )
+
+    def test_nested_query_not_logged(self):
+        try:
+            books = [Book.objects.filter(title="Dune")]  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            with self.settings(DEBUG=False):
+                connection.force_debug_cursor = True
+                try:
+                    connection.queries_log.clear()
+                    extract(exc)
+                    assert connection.force_debug_cursor is True
+                finally:
+                    connection.force_debug_cursor = False
+
+        assert len(connection.queries_log) == 0
+
+    def test_repr_error(self):
+        try:
+            broken = 1  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError as exc:
+            with mock.patch(
+                "django_rich._locals.traverse", side_effect=RuntimeError("broken")
+            ):
+                trace = extract(exc)
+
+        assert repr_of(frame_locals(trace)["broken"]) == "<repr-error 'broken'>"
+
+    def test_chained(self):
+        try:
+            try:
+                inner = 1  # noqa: F841
+                raise KeyError("inner")
+            except KeyError:
+                outer = 2  # noqa: F841
+                raise ValueError("outer")  # noqa: B904
+        except ValueError as exc:
+            trace = extract(exc)
+
+        assert len(trace.stacks) == 2
+        assert repr_of(frame_locals(trace, 0)["outer"]) == "2"
+        assert repr_of(frame_locals(trace, 1)["inner"]) == "1"
+
+    def test_rich_traceback_omit(self):
+        def omitted() -> None:
+            _rich_traceback_omit = True  # noqa: F841
+            raise ValueError("Woops")
+
+        try:
+            caller = 1  # noqa: F841
+            omitted()
+        except ValueError as exc:
+            trace = extract(exc)
+
+        assert "caller" in frame_locals(trace)
+
+    if sys.version_info >= (3, 11):  # pragma: no branch
+
+        def test_exception_group(self):
+            def fail() -> None:
+                in_group = 1  # noqa: F841
+                raise ValueError("Woops")
+
+            try:
+                try:
+                    fail()
+                except ValueError as exc:
+                    raise ExceptionGroup("group", [exc])  # noqa: B904, F821
+            except ExceptionGroup as group:  # noqa: F821
+                trace = extract(group)
+
+            sub_trace = trace.stacks[0].exceptions[0]
+            assert repr_of(frame_locals(sub_trace)["in_group"]) == "1"
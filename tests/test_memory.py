@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import tracemalloc
+from io import StringIO
+
+from django.test import SimpleTestCase
+
+from django_rich._memory import (
+    AllocationSite,
+    MemoryUsage,
+    current_rss,
+    format_size,
+    sample,
+    take_snapshot,
+    top_sites,
+)
+from django_rich.test import RichTestRunner
+from tests.utils import make_result
+
+
+class FormatSizeTests(SimpleTestCase):
+    def test_bytes(self):
+        assert format_size(0) == "+0 B"
+        assert format_size(-512) == "-512 B"
+
+    def test_units(self):
+        assert format_size(1536) == "+1.5 KiB"
+        assert format_size(-3 * 1024**2) == "-3.0 MiB"
+        assert format_size(2048 * 1024**3) == "+2048.0 GiB"
+
+
+class SampleTests(SimpleTestCase):
+    def test_rss(self):
+        assert current_rss() > 0
+        usage = sample("rss")
+        assert usage.size > 0
+        assert usage.blocks > 0
+
+    def test_tracemalloc(self):
+        tracemalloc.start()
+        try:
+            before = sample("tracemalloc")
+            data = bytearray(100_000)
+            growth = sample("tracemalloc").growth_since(before)
+        finally:
+            tracemalloc.stop()
+        assert growth.size >= 100_000
+        del data
+
+    def test_top_sites(self):
+        tracemalloc.start()
+        try:
+            before = take_snapshot()
+            data = [bytearray(10_000) for _ in range(10)]
+            sites = top_sites(before, take_snapshot(), 1)
+        finally:
+            tracemalloc.stop()
+        assert len(sites) == 1
+        assert sites[0].location.startswith("tests/test_memory.py:")
+        assert sites[0].size >= 100_000
+        del data
+
+
+class RichMemoryMixinTests(SimpleTestCase):
+    def test_records(self):
+        result = make_result(verbosity=0, memory_mode="tracemalloc")
+        try:
+            result.startTest(self)
+            data = bytearray(100_000)
+            result.stopTest(self)
+        finally:
+            tracemalloc.stop()
+        assert list(result.memory_usage) == [self.id()]
+        assert result.memory_usage[self.id()].size >= 100_000
+        del data
+
+    def test_disabled(self):
+        result = make_result(verbosity=0)
+        result.startTest(self)
+        result.stopTest(self)
+        assert result.memory_usage == {}
+
+
+class RichTestRunnerMemoryTests(SimpleTestCase):
+    def print_usage(self, sites: list[AllocationSite] | None = None) -> str:
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, memory="tracemalloc")
+        runner.memory_limit = 2
+        result = make_result(stream)
+        result.console.width = 200
+        result.memory_usage = {
+            "app.tests.ATests.test_1": MemoryUsage(2048, 10),
+            "app.tests.ATests.test_2": MemoryUsage(1024, 5),
+            "app.tests.BTests.test_1": MemoryUsage(512, 1),
+            "app.tests.BTests.test_2": MemoryUsage(-4096, -20),
+        }
+        runner._printMemoryUsage(result, sites)
+        return stream.getvalue()
+
+    def test_tables(self):
+        output = self.print_usage()
+        tests, classes = output.split("Most memory growth by class")
+        assert "+2.0 KiB" in tests
+        assert "app.tests.ATests.test_2" in tests
+        assert "app.tests.BTests" not in tests
+        assert "+3.0 KiB" in classes
+        assert "app.tests.BTests" not in classes
+        assert "Top allocation sites" not in output
+
+    def test_sites(self):
+        output = self.print_usage([AllocationSite("app/models.py:12", 4096, 8)])
+        assert "Top allocation sites" in output
+        assert "app/models.py:12" in output
+        assert "+4.0 KiB" in output
+
+    def test_none(self):
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, memory="rss")
+        result = make_result(stream)
+        runner._printMemoryUsage(result, None)
+        assert stream.getvalue() == ""
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.core import management
+from django.db import connection
+from django.test import SimpleTestCase
+
+from django_rich._phases import PhaseTimer, time_database_setup
+
+
+class PhaseTimerTests(SimpleTestCase):
+    def test_nesting(self):
+        timer = PhaseTimer()
+        with timer.timed("Total database setup"), timer.timed("  Creating 'default'"):
+            pass
+        with timer.timed("Tests"):
+            timer.add("Worker startup", 0.5, count=2)
+        data = timer.root.as_dict()
+        assert [child["name"] for child in data["children"]] == [
+            "Database setup",
+            "Tests",
+        ]
+        setup, tests = data["children"]
+        assert setup["children"][0]["name"] == "Creating 'default'"
+        assert tests["children"] == [
+            {"name": "Worker startup", "duration": 0.5, "count": 2, "children": []}
+        ]
+
+    def test_merge_repeated(self):
+        timer = PhaseTimer()
+        with timer.timed("Total database setup"):
+            for _ in range(3):
+                with timer.timed("  Cloning 'default'"):
+                    pass
+            with timer.timed("  Cloning 'other'"):
+                pass
+        children = timer.root.children[0].children
+        assert [(child.name, child.count) for child in children] == [
+            ("Cloning 'default'", 3),
+            ("Cloning 'other'", 1),
+        ]
+
+    def test_write_json(self):
+        timer = PhaseTimer()
+        with timer.timed("Tests"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "timing.json"
+            timer.write_json(str(path))
+            data = json.loads(path.read_text())
+        assert data["name"] == "Total"
+        assert data["children"][0]["name"] == "Tests"
+
+
+class TimeDatabaseSetupTests(SimpleTestCase):
+    def test_restores(self):
+        call_command = management.call_command
+        timer = PhaseTimer()
+        with time_database_setup(timer):
+            assert management.call_command is not call_command
+            assert "_create_test_db" in connection.creation.__dict__
+        assert management.call_command is call_command
+        assert "_create_test_db" not in connection.creation.__dict__
+        assert "serialize_db_to_string" not in connection.creation.__dict__
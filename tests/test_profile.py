@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+import pstats
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import django
+import pytest
+import rich
+from django.test import SimpleTestCase
+
+from django_rich._profile import AppResolver, Profiler, summarize
+from django_rich.test import RichTestRunner
+from tests.utils import make_result
+
+
+def busy_function() -> int:
+    return sum(range(10_000))
+
+
+@pytest.mark.skip(reason="Run below via Profiler.")
+class ProfiledTests(SimpleTestCase):
+    def test_busy(self):
+        busy_function()
+
+    def test_other(self):
+        pass
+
+
+@pytest.mark.skip(reason="Run below via Profiler.")
+class OtherProfiledTests(SimpleTestCase):
+    def test_busy(self):
+        busy_function()
+
+
+def run_profiled(profiler: Profiler, *tests: SimpleTestCase) -> None:
+    result = make_result(verbosity=0)
+    result.profiler = profiler
+    for test in tests:
+        test.run(result)
+
+
+class ProfilerTests(SimpleTestCase):
+    def test_matches_all(self):
+        profiler = Profiler()
+        assert profiler.matches(ProfiledTests("test_busy"))
+
+    def test_matches_substring(self):
+        profiler = Profiler(pattern="test_busy")
+        assert profiler.pattern == "*test_busy*"
+        assert profiler.matches(ProfiledTests("test_busy"))
+        assert not profiler.matches(ProfiledTests("test_other"))
+
+    def test_matches_wildcard(self):
+        profiler = Profiler(pattern="*.OtherProfiledTests.*")
+        assert profiler.matches(OtherProfiledTests("test_busy"))
+        assert not profiler.matches(ProfiledTests("test_busy"))
+
+    def test_finish_nothing_profiled(self):
+        assert Profiler().finish() is None
+
+    def test_profile(self):
+        profiler = Profiler(pattern="test_busy")
+        run_profiled(
+            profiler,
+            ProfiledTests("test_busy"),
+            ProfiledTests("test_other"),
+            OtherProfiledTests("test_busy"),
+        )
+        stats = profiler.finish()
+        assert stats is not None
+        functions = {key[2]: value for key, value in stats.stats.items()}  # type: ignore [attr-defined]
+        assert functions["busy_function"][1] == 2
+        assert "test_other" not in functions
+
+    def test_dump_dir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dump_dir = os.path.join(tmp_dir, "profiles")
+            profiler = Profiler(dump_dir=dump_dir)
+            run_profiled(
+                profiler,
+                ProfiledTests("test_busy"),
+                ProfiledTests("test_other"),
+                OtherProfiledTests("test_busy"),
+            )
+            profiler.finish()
+            assert sorted(os.listdir(dump_dir)) == [
+                f"{__name__}.OtherProfiledTests.pstats",
+                f"{__name__}.ProfiledTests.pstats",
+            ]
+            stats = pstats.Stats(
+                os.path.join(dump_dir, f"{__name__}.ProfiledTests.pstats")
+            )
+        functions = {key[2] for key in stats.stats}  # type: ignore [attr-defined]
+        assert {"test_busy", "test_other"} <= functions
+
+
+class AppResolverTests(SimpleTestCase):
+    def test_resolve(self):
+        resolve = AppResolver()
+        assert resolve("~") == "builtins"
+        assert (
+            resolve(str(Path(__file__).parent / "testapp" / "models.py")) == "testapp"
+        )
+        assert resolve(django.__file__) == "django"
+        assert resolve(rich.__file__) == "rich"
+        assert resolve(os.__file__) == "stdlib"
+        assert resolve("<frozen os>") == "stdlib"
+        assert resolve("/somewhere/else.py") == "other"
+
+
+class SummarizeTests(SimpleTestCase):
+    def test_summarize(self):
+        profiler = Profiler()
+        run_profiled(profiler, ProfiledTests("test_busy"))
+        stats = profiler.finish()
+        assert stats is not None
+        app_stats, by_self, by_cumulative = summarize(stats, 3)
+        assert "builtins" in {s.app for s in app_stats}
+        assert len(by_self) == 3
+        assert by_self == sorted(by_self, key=lambda f: f.self_time, reverse=True)
+        assert len(by_cumulative) == 3
+        assert by_cumulative == sorted(
+            by_cumulative, key=lambda f: f.cumulative_time, reverse=True
+        )
+        _, by_cumulative = summarize(stats, 100)[1:]
+        test_busy = next(f for f in by_cumulative if f.function.endswith("(test_busy)"))
+        assert test_busy.function.startswith("tests/test_profile.py:")
+        assert test_busy.app == "other"
+
+
+class RichTestRunnerProfileTests(SimpleTestCase):
+    def test_print(self):
+        stream = StringIO()
+        profiler = Profiler()
+        runner = RichTestRunner(stream=stream, profiler=profiler)
+        result = make_result(stream)
+        result.profiler = profiler
+        result.console.width = 200
+        ProfiledTests("test_busy").run(result)
+        runner._printProfile(result)
+        output = stream.getvalue()
+        assert "Profile by app" in output
+        assert "Hottest functions by self time" in output
+        assert "Hottest functions by cumulative time" in output
+        assert "busy_function" in output
+
+    def test_nothing_profiled(self):
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, profiler=Profiler())
+        result = make_result(stream)
+        runner._printProfile(result)
+        assert stream.getvalue() == "No tests were profiled.\n"
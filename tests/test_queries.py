@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase
+
+from django_rich._queries import QueryRecorder, QueryStats
+from django_rich.test import RichTestRunner
+from tests.testapp.models import Book
+from tests.utils import make_result
+
+
+class QueryRecorderTests(TestCase):
+    def test_counts(self):
+        recorder = QueryRecorder()
+        with recorder.install():
+            Book.objects.count()
+            Book.objects.filter(title="a").count()
+            Book.objects.filter(title="b").count()
+        stats = recorder.stats()
+        assert stats.queries == 3
+        assert stats.repeated == 1
+        assert stats.time > 0
+        assert stats.sql is None
+        assert stats.most_repeated() is None
+
+    def test_uninstalled(self):
+        recorder = QueryRecorder()
+        with recorder.install():
+            pass
+        Book.objects.count()
+        assert recorder.stats().queries == 0
+        assert connection.execute_wrappers == []
+
+    def test_keep_sql(self):
+        recorder = QueryRecorder(keep_sql=True)
+        with recorder.install():
+            Book.objects.count()
+            Book.objects.exists()
+            Book.objects.count()
+        stats = recorder.stats()
+        assert stats.sql is not None
+        assert len(stats.sql) == 2
+        most_repeated = stats.most_repeated()
+        assert most_repeated is not None
+        assert "COUNT" in most_repeated[0]
+        assert most_repeated[1] == 2
+
+    def test_failed_query(self):
+        recorder = QueryRecorder()
+        with (
+            recorder.install(),
+            pytest.raises(DatabaseError),
+            connection.cursor() as cursor,
+        ):
+            cursor.execute("SELECT * FROM does_not_exist")
+        assert recorder.stats().queries == 1
+
+
+class RichQueryStatsMixinTests(TestCase):
+    def test_records(self):
+        result = make_result(verbosity=0, record_queries=True)
+        result.startTest(self)
+        Book.objects.count()
+        result.stopTest(self)
+        assert list(result.query_stats) == [self.id()]
+        assert result.query_stats[self.id()].queries == 1
+        assert connection.execute_wrappers == []
+
+    def test_no_queries(self):
+        result = make_result(verbosity=0, record_queries=True)
+        result.startTest(self)
+        result.stopTest(self)
+        assert result.query_stats == {}
+
+    def test_disabled(self):
+        result = make_result(verbosity=0)
+        result.startTest(self)
+        Book.objects.count()
+        result.stopTest(self)
+        assert result.query_stats == {}
+
+
+class RichTestRunnerQueryStatsTests(SimpleTestCase):
+    def print_stats(self, **kwargs: object) -> str:
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, **kwargs)  # type: ignore [arg-type]
+        result = make_result(stream)
+        result.query_stats = {
+            "app.tests.ATests.test_1": QueryStats(
+                5, 0.25, 4, {"SELECT [1]": 5} if runner.keep_query_sql else None
+            ),
+            "app.tests.ATests.test_2": QueryStats(2, 0.5, 0),
+        }
+        runner._printQueryStats(result)
+        return stream.getvalue()
+
+    def test_table(self):
+        output = self.print_stats(query_counts=1)
+        assert "Most database queries" in output
+        assert "app.tests.ATests.test_1" in output
+        assert "0.250s" in output
+        assert "app.tests.ATests.test_2" not in output
+        assert "Most repeated SQL" not in output
+
+    def test_sql(self):
+        output = self.print_stats(query_counts=0, keep_query_sql=True)
+        assert "Most repeated SQL" in output
+        assert "5× SELECT [1]" in output
+        assert "app.tests.ATests.test_2" in output
+
+    def test_none(self):
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, query_counts=0)
+        result = make_result(stream)
+        runner._printQueryStats(result)
+        assert stream.getvalue() == ""
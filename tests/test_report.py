@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from django.test import SimpleTestCase
+from rich.traceback import Trace, Traceback
+
+from django_rich._report import (
+    JSONLinesReporter,
+    JUnitXMLReporter,
+    Problem,
+    ReportEntry,
+    Reporter,
+    plain_traceback,
+)
+from tests.utils import make_result
+
+
+def extract() -> Trace:
+    try:
+        try:
+            raise KeyError("a")
+        except KeyError as exc:
+            raise ValueError("Woops") from exc
+    except ValueError as exc:
+        return Traceback.extract(type(exc), exc, exc.__traceback__)
+    raise AssertionError("unreachable")
+
+
+class PlainTracebackTests(SimpleTestCase):
+    def test_chained(self):
+        plain = plain_traceback(extract())
+        assert plain.exc_type == "ValueError"
+        assert plain.message == "Woops"
+        lines = plain.text.splitlines()
+        assert lines[0] == "Traceback (most recent call last):"
+        assert lines[1].endswith(", in extract")
+        assert lines[2] == '    raise KeyError("a")'
+        assert lines[3] == "KeyError: 'a'"
+        assert "direct cause of the following exception" in plain.text
+        assert lines[-2] == '    raise ValueError("Woops") from exc'
+        assert lines[-1] == "ValueError: Woops"
+
+
+ENTRIES = [
+    ReportEntry("app.tests.ATests.test_pass", "passed", 0.5, [], stdout="hi\n"),
+    ReportEntry(
+        "app.tests.ATests.test_fail",
+        "failed",
+        0.25,
+        [Problem("failure", "AssertionError", "1 != 2 \x1b", "Traceback...\n")],
+    ),
+    ReportEntry("app.tests.ATests.test_skip", "skipped", 0.0, [], "no <db>"),
+    ReportEntry("setUpClass (app.tests.BTests)", "error", 0.0, []),
+]
+
+
+class ReporterTests(SimpleTestCase):
+    def write(self, reporter_class: type[Reporter]) -> str:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "report")
+            reporter = reporter_class(path)
+            for entry in ENTRIES:
+                reporter.add(entry)
+            reporter.close()
+            return Path(path).read_text()
+
+    def test_close_required(self):
+        class IncompleteReporter(Reporter):
+            pass
+
+        with pytest.raises(TypeError, match="abstract"):
+            IncompleteReporter("report")  # type: ignore [abstract]
+
+    def test_junit_xml(self):
+        root = ET.fromstring(self.write(JUnitXMLReporter))
+        suite = root.find("testsuite")
+        assert suite is not None
+        assert suite.attrib["tests"] == "4"
+        assert suite.attrib["failures"] == "1"
+        assert suite.attrib["errors"] == "1"
+        assert suite.attrib["skipped"] == "1"
+        cases = suite.findall("testcase")
+        assert [(c.attrib["classname"], c.attrib["name"]) for c in cases] == [
+            ("app.tests.ATests", "test_pass"),
+            ("app.tests.ATests", "test_fail"),
+            ("app.tests.ATests", "test_skip"),
+            ("", "setUpClass (app.tests.BTests)"),
+        ]
+        assert cases[0].findtext("system-out") == "hi\n"
+        failure = cases[1].find("failure")
+        assert failure is not None
+        assert failure.attrib["message"] == "1 != 2 �"
+        assert failure.text == "Traceback...\n"
+        skipped = cases[2].find("skipped")
+        assert skipped is not None
+        assert skipped.attrib["message"] == "no <db>"
+
+    def test_jsonl(self):
+        lines = [
+            json.loads(line) for line in self.write(JSONLinesReporter).splitlines()
+        ]
+        assert lines[0] == {
+            "type": "test",
+            "test": "app.tests.ATests.test_pass",
+            "outcome": "passed",
+            "duration": 0.5,
+            "problems": [],
+            "stdout": "hi\n",
+        }
+        assert lines[1]["problems"][0]["exc_type"] == "AssertionError"
+        assert lines[2]["skip_reason"] == "no <db>"
+        summary = lines[-1]
+        assert summary["type"] == "summary"
+        assert summary["tests"] == 4
+        assert summary["failed"] == 1
+
+
+class CollectingReporter(Reporter):
+    def __init__(self) -> None:
+        super().__init__("")
+        self.entries: list[ReportEntry] = []
+
+    def add(self, report: ReportEntry) -> None:
+        super().add(report)
+        self.entries.append(report)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.mark.skip(reason="Run below via RichTextTestResult.")
+class ReportedTests(SimpleTestCase):
+    def test_pass(self):
+        print("some output")
+
+    def test_fail(self):
+        self.assertEqual(1, 2)
+
+    def test_subtest(self):
+        for i in range(2):
+            with self.subTest(i=i):
+                self.assertEqual(i, 0)
+
+
+class RichTextTestResultReportTests(SimpleTestCase):
+    def test_report(self):
+        reporter = CollectingReporter()
+        result = make_result(verbosity=0)
+        result.reporters = [reporter]
+        result.keep_plain_tracebacks = True
+        result.buffer = True
+        unittest.TestSuite(
+            [
+                ReportedTests("test_pass"),
+                ReportedTests("test_fail"),
+                ReportedTests("test_subtest"),
+            ]
+        ).run(result)
+        passed, failed, subtest = reporter.entries
+        assert passed.outcome == "passed"
+        assert passed.stdout == "some output\n"
+        assert failed.outcome == "failed"
+        assert failed.problems[0].message == "1 != 2"
+        assert "self.assertEqual(1, 2)" in failed.problems[0].traceback
+        assert "╭" not in failed.problems[0].traceback
+        assert subtest.outcome == "failed"
+        assert [p.message for p in subtest.problems] == ["(i=1) 1 != 0"]
+        assert result.plain_tracebacks == {}
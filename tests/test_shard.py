@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from argparse import ArgumentTypeError
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+import pytest
+from django.test import SimpleTestCase
+from django.test.runner import ParallelTestSuite
+from django.test.utils import iter_test_cases  # type: ignore [attr-defined]
+from rich.console import Console
+
+from django_rich._history import DurationHistory
+from django_rich._shard import ShardLoad, assign_shards, estimate_group, parse_shard
+from django_rich.test import RichRunner
+
+
+class ParseShardTests(SimpleTestCase):
+    def test_valid(self):
+        assert parse_shard("2/8") == (2, 8)
+
+    def test_invalid_format(self):
+        with pytest.raises(ArgumentTypeError, match="expected INDEX/COUNT"):
+            parse_shard("2")
+
+    def test_invalid_number(self):
+        with pytest.raises(ArgumentTypeError, match="expected INDEX/COUNT"):
+            parse_shard("a/b")
+
+    def test_out_of_range(self):
+        with pytest.raises(ArgumentTypeError, match="between 1 and COUNT"):
+            parse_shard("0/8")
+
+
+class EstimateGroupTests(SimpleTestCase):
+    def test_known(self):
+        history = DurationHistory(Path("unused"), {"a": [1.0, 1], "b": [2.0, 1]})
+        assert estimate_group(history, ["a", "b"], 5.0) == 3.0
+
+    def test_class_average(self):
+        history = DurationHistory(Path("unused"), {"a": [1.0, 1], "b": [2.0, 1]})
+        assert estimate_group(history, ["a", "b", "c"], 5.0) == 4.5
+
+    def test_default(self):
+        history = DurationHistory(Path("unused"), {})
+        assert estimate_group(history, ["a", "b"], 5.0) == 10.0
+
+
+class AssignShardsTests(SimpleTestCase):
+    def test_longest_first(self):
+        assignments = assign_shards(["a", "b", "c", "d"], [1.0, 5.0, 3.0, 3.0], 2)
+        # b alone balances c + d, then a goes to the lighter shard.
+        assert assignments == [0, 0, 1, 1]
+
+    def test_ties_by_key(self):
+        assert assign_shards(["b", "a"], [1.0, 1.0], 2) == [1, 0]
+
+    def test_more_shards_than_groups(self):
+        assert assign_shards(["a"], [1.0], 3) == [0]
+
+
+class ShardATests(SimpleTestCase):
+    def test_1(self):
+        pass
+
+    def test_2(self):
+        pass
+
+
+class ShardBTests(SimpleTestCase):
+    def test_1(self):
+        pass
+
+
+class ShardCTests(SimpleTestCase):
+    def test_1(self):
+        pass
+
+
+class RichRunnerShardTests(SimpleTestCase):
+    labels = [
+        f"{__name__}.ShardATests",
+        f"{__name__}.ShardBTests",
+        f"{__name__}.ShardCTests",
+    ]
+
+    def make_runner(
+        self,
+        cache_dir: str,
+        history: dict[str, list[float]] | None = None,
+        **kwargs: Any,
+    ) -> RichRunner:
+        if history is not None:
+            Path(cache_dir, "durations.json").write_text(
+                json.dumps({"version": 1, "durations": history})
+            )
+
+        class Runner(RichRunner):
+            pass
+
+        Runner.cache_dir = cache_dir
+        return Runner(verbosity=0, **kwargs)
+
+    def shard_test_ids(self, **kwargs: Any) -> list[list[str]]:
+        shards = []
+        for index in (1, 2):
+            runner = self.make_runner(shard=(index, 2), **kwargs)
+            suite = runner.build_suite(self.labels)
+            shards.append([t.id().split(".", 2)[-1] for t in iter_test_cases(suite)])
+        return shards
+
+    def test_by_count(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            shards = self.shard_test_ids(cache_dir=cache_dir)
+            assert not Path(cache_dir, "durations.json").exists()
+        assert shards == [
+            ["ShardATests.test_1", "ShardATests.test_2"],
+            ["ShardBTests.test_1", "ShardCTests.test_1"],
+        ]
+
+    def test_by_history(self):
+        history = {
+            f"{__name__}.ShardATests.test_1": [0.1, 1],
+            f"{__name__}.ShardBTests.test_1": [1.0, 1],
+            f"{__name__}.ShardCTests.test_1": [0.5, 1],
+        }
+        with tempfile.TemporaryDirectory() as cache_dir:
+            shards = self.shard_test_ids(cache_dir=cache_dir, history=history)
+        # ShardATests.test_2 is estimated from its class average.
+        assert shards == [
+            ["ShardBTests.test_1"],
+            ["ShardATests.test_1", "ShardATests.test_2", "ShardCTests.test_1"],
+        ]
+
+    def test_parallel(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = self.make_runner(cache_dir, shard=(2, 2), parallel=4)
+            suite = runner.build_suite(self.labels)
+        assert isinstance(suite, ParallelTestSuite)
+        assert len(suite.subsuites) == 2
+        assert suite.processes == 2
+        assert runner.shard_loads == [ShardLoad(2, 2.0), ShardLoad(2, 2.0)]
+
+    def test_summary(self):
+        history = {
+            f"{__name__}.ShardATests.test_1": [0.25, 1],
+            f"{__name__}.ShardATests.test_2": [0.25, 1],
+            f"{__name__}.ShardBTests.test_1": [0.25, 1],
+            f"{__name__}.ShardCTests.test_1": [0.25, 1],
+        }
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = self.make_runner(cache_dir, history=history, shard=(1, 2))
+            runner.build_suite(self.labels)
+        file = StringIO()
+        runner._print_shard_summary(Console(file=file, width=80), 1.5)
+        output = file.getvalue()
+        assert "Shard 1/2" in output
+        assert "0.50s" in output
+        assert "1.50s" in output
+        assert "No duration history" not in output
+
+    def test_summary_no_history(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            runner = self.make_runner(cache_dir, shard=(1, 2))
+            runner.build_suite(self.labels)
+        file = StringIO()
+        runner._print_shard_summary(Console(file=file, width=200), 1.5)
+        assert "No duration history, so shards were balanced by test count." in (
+            file.getvalue()
+        )
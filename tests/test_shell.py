@@ -28,7 +28,7 @@ class ShellCommandTestCase(SimpleTestCase):
         lines = stdout.getvalue().splitlines()
         if django.VERSION >= (6, 0):
             assert lines == [
-                "10 objects imported automatically (use -v 2 for details).",
+                "11 objects imported automatically (use -v 2 for details).",
                 "",
                 "╭─────╮",
                 "│ hi! │",
@@ -36,7 +36,7 @@ class ShellCommandTestCase(SimpleTestCase):
             ]
         else:
             assert lines == [
-                "4 objects imported automatically (use -v 2 for details).",
+                "5 objects imported automatically (use -v 2 for details).",
                 "",
                 "╭─────╮",
                 "│ hi! │",
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+
+from django.test import SimpleTestCase
+
+from django_rich._spill import SpilledOutput
+
+
+class SpilledOutputTests(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.directory = tmp_dir.name
+
+    def test_write(self):
+        text = "".join(f"line {i}\n" for i in range(1000))
+        output = SpilledOutput.write(self.directory, text, excerpt_chars=10)
+        assert output.size == len(text)
+        assert output.head == "line 0\nlin"
+        assert output.tail == "\nline 999\n"
+        assert str(output) == text
+        assert "".join(output.chunks(size=7)) == text
+
+    def test_short(self):
+        output = SpilledOutput.write(self.directory, "short", excerpt_chars=10)
+        assert (output.head, output.tail) == ("short", "")
+        assert output.excerpt() == "short"
+
+    def test_missing_file(self):
+        output = SpilledOutput.write(self.directory, "a" * 30, excerpt_chars=10)
+        os.unlink(output.path)
+        assert str(output) == f"{'a' * 10}\n… 10 more characters …\n{'a' * 10}"
+
+    def test_pickle(self):
+        output = SpilledOutput.write(self.directory, "text")
+        unpickled = pickle.loads(pickle.dumps(output))
+        assert unpickled == output
+        assert str(unpickled) == "text"
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from django.test import SimpleTestCase
+
+from django_rich._sql_log import LoggedQuery, summarize_sql_log
+
+
+class SummarizeSQLLogTests(SimpleTestCase):
+    def test_empty(self):
+        assert summarize_sql_log("") == (0, 0.0, [])
+
+    def test_collapse(self):
+        summary = summarize_sql_log(
+            "(0.001) SELECT 1; args=None; alias=default\n"
+            + "(0.002) SELECT\n       2; args=(2,); alias=default\n"
+            + "(0.003) SELECT 1; args=None; alias=default\n"
+        )
+        assert summary.queries == 3
+        assert round(summary.time, 3) == 0.006
+        assert summary.unique == [
+            LoggedQuery("SELECT 1; args=None; alias=default", 0.004, 2),
+            LoggedQuery("SELECT\n       2; args=(2,); alias=default", 0.002),
+        ]
+
+    def test_other_text(self):
+        summary = summarize_sql_log("Other output\n(0.001) SELECT 1\n")
+        assert summary.queries == 1
+        assert summary.unique[0] == LoggedQuery("Other output", None)
+
+    def test_format(self):
+        assert LoggedQuery("SELECT 1", 0.5).format() == "(0.500) SELECT 1"
+        assert LoggedQuery("SELECT 1", 0.5, 3).format() == "3× (0.500) SELECT 1"
+        assert LoggedQuery("Other", None).format() == "Other"
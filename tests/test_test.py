@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import copy
 import inspect
+import json
 import os
+import pickle
 import re
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
 import time
 import unittest.case
+from io import StringIO
 from pathlib import Path
 from textwrap import dedent
 
@@ -15,6 +22,19 @@ import pytest
 from django.db import connection
 from django.test import SimpleTestCase, TestCase
 from django.test.runner import DiscoverRunner
+from rich.text import Text
+
+from django_rich.test import LocalsLimits, TracebackSnapshot
+from tests.testapp.models import Book
+from tests.utils import make_result
+
+# Kept alive by ExampleTests.test_leak.
+leaked: list[bytearray] = []
+
+# Runs of ExampleTests.test_flaky in this process.
+flaky_runs = 0
+# Runs of ExampleTests.test_fail_then_hang in this process.
+fail_then_hang_runs = 0
 
 
 @pytest.mark.skip(reason="Run below via Django unittest subprocess.")
@@ -39,6 +59,25 @@ class ExampleTests(TestCase):
             )
         self.assertTrue(False)
 
+    def test_failure_many_sql_queries(self):
+        with connection.cursor() as cursor:
+            for i in range(30):
+                cursor.execute("SELECT %s", (i,))
+            for _ in range(5):
+                cursor.execute("SELECT 1234")
+        self.assertTrue(False)
+
+    def test_failure_queryset_local(self):
+        books = Book.objects.filter(title="Dune")  # noqa: F841
+        self.assertTrue(False)
+
+    def test_queries(self):
+        for _ in range(3):
+            Book.objects.count()
+
+    def test_leak(self):
+        leaked.append(bytearray(1024 * 1024))
+
     def test_skip(self):
         self.skipTest("some reason")
 
@@ -85,6 +124,33 @@ class ExampleTests(TestCase):
                 # 1 is not even.
                 self.assertEqual(i % 2, 0)
 
+    def test_hang(self):
+        threading.Event().wait(timeout=10)
+
+    def test_failure_many_subtests(self):
+        for i in range(20):
+            with self.subTest(i=i):
+                self.assertLess(i, 15)
+
+    def test_failure_large_dict(self):
+        expected = {"users": [{"id": i, "name": f"User {i}"} for i in range(1000)]}
+        actual = copy.deepcopy(expected)
+        actual["users"][500]["name"] = "Changed"
+        del actual["users"][900]
+        self.assertEqual(actual, expected)
+
+    def test_flaky(self):
+        global flaky_runs
+        flaky_runs += 1
+        self.assertGreater(flaky_runs, 1)
+
+    def test_fail_then_hang(self):
+        global fail_then_hang_runs
+        fail_then_hang_runs += 1
+        if fail_then_hang_runs == 1:
+            self.fail("fail")
+        threading.Event().wait(timeout=10)
+
     def test_skip_subtest(self):
         with self.subTest("success", a=1):
             pass
@@ -141,6 +207,7 @@ class TestRunnerTests(SimpleTestCase):
         *args: str,
         input: str | None = None,
         width: int = 80,
+        cwd: Path | None = None,
     ) -> subprocess.CompletedProcess[str]:
         return subprocess.run(
             [
@@ -153,16 +220,21 @@ class TestRunnerTests(SimpleTestCase):
             input=input,
             capture_output=True,
             text=True,
-            env={
-                **os.environ,
-                "DJANGO_SETTINGS_MODULE": "tests.settings",
-                "COVERAGE_PROCESS_START": str(PYPROJECT_PATH),
-                # Ensure rich uses colouring and consistent width
-                "TERM": "",
-                "COLUMNS": str(width),
-            },
+            cwd=cwd,
+            env=self.subprocess_env(width),
         )
 
+    def subprocess_env(self, width: int = 80) -> dict[str, str]:
+        return {
+            **os.environ,
+            "PYTHONPATH": str(PYPROJECT_PATH.parent),
+            "DJANGO_SETTINGS_MODULE": "tests.settings",
+            "COVERAGE_PROCESS_START": str(PYPROJECT_PATH),
+            # Ensure rich uses colouring and consistent width
+            "TERM": "",
+            "COLUMNS": str(width),
+        }
+
     def test_does_not_exist(self):
         result = self.run_test("does_not_exist")
         assert result.returncode == 1
@@ -500,6 +572,35 @@ class TestRunnerTests(SimpleTestCase):
                 "━" * 80,
             ]
 
+    def test_debug_sql_summary(self):
+        result = self.run_test(
+            "--debug-sql", f"{__name__}.ExampleTests.test_failure_many_sql_queries"
+        )
+
+        assert result.returncode == 1
+        assert "args=(0,)" in result.stderr
+        assert "args=(9,)" in result.stderr
+        assert "args=(10,)" not in result.stderr
+        assert "… 11 more unique queries …" in result.stderr
+        assert "args=(29,)" in result.stderr
+        assert re.search(r"5× \(\d.\d\d\d\) SELECT 1234", result.stderr)
+        assert "35 queries in " in result.stderr
+        assert ", 31 unique." in result.stderr
+
+    def test_debug_sql_queryset_local(self):
+        result = self.run_test(
+            "--debug-sql",
+            f"{__name__}.ExampleTests.test_failure_queryset_local",
+            width=200,
+        )
+
+        assert result.returncode == 1
+        assert (
+            "books = <QuerySet (unevaluated) model=testapp.Book sql=" in result.stderr
+        )
+        # The QuerySet repr did not run its query.
+        assert "LIMIT 21" not in result.stderr
+
     def test_pdb(self):
         result = self.run_test(
             "--pdb",
@@ -534,6 +635,491 @@ class TestRunnerTests(SimpleTestCase):
         assert 'self.assertURLEqual("/url/", "/test/")' in result.stderr
         assert result.stderr.count("─ locals ─") == 1
 
+    def test_deferred_tracebacks(self):
+        result = self.run_test(
+            "--deferred-tracebacks", f"{__name__}.ExampleTests.test_error"
+        )
+        assert result.returncode == 1
+        lines = result.stderr.splitlines()
+        if sys.version_info >= (3, 11):
+            assert lines[1:4] == [
+                "E",
+                "─" * 80,
+                "ERROR: test_error (tests.test_test.ExampleTests.test_error)",
+            ]
+        else:
+            assert lines[1:4] == [
+                "E",
+                "─" * 80,
+                "ERROR: test_error (tests.test_test.ExampleTests)",
+            ]
+        assert "─ locals ─" in result.stderr
+        assert "testPartExecutor" not in result.stderr
+        assert lines[-7:-5] == [
+            "ValueError: Woops",
+            "",
+        ]
+
+    def test_deferred_tracebacks_buffer(self):
+        result = self.run_test(
+            "--deferred-tracebacks",
+            "--buffer",
+            f"{__name__}.ExampleTests.test_failure_stdout",
+        )
+        assert result.returncode == 1
+        assert result.stderr.splitlines()[-10:-4] == [
+            "AssertionError: False is not true",
+            "",
+            "Stdout:",
+            "This is some example output",
+            "",
+            "━" * 80,
+        ]
+
+    def test_parallel(self):
+        result = self.run_test(
+            "--parallel",
+            "2",
+            f"{__name__}.ExampleTests.test_error",
+            f"{__name__}.ExampleTests.test_expected_failure",
+            f"{__name__}.TearDownFailTests.test_tearDownError_success",
+        )
+        assert result.returncode == 1
+        assert sorted(result.stderr.splitlines()[3]) == ["E", "F", "x"]
+        assert result.stderr.count("─ locals ─") == 2
+        assert "testPartExecutor" not in result.stderr
+        assert "ValueError: Woops" in result.stderr
+        assert "AssertionError: fail" in result.stderr
+
+    def test_parallel_subtest(self):
+        result = self.run_test(
+            "--parallel",
+            "2",
+            f"{__name__}.ExampleTests.test_failure_subtest",
+            f"{__name__}.TearDownErrorTests.test_tearDownError_skip",
+        )
+        assert result.returncode == 1
+        assert sorted(result.stderr.splitlines()[3]) == ["E", "F", "s"]
+        assert result.stderr.count("─ locals ─") == 2
+        assert "AssertionError: 1 != 0" in result.stderr
+
+    def test_parallel_deferred_tracebacks(self):
+        result = self.run_test(
+            "--parallel",
+            "2",
+            "--deferred-tracebacks",
+            f"{__name__}.ExampleTests.test_error",
+            f"{__name__}.TearDownFailTests.test_tearDownError_success",
+        )
+        assert result.returncode == 1
+        assert result.stderr.count("─ locals ─") == 2
+        assert "ValueError: Woops" in result.stderr
+
+    def test_progress(self):
+        result = self.run_test(
+            "--progress",
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_error",
+            f"{__name__}.ExampleTests.test_failure",
+        )
+        assert result.returncode == 1
+        lines = result.stderr.splitlines()
+        assert "." not in lines
+        assert result.stderr.count("ERROR: test_error") == 1
+        assert result.stderr.count("FAIL: test_failure") == 1
+        assert "─ locals ─" in result.stderr
+        progress_lines = [line for line in lines if line.startswith("Testing ")]
+        assert len(progress_lines) == 1
+        assert re.search(r" 3/3 2 failed ", progress_lines[0])
+        # Errors print before the final progress bar, not after.
+        assert lines.index(progress_lines[0]) > lines.index(
+            next(line for line in lines if line.startswith("FAIL: test_failure"))
+        )
+        assert "FAILED (failures=1, errors=1)" in lines
+
+    def test_progress_debug_sql(self):
+        result = self.run_test(
+            "--progress",
+            "--debug-sql",
+            f"{__name__}.ExampleTests.test_failure_sql_query",
+        )
+        assert result.returncode == 1
+        assert result.stderr.count("FAIL: test_failure_sql_query") == 1
+        assert "SELECT 1234" in result.stderr
+
+    def test_progress_pdb(self):
+        result = self.run_test(
+            "--progress", "--pdb", f"{__name__}.ExampleTests.test_pass"
+        )
+        assert result.returncode == 1
+        assert "ValueError: You cannot use --pdb with --progress." in result.stderr
+
+    def test_duration_history(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            for _ in range(2):
+                result = self.run_test(
+                    "--duration-history",
+                    f"{__name__}.ExampleTests.test_pass",
+                    f"{__name__}.ExampleTests.test_slow",
+                    cwd=cwd,
+                )
+                assert result.returncode == 0
+            cache_dir = cwd / ".django_rich_cache"
+            assert (cache_dir / ".gitignore").read_text().endswith("*\n")
+            data = json.loads((cache_dir / "durations.json").read_text())
+        durations = data["durations"]
+        assert set(durations) == {
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_slow",
+        }
+        average, runs = durations[f"{__name__}.ExampleTests.test_slow"]
+        assert average >= 0.002
+        assert runs == 2
+
+    def test_duration_history_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            result = self.run_test(
+                "--duration-history",
+                "--parallel",
+                "2",
+                f"{__name__}.ExampleTests.test_slow",
+                f"{__name__}.TearDownFailTests.test_tearDownError_success",
+                cwd=cwd,
+            )
+            data = json.loads((cwd / ".django_rich_cache/durations.json").read_text())
+        assert result.returncode == 1
+        average, runs = data["durations"][f"{__name__}.ExampleTests.test_slow"]
+        assert 0.002 <= average < 1.0
+        assert runs == 1
+        assert (
+            f"{__name__}.TearDownFailTests.test_tearDownError_success"
+            in (data["durations"])
+        )
+
+    def test_shard(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                "--shard",
+                "2/2",
+                f"{__name__}.ExampleTests.test_pass",
+                f"{__name__}.ExampleTests.test_slow",
+                cwd=Path(tmp_dir),
+            )
+        assert result.returncode == 0
+        assert "Ran 0 tests" in result.stderr
+        assert "Shard 2/2" in result.stderr
+
+    def test_last_failed(self):
+        labels = (
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_failure",
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(*labels, cwd=Path(tmp_dir))
+            assert result.returncode == 1
+            assert "Ran 2 tests" in result.stderr
+
+            result = self.run_test("--last-failed", *labels, cwd=Path(tmp_dir))
+            assert result.returncode == 1
+            assert "Running 1 test(s) that failed previously." in result.stdout
+            assert "Ran 1 test" in result.stderr
+
+            result = self.run_test(
+                "--failed-first", "-v", "2", *labels, cwd=Path(tmp_dir)
+            )
+        assert result.returncode == 1
+        assert "Running 1 test(s) that failed previously first." in result.stdout
+        assert result.stderr.index("test_failure ") < result.stderr.index("test_pass ")
+
+    def test_passing_run_no_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                f"{__name__}.ExampleTests.test_pass", cwd=Path(tmp_dir)
+            )
+            assert result.returncode == 0
+            assert not (Path(tmp_dir) / ".django_rich_cache").exists()
+
+    def test_discovery_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for _ in range(2):
+                result = self.run_test(
+                    "--discovery-cache",
+                    "-k",
+                    "*.ExampleTests.test_pass",
+                    str(PYPROJECT_PATH.parent / "tests"),
+                    cwd=Path(tmp_dir),
+                )
+                assert result.returncode == 0
+                assert "Ran 1 test" in result.stderr
+                assert "Test discovery" in result.stderr
+        # Only the module with the matching test is imported the second time.
+        assert re.search(r"Total +│ +1 │ +\d+ │ +1 │", result.stderr)
+
+    def test_timing_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "timing.json"
+            result = self.run_test(
+                "--parallel",
+                "2",
+                "--timing-json",
+                str(path),
+                f"{__name__}.ExampleTests.test_pass",
+                f"{__name__}.TearDownFailTests.test_tearDownError_success",
+            )
+            data = json.loads(path.read_text())
+        assert result.returncode == 1
+        assert "Timing" in result.stderr
+        assert "Worker startup" in result.stderr
+        phases = {child["name"]: child for child in data["children"]}
+        assert list(phases) == [
+            "Test environment setup",
+            "Test discovery",
+            "Database setup",
+            "System checks",
+            "Tests",
+            "Database teardown",
+            "Test environment teardown",
+        ]
+        setup = {child["name"]: child for child in phases["Database setup"]["children"]}
+        assert setup["Cloning 'default'"]["count"] == 2
+        creating = [child["name"] for child in setup["Creating 'default'"]["children"]]
+        assert "migrate command" in creating
+        assert phases["Tests"]["children"][0]["name"] == "Worker startup"
+
+    def test_shard_invalid(self):
+        result = self.run_test("--shard", "3/2")
+        assert result.returncode == 2
+        assert "argument --shard: Invalid shard '3/2'" in result.stderr
+
+    def test_class_module_durations(self):
+        result = self.run_test(
+            "--class-durations",
+            "10",
+            "--module-durations",
+            "10",
+            f"{__name__}.ExampleTests.test_slow",
+        )
+        assert result.returncode == 0
+        assert "Slowest test classes" in result.stderr
+        assert "tests.test_test.ExampleTests" in result.stderr
+        assert "Slowest test modules" in result.stderr
+
+    def test_durations_not_abbreviation(self):
+        # Django only has --durations on Python 3.12+, where it must not be
+        # taken as an abbreviation of another option.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.run_test(
+                "--durations",
+                "5",
+                f"{__name__}.ExampleTests.test_slow",
+                cwd=Path(tmp_dir),
+            )
+            assert not (Path(tmp_dir) / "5").exists()
+
+    def test_export_durations_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                "--parallel",
+                "2",
+                "--export-durations",
+                "durations.json",
+                f"{__name__}.ExampleTests.test_slow",
+                f"{__name__}.TearDownFailTests.test_tearDownError_success",
+                cwd=Path(tmp_dir),
+            )
+            data = json.loads((Path(tmp_dir) / "durations.json").read_text())
+        assert result.returncode == 1
+        assert set(data["tests"]) == {
+            f"{__name__}.ExampleTests.test_slow",
+            f"{__name__}.TearDownFailTests.test_tearDownError_success",
+        }
+        example = data["classes"][f"{__name__}.ExampleTests"]
+        assert example["tests"] == 1
+        # TestCase.setUpClass() and tearDownClass() are timed in the workers.
+        assert example["fixtures"] > 0
+        assert data["modules"][__name__]["tests"] == 2
+
+    def test_query_counts(self):
+        result = self.run_test(
+            "--query-counts",
+            "10",
+            "--query-sql",
+            f"{__name__}.ExampleTests.test_queries",
+            f"{__name__}.ExampleTests.test_pass",
+            width=200,
+        )
+        assert result.returncode == 0
+        assert "Most database queries" in result.stderr
+        row = next(
+            line for line in result.stderr.splitlines() if "test_queries" in line
+        )
+        assert re.search(r"│ +3 │ +2 │", row)
+        assert '3× SELECT COUNT(*) AS "__count" FROM "testapp_book"' in row
+        assert "test_pass" not in result.stderr.split("Most database queries")[1]
+
+    def test_query_counts_parallel(self):
+        result = self.run_test(
+            "--parallel",
+            "2",
+            "--query-counts",
+            "10",
+            f"{__name__}.ExampleTests.test_queries",
+            f"{__name__}.TearDownFailTests.test_tearDownError_success",
+            width=200,
+        )
+        assert result.returncode == 1
+        row = next(
+            line for line in result.stderr.splitlines() if "test_queries" in line
+        )
+        assert re.search(r"│ +3 │ +2 │", row)
+
+    def test_profile(self):
+        result = self.run_test(
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_slow",
+            "--profile=test_slow",
+            width=200,
+        )
+        assert result.returncode == 0
+        assert "Profile by app" in result.stderr
+        assert "(test_slow)" in result.stderr
+        assert "(test_pass)" not in result.stderr
+
+    def test_profile_parallel(self):
+        result = self.run_test("--profile", "--parallel", "2", "does_not_exist")
+        assert result.returncode == 1
+        assert (
+            "ValueError: You cannot use --profile with parallel tests; pass "
+            + "--parallel=1 to use it."
+        ) in result.stderr
+
+    def test_memory(self):
+        result = self.run_test(
+            "--memory",
+            "tracemalloc",
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_leak",
+            width=200,
+        )
+        assert result.returncode == 0
+        assert "Most memory growth" in result.stderr
+        row = next(line for line in result.stderr.splitlines() if "test_leak" in line)
+        assert re.search(r"│ +\+1\.0 MiB │", row)
+        assert "Most memory growth by class" in result.stderr
+        assert "Top allocation sites" in result.stderr
+        assert "tests/test_test.py:" in result.stderr
+
+    def test_memory_parallel(self):
+        result = self.run_test(
+            "--parallel",
+            "2",
+            "--memory",
+            "tracemalloc",
+            f"{__name__}.ExampleTests.test_leak",
+            f"{__name__}.TearDownFailTests.test_tearDownError_success",
+            width=200,
+        )
+        assert result.returncode == 1
+        assert "Most memory growth" in result.stderr
+        assert "test_leak" in result.stderr.split("Most memory growth")[1]
+        assert "Top allocation sites" not in result.stderr
+
+    def test_duplicate_errors(self):
+        result = self.run_test(
+            "--collapse-errors", f"{__name__}.TearDownFailTests", width=200
+        )
+        assert result.returncode == 1
+        assert result.stderr.count("AssertionError: fail") == 1
+        assert "FAIL: 2 more with the same error" in result.stderr
+
+    def test_duplicate_errors_parallel(self):
+        result = self.run_test(
+            "--collapse-errors",
+            "--parallel",
+            "2",
+            f"{__name__}.TearDownFailTests",
+            width=200,
+        )
+        assert result.returncode == 1
+        assert result.stderr.count("AssertionError: fail") == 1
+        assert "FAIL: 2 more with the same error" in result.stderr
+
+    def test_duplicate_errors_debug_sql(self):
+        result = self.run_test(
+            "--debug-sql",
+            "--collapse-errors",
+            f"{__name__}.TearDownFailTests",
+            width=200,
+        )
+        assert result.returncode == 1
+        assert result.stderr.count("AssertionError: fail") == 1
+        assert "FAIL: 2 more with the same error" in result.stderr
+
+    def test_duplicate_errors_default(self):
+        result = self.run_test(f"{__name__}.TearDownFailTests", width=200)
+        assert result.returncode == 1
+        assert result.stderr.count("AssertionError: fail") == 3
+        assert "more with the same error" not in result.stderr
+
+    def test_async_output(self):
+        labels = (
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_failure",
+            f"{__name__}.ExampleTests.test_error",
+        )
+        expected = self.run_test(*labels)
+        result = self.run_test("--async-output", *labels)
+        assert result.returncode == 1
+
+        def strip_time(output: str) -> str:
+            return re.sub(r"in [\d.]+s", "", output)
+
+        assert strip_time(result.stderr) == strip_time(expected.stderr)
+
+    def test_reports(self):
+        labels = (
+            f"{__name__}.ExampleTests.test_pass",
+            f"{__name__}.ExampleTests.test_failure_stdout",
+            f"{__name__}.ExampleTests.test_failure_subtest",
+            f"{__name__}.ExampleTests.test_skip",
+        )
+        reports = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for processes in ("1", "2"):
+                jsonl = Path(tmp_dir) / f"{processes}.jsonl"
+                junit_xml = Path(tmp_dir) / f"{processes}.xml"
+                result = self.run_test(
+                    "--buffer",
+                    "--parallel",
+                    processes,
+                    "--jsonl",
+                    str(jsonl),
+                    "--junit-xml",
+                    str(junit_xml),
+                    *labels,
+                )
+                assert result.returncode == 1
+                assert "<testcase" in junit_xml.read_text()
+                lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+                for line in lines:
+                    line.pop("duration")
+                reports.append(sorted(lines, key=lambda line: line.get("test", "")))
+
+        serial, parallel = reports
+        assert serial == parallel
+        by_test = {line.get("test"): line for line in serial}
+        stdout = by_test[f"{__name__}.ExampleTests.test_failure_stdout"]
+        assert stdout["outcome"] == "failed"
+        assert stdout["stdout"] == "This is some example output\n"
+        assert stdout["problems"][0]["traceback"].startswith(
+            "Traceback (most recent call last):\n"
+        )
+        subtest = by_test[f"{__name__}.ExampleTests.test_failure_subtest"]
+        assert subtest["problems"][0]["message"] == "(i=1) 1 != 0"
+        assert by_test[None]["tests"] == 4
+
     def test_buffer_pass(self):
         result = self.run_test("--buffer", f"{__name__}.ExampleTests.test_pass_output")
         assert result.returncode == 0
@@ -554,6 +1140,379 @@ class TestRunnerTests(SimpleTestCase):
             "━" * 80,
         ]
 
+    def test_buffer_spill_output(self):
+        result = self.run_test(
+            "--buffer",
+            "--spill-output",
+            "10",
+            f"{__name__}.ExampleTests.test_failure_stdout",
+        )
+        assert result.returncode == 1
+        assert result.stderr.splitlines()[-10:-4] == [
+            "AssertionError: False is not true",
+            "",
+            "Stdout:",
+            "This is some example output",
+            "",
+            "━" * 80,
+        ]
+
+    def test_buffer_spill_output_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jsonl = Path(tmp_dir) / "report.jsonl"
+            result = self.run_test(
+                "--buffer",
+                "--spill-output",
+                "10",
+                "--parallel",
+                "2",
+                "--jsonl",
+                str(jsonl),
+                f"{__name__}.ExampleTests.test_failure_stdout",
+                f"{__name__}.TearDownFailTests.test_tearDownError_success",
+            )
+            lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+        assert result.returncode == 1
+        assert "Stdout:\nThis is some example output\n" in result.stderr
+        by_test = {line.get("test"): line for line in lines}
+        stdout = by_test[f"{__name__}.ExampleTests.test_failure_stdout"]
+        assert stdout["stdout"] == "This is some example output\n"
+
+    def test_structural_diffs(self):
+        result = self.run_test(
+            "--structural-diffs", f"{__name__}.ExampleTests.test_failure_large_dict"
+        )
+        assert result.returncode == 1
+        assert result.stderr.splitlines()[-9:-5] == [
+            "{'users': [{...}, {...}, {...}, {...}, {...}, {...}, ...]}",
+            "~ ['users'][500]['name']: 'Changed' != 'User 500'",
+            "+ ['users'][900]: {'id': 900, 'name': 'User 900'}",
+            "",
+        ]
+        assert "Diff is" not in result.stderr
+
+    def test_structural_diffs_parallel(self):
+        result = self.run_test(
+            "--structural-diffs",
+            "--parallel",
+            "2",
+            f"{__name__}.ExampleTests.test_failure_large_dict",
+            f"{__name__}.ExampleTests.test_pass",
+        )
+        assert result.returncode == 1
+        assert "~ ['users'][500]['name']: 'Changed' != 'User 500'\n" in result.stderr
+
+    def test_reruns(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            result = self.run_test(
+                "--reruns",
+                "1",
+                f"{__name__}.ExampleTests.test_flaky",
+                f"{__name__}.ExampleTests.test_failure",
+                cwd=cwd,
+            )
+            data = json.loads((cwd / ".django_rich_cache/flaky.json").read_text())
+        assert result.returncode == 1
+        lines = result.stderr.splitlines()
+        assert lines[1:3] == ["FF", "Rerunning 2 failed test(s)..."]
+        assert "FAIL: test_failure " in result.stderr
+        assert "FAIL: test_flaky " not in result.stderr
+        assert "FAILED (failures=1)" in lines
+        assert lines[-6:-2] == [
+            "┏━━━━━━━━━━━┳━━━━━━━━━━━━━━━━━━┳━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┓",
+            "┃ Passed on ┃       Flake rate ┃ Test                                    ┃",
+            "┡━━━━━━━━━━━╇━━━━━━━━━━━━━━━━━━╇━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┩",
+            "│   rerun 1 │ 100% of 1 run(s) │ tests.test_test.ExampleTests.test_flaky │",
+        ]
+        assert data["flaky"] == {f"{__name__}.ExampleTests.test_flaky": [1.0, 1]}
+
+    def test_reruns_debug_sql(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                "--debug-sql",
+                "--reruns",
+                "1",
+                f"{__name__}.ExampleTests.test_flaky",
+                f"{__name__}.ExampleTests.test_failure",
+                cwd=Path(tmp_dir),
+            )
+        assert result.returncode == 1
+        assert "FAIL: test_failure " in result.stderr
+        assert "FAIL: test_flaky " not in result.stderr
+
+    def test_reruns_progress(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                "--progress",
+                "--reruns",
+                "1",
+                f"{__name__}.ExampleTests.test_flaky",
+                f"{__name__}.ExampleTests.test_failure",
+                cwd=Path(tmp_dir),
+            )
+        assert result.returncode == 1
+        assert result.stderr.count("FAIL: test_failure ") == 1
+
+    def test_reruns_timeout(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                "--reruns",
+                "1",
+                "--timeout",
+                "0.5",
+                f"{__name__}.ExampleTests.test_fail_then_hang",
+                cwd=Path(tmp_dir),
+            )
+        assert result.returncode == 1
+        assert f"TIMEOUT: {__name__}.ExampleTests.test_fail_then_hang" in result.stderr
+        assert "FAIL: test_fail_then_hang " in result.stderr
+        assert "Passed on" not in result.stderr
+
+    def test_reruns_reports(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            result = self.run_test(
+                "--reruns",
+                "1",
+                "--junit-xml",
+                "report.xml",
+                "--jsonl",
+                "report.jsonl",
+                f"{__name__}.ExampleTests.test_flaky",
+                f"{__name__}.ExampleTests.test_failure",
+                cwd=cwd,
+            )
+            junit_xml = (cwd / "report.xml").read_text()
+            lines = [
+                json.loads(line)
+                for line in (cwd / "report.jsonl").read_text().splitlines()
+            ]
+        assert result.returncode == 1
+        assert 'tests="2" failures="1" errors="0"' in junit_xml
+        assert (
+            '<testcase classname="tests.test_test.ExampleTests" name="test_flaky"'
+            in junit_xml
+        )
+        assert '<property name="reruns" value="1"/>' in junit_xml
+        by_test = {line.get("test"): line for line in lines}
+        flaky = by_test[f"{__name__}.ExampleTests.test_flaky"]
+        assert flaky["outcome"] == "passed"
+        assert flaky["problems"] == []
+        assert flaky["reruns"] == 1
+        assert by_test[f"{__name__}.ExampleTests.test_failure"]["outcome"] == "failed"
+        assert by_test[None]["passed"] == 1
+        assert by_test[None]["failed"] == 1
+
+    def test_reruns_parallel(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_test(
+                "--reruns",
+                "2",
+                "--parallel",
+                "2",
+                f"{__name__}.ExampleTests.test_flaky",
+                f"{__name__}.TearDownFailTests.test_tearDownError_success",
+                cwd=Path(tmp_dir),
+            )
+        assert result.returncode == 1
+        assert "Rerunning 2 failed test(s)..." in result.stderr
+        assert "FAIL: test_flaky " not in result.stderr
+        # Rerun in the main process, where the test hasn't run before.
+        assert "│   rerun 2 │" in result.stderr
+
+    def test_watch(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            (cwd / "watchapp").mkdir()
+            (cwd / "watchapp/__init__.py").write_text("")
+            (cwd / "watchapp/helpers.py").write_text("VALUE = 1\n")
+            (cwd / "watchapp/test_helpers.py").write_text(
+                dedent(
+                    """\
+                    from unittest import TestCase
+
+                    from watchapp.helpers import VALUE
+
+
+                    class HelpersTests(TestCase):
+                        def test_value(self):
+                            self.assertEqual(VALUE, 2)
+                    """
+                )
+            )
+            (cwd / "watchapp/test_other.py").write_text(
+                dedent(
+                    """\
+                    from unittest import TestCase
+
+
+                    class OtherTests(TestCase):
+                        def test_pass(self):
+                            pass
+                    """
+                )
+            )
+            process = subprocess.Popen(
+                ["python", "-m", "django", "test", "--watch", "watchapp"],
+                stderr=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                text=True,
+                cwd=cwd,
+                env=self.subprocess_env(),
+            )
+            assert process.stderr is not None
+            try:
+                output = []
+                edited = False
+                for line in process.stderr:
+                    output.append(line)
+                    if line.startswith("Watching"):
+                        if edited:
+                            break
+                        (cwd / "watchapp/helpers.py").write_text("VALUE = 1 + 1\n")
+                        edited = True
+                process.send_signal(signal.SIGINT)
+                process.communicate(timeout=30)
+            finally:
+                process.kill()
+        lines = "".join(output).splitlines()
+        assert "FAILED (failures=1)" in lines
+        assert lines[-7:-4] == [
+            "─" * 25 + " Changed: watchapp/helpers.py " + "─" * 25,
+            ".",
+            "━" * 80,
+        ]
+        assert lines[-4].startswith("Ran 1 test in ")
+        assert lines[-3:] == [
+            "",
+            "OK",
+            "Watching 4 files for changes. Press Ctrl+C to stop.",
+        ]
+        assert process.returncode == 0
+
+    def test_watch_pdb(self):
+        result = self.run_test("--watch", "--pdb", f"{__name__}.ExampleTests.test_pass")
+        assert result.returncode == 1
+        assert "ValueError: You cannot use --pdb with --watch." in result.stderr
+
+    def write_impact_project(self, cwd: Path) -> None:
+        (cwd / "impactapp").mkdir()
+        (cwd / "impactapp/__init__.py").write_text("")
+        (cwd / "impactapp/helpers.py").write_text("def double(x):\n    return x * 2\n")
+        (cwd / "impactapp/test_helpers.py").write_text(
+            dedent(
+                """\
+                from unittest import TestCase
+
+                from impactapp.helpers import double
+
+
+                class HelpersTests(TestCase):
+                    def test_double(self):
+                        self.assertEqual(double(2), 4)
+                """
+            )
+        )
+        (cwd / "impactapp/test_other.py").write_text(
+            dedent(
+                """\
+                from unittest import TestCase
+
+
+                class OtherTests(TestCase):
+                    def test_one(self):
+                        pass
+
+                    def test_two(self):
+                        pass
+                """
+            )
+        )
+
+    def test_record_impact(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            self.write_impact_project(cwd)
+            result = self.run_test("--record-impact", "impactapp", cwd=cwd)
+            assert result.returncode == 0
+            data = json.loads((cwd / ".django_rich_cache/impact.json").read_text())
+            result = self.run_test(
+                "--changed-files", "impactapp/helpers.py", "impactapp", cwd=cwd
+            )
+        assert data == {
+            "version": 1,
+            "files": [
+                "impactapp/helpers.py",
+                "impactapp/test_helpers.py",
+                "impactapp/test_other.py",
+            ],
+            "classes": {
+                "impactapp.test_helpers.HelpersTests": [0, 1],
+                "impactapp.test_other.OtherTests": [2],
+            },
+        }
+        assert result.returncode == 0
+        assert "Running 1 test(s) affected by 1 changed file(s)." in result.stdout
+        assert "Ran 1 test in " in result.stderr
+        assert result.stderr.splitlines()[-8:] == [
+            "         Test impact          ",
+            "┏━━━━━━━━━━┳━━━━━━━━━┳━━━━━━━┓",
+            "┃          ┃ Classes ┃ Tests ┃",
+            "┡━━━━━━━━━━╇━━━━━━━━━╇━━━━━━━┩",
+            "│ Selected │       1 │     1 │",
+            "│ Skipped  │       1 │     2 │",
+            "└──────────┴─────────┴───────┘",
+            "Selected classes ran any of the 1 changed file(s).",
+        ]
+
+    def test_changed_since(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = Path(tmp_dir)
+            self.write_impact_project(cwd)
+            (cwd / ".gitignore").write_text("__pycache__/\n.coverage/\n")
+            git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+            subprocess.run([*git, "init", "-q"], cwd=cwd, check=True)
+            subprocess.run([*git, "add", "."], cwd=cwd, check=True)
+            subprocess.run([*git, "commit", "-q", "-m", "Initial"], cwd=cwd, check=True)
+            result = self.run_test("--changed-since", "HEAD", "impactapp", cwd=cwd)
+            assert "No impact index, running all tests." in result.stdout
+            assert "Ran 3 tests in " in result.stderr
+            self.run_test("--record-impact", "impactapp", cwd=cwd)
+
+            (cwd / "impactapp/test_new.py").write_text(
+                "from unittest import TestCase\n\n\n"
+                + "class NewTests(TestCase):\n"
+                + "    def test_new(self):\n"
+                + "        pass\n"
+            )
+            result = self.run_test("--changed-since", "HEAD", "impactapp", cwd=cwd)
+            assert result.returncode == 0
+            assert "Ran 1 test in " in result.stderr
+            assert result.stderr.splitlines()[-2:] == [
+                "Selected classes ran any of the 1 changed file(s), or are missing "
+                + "from the ",
+                "impact index (1).",
+            ]
+
+            (cwd / "impactapp/constants.py").write_text("VALUE = 1\n")
+            result = self.run_test("--changed-since", "HEAD", "impactapp", cwd=cwd)
+        assert result.returncode == 0
+        assert (
+            "Running all tests, as no recorded tests ran these changed files: "
+            + "impactapp/constants.py"
+        ) in result.stdout
+        assert "Ran 4 tests in " in result.stderr
+
+    def test_record_impact_parallel(self):
+        result = self.run_test(
+            "--record-impact", "--parallel", "2", f"{__name__}.ExampleTests.test_pass"
+        )
+        assert result.returncode == 1
+        assert (
+            "ValueError: You cannot use --record-impact with parallel tests"
+        ) in result.stderr
+
     def test_buffer_stdout_no_newline(self):
         result = self.run_test(
             "--buffer", f"{__name__}.ExampleTests.test_failure_stdout_no_newline"
@@ -955,6 +1914,84 @@ class TestRunnerTests(SimpleTestCase):
                 "",
             ]
 
+    def test_aggregate_subtests(self):
+        result = self.run_test(
+            "--aggregate-subtests",
+            f"{__name__}.ExampleTests.test_failure_many_subtests",
+            f"{__name__}.ExampleTests.test_mixed_subtest",
+        )
+        assert result.returncode == 1
+        lines = result.stderr.splitlines()
+        assert lines[1] == "FsF"
+        assert result.stderr.count("AssertionError: 15 not less than 15") == 1
+        assert "FAIL: 4 more with the same error" in result.stderr
+        assert "(i=19)" in result.stderr
+        assert "AssertionError: fail" in result.stderr
+        assert "Exception: error" in result.stderr
+
+    def test_aggregate_subtests_verbose(self):
+        result = self.run_test(
+            "-v",
+            "2",
+            "--aggregate-subtests",
+            f"{__name__}.ExampleTests.test_failure_many_subtests",
+            f"{__name__}.ExampleTests.test_subtest",
+        )
+        assert result.returncode == 1
+        assert (
+            "ExampleTests.test_failure_many_subtests) ... FAIL (5 of 20 subtests)\n"
+            in result.stderr
+        )
+        assert "ExampleTests.test_subtest) ... ok (2 subtests)\n" in result.stderr
+
+    def test_aggregate_subtests_parallel(self):
+        result = self.run_test(
+            "-v",
+            "2",
+            "--parallel",
+            "2",
+            "--aggregate-subtests",
+            f"{__name__}.ExampleTests.test_failure_many_subtests",
+            f"{__name__}.ExampleTests.test_subtest",
+        )
+        assert result.returncode == 1
+        assert "... FAIL (5 of 20 subtests)\n" in result.stderr
+        assert "... ok (2 subtests)\n" in result.stderr
+        assert result.stderr.count("AssertionError: 15 not less than 15") == 1
+        assert "FAIL: 4 more with the same error" in result.stderr
+
+    def test_timeout(self):
+        result = self.run_test(
+            "--timeout",
+            "0.5",
+            "--slow-warning",
+            "0.2",
+            f"{__name__}.ExampleTests.test_hang",
+            f"{__name__}.ExampleTests.test_pass",
+        )
+        assert result.returncode == 1
+        assert (
+            f"SLOW: {__name__}.ExampleTests.test_hang has been running for"
+            in result.stderr
+        )
+        assert f"TIMEOUT: {__name__}.ExampleTests.test_hang" in result.stderr
+        assert "Thread 'MainThread'" in result.stderr
+        assert "TestTimeoutError: Test timed out after 0.5s." in result.stderr
+        assert "Ran 2 tests" in result.stderr
+
+    def test_timeout_parallel(self):
+        result = self.run_test(
+            "--parallel",
+            "2",
+            "--timeout",
+            "0.5",
+            f"{__name__}.ExampleTests.test_hang",
+            f"{__name__}.TearDownFailTests.test_tearDownError_success",
+        )
+        assert result.returncode == 1
+        assert f"TIMEOUT: {__name__}.ExampleTests.test_hang" in result.stderr
+        assert "TestTimeoutError: Test timed out after 0.5s." in result.stderr
+
     def test_tearDown_fail(self):
         result = self.run_test(
             f"{__name__}.TearDownFailTests.test_tearDownError_success"
@@ -1045,3 +2082,105 @@ class TestRunnerTests(SimpleTestCase):
                 "test_tearDownError_skip (tests.test_test.TearDownErrorTests) ... skipped 'skip'",
                 "test_tearDownError_skip (tests.test_test.TearDownErrorTests) ... ERROR",
             ]
+
+
+class TracebackSnapshotTests(SimpleTestCase):
+    def make_snapshot(self, output: str = "") -> TracebackSnapshot:
+        result = make_result()
+        result.deferred_tracebacks = True
+        result.locals_limits = LocalsLimits(max_length=5, max_string=20)
+        try:
+            big_local = list(range(1000))  # noqa: F841
+            long_local = "x" * 1000  # noqa: F841
+            raise ValueError("Woops")
+        except ValueError:
+            snapshot = result._exc_info_to_string(sys.exc_info(), self)
+        assert isinstance(snapshot, TracebackSnapshot)
+        if output:
+            snapshot = TracebackSnapshot(snapshot.trace, output)
+        return snapshot
+
+    def test_pickle(self):
+        snapshot = self.make_snapshot("\nStdout:\nhi\n")
+        assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+
+    def test_locals_bounded(self):
+        snapshot = self.make_snapshot()
+        assert snapshot.trace is not None
+        frame_locals = snapshot.trace.stacks[0].frames[-1].locals
+        assert frame_locals is not None
+        big_local = frame_locals["big_local"]
+        assert big_local.children is not None
+        assert len(big_local.children) == 6
+        assert big_local.children[-1].value_repr == "... +995"
+        long_local = frame_locals["long_local"]
+        assert long_local.value_repr == "'" + "x" * 20 + "'+980"
+
+    def test_str(self):
+        text = str(self.make_snapshot("\nStdout:\nhi\n"))
+        assert "ValueError: Woops" in text
+        assert "─ locals ─" in text
+        assert text.endswith("\nStdout:\nhi\n")
+
+
+class RichTextTestResultWatchdogTests(SimpleTestCase):
+    def test_restart(self):
+        result = make_result()
+        result.timeout = 10.0
+        result.start_watchdog()
+        result.start_watchdog()
+        result.stop_watchdog()
+        names = [thread.name for thread in threading.enumerate()]
+        assert "django-rich-watchdog" not in names
+
+
+class RichTextTestResultDotsTests(SimpleTestCase):
+    def test_buffered(self):
+        stream = StringIO()
+        result = make_result(stream, dots_flush_interval=60.0)
+        result.addSuccess(self)
+        result.addSkip(self, "reason")
+        assert stream.getvalue() == ""
+        result.stopTestRun()
+        assert stream.getvalue() == ".s"
+
+    def test_flush_size(self):
+        stream = StringIO()
+        result = make_result(stream, dots_flush_interval=60.0)
+        result.dots_flush_size = 3
+        result.addSuccess(self)
+        result.addSuccess(self)
+        assert stream.getvalue() == ""
+        result.addSuccess(self)
+        assert stream.getvalue() == "..."
+
+    def test_flush_interval(self):
+        stream = StringIO()
+        result = make_result(stream, dots_flush_interval=60.0)
+        result.dots_flush_interval = 0.0
+        result.addSuccess(self)
+        assert stream.getvalue() == "."
+
+    def test_flush_interval_start_test(self):
+        stream = StringIO()
+        result = make_result(stream, dots_flush_interval=60.0)
+        result.addSuccess(self)
+        result.startTest(self)
+        assert stream.getvalue() == ""
+        result._dots_flushed_at -= result.dots_flush_interval
+        result.startTest(self)
+        assert stream.getvalue() == "."
+
+    def test_flush_before_live(self):
+        stream = StringIO()
+        result = make_result(stream, dots_flush_interval=60.0)
+        result.addSuccess(self)
+        result._print_live(Text("SLOW"))
+        assert stream.getvalue() == ".\nSLOW\n"
+
+    def test_flush_before_errors(self):
+        stream = StringIO()
+        result = make_result(stream, dots_flush_interval=60.0)
+        result.addSuccess(self)
+        result.printErrors()
+        assert stream.getvalue().startswith(".")
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+from types import ModuleType
+
+from django.test import SimpleTestCase
+
+from django_rich._watch import FileWatcher, ImportGraph, _parse_imports
+
+
+def module(name: str, path: Path) -> ModuleType:
+    result = ModuleType(name)
+    result.__file__ = str(path)
+    return result
+
+
+class ParseImportsTests(SimpleTestCase):
+    def test_imports(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "views.py"
+            path.write_text(
+                dedent(
+                    """\
+                    import os.path
+                    from . import models
+                    from .forms import ContactForm
+                    from ..core import utils
+                    from .......too_far import nothing
+                    """
+                )
+            )
+            imports = _parse_imports("shop.web.views", str(path))
+        assert imports == {
+            "os",
+            "os.path",
+            "shop",
+            "shop.web",
+            "shop.web.models",
+            "shop.web.forms",
+            "shop.web.forms.ContactForm",
+            "shop.core",
+            "shop.core.utils",
+        }
+
+    def test_package(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "__init__.py"
+            path.write_text("from .models import Book\n")
+            imports = _parse_imports("shop", str(path))
+        assert imports == {"shop.models", "shop.models.Book"}
+
+    def test_syntax_error(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "broken.py"
+            path.write_text("import (\n")
+            assert _parse_imports("broken", str(path)) == set()
+
+
+class ImportGraphTests(SimpleTestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        sources = {
+            "app/__init__.py": "",
+            "app/helpers.py": "import json\n",
+            "app/views.py": "from app import helpers\n",
+            "app/test_views.py": "from app.views import index\n",
+            "app/test_other.py": "import unittest\n",
+            "venv/site-packages/lib.py": "",
+        }
+        self.modules = []
+        for filename, source in sources.items():
+            path = self.root / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(source)
+            name = filename.removesuffix(".py").removesuffix("/__init__")
+            self.modules.append(module(name.replace("/", "."), path))
+        self.graph = ImportGraph(self.root)
+        self.graph.add_modules(self.modules)
+
+    def test_add_modules(self):
+        assert sorted(self.graph.files) == [
+            "app",
+            "app.helpers",
+            "app.test_other",
+            "app.test_views",
+            "app.views",
+        ]
+        assert self.graph.module_for_file(str(self.root / "app/views.py")) == (
+            "app.views"
+        )
+        assert self.graph.module_for_file(str(self.root / "other.py")) is None
+
+    def test_dependents(self):
+        assert self.graph.dependents(["app.helpers"]) == {
+            "app.helpers",
+            "app.views",
+            "app.test_views",
+        }
+
+    def test_dependencies(self):
+        assert self.graph.dependencies(["app.test_views"]) == {
+            "app",
+            "app.helpers",
+            "app.views",
+            "app.test_views",
+        }
+
+    def test_reload_order(self):
+        assert self.graph.reload_order(
+            ["app.test_views", "app.views", "app.helpers"]
+        ) == ["app.helpers", "app.views", "app.test_views"]
+
+    def test_reload_order_cycle(self):
+        self.graph.imports["app.helpers"].add("app.views")
+        assert sorted(self.graph.reload_order(["app.views", "app.helpers"])) == [
+            "app.helpers",
+            "app.views",
+        ]
+
+
+class FileWatcherTests(SimpleTestCase):
+    def test_changed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first = Path(tmp_dir) / "first.py"
+            second = Path(tmp_dir) / "second.py"
+            first.write_text("")
+            second.write_text("")
+            watcher = FileWatcher([str(first), str(second)])
+            assert watcher.changed() == []
+
+            first.write_text("VALUE = 1\n")
+            assert watcher.changed() == [str(first)]
+            assert watcher.changed() == []
+
+            second.unlink()
+            assert watcher.changed() == [str(second)]
+            second.write_text("")
+            assert watcher.changed() == [str(second)]
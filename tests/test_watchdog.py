@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+import pytest
+from django.test import SimpleTestCase
+
+from django_rich._watchdog import CAN_INTERRUPT, Watchdog, thread_stacks
+
+# Renamed, so pytest doesn't collect it.
+from django_rich._watchdog import TestTimeoutError as TimeoutErrorInTest
+
+
+class WatchdogTests(SimpleTestCase):
+    def make_watchdog(
+        self, timeout: float | None, warning: float | None
+    ) -> tuple[Watchdog, list[tuple[str, unittest.TestCase]]]:
+        calls: list[tuple[str, unittest.TestCase]] = []
+        watchdog = Watchdog(
+            timeout,
+            warning,
+            on_timeout=lambda test, elapsed: calls.append(("timeout", test)),
+            on_warning=lambda test, elapsed: calls.append(("warning", test)),
+        )
+        watchdog.start()
+        self.addCleanup(watchdog.stop)
+        return watchdog, calls
+
+    def test_warning(self):
+        watchdog, calls = self.make_watchdog(None, 0.01)
+        watchdog.watch(self)
+        time.sleep(0.2)
+        watchdog.unwatch()
+        assert calls == [("warning", self)]
+
+    def test_unwatched(self):
+        watchdog, calls = self.make_watchdog(0.1, 0.05)
+        watchdog.watch(self)
+        watchdog.unwatch()
+        time.sleep(0.2)
+        assert calls == []
+
+    @pytest.mark.skipif(not CAN_INTERRUPT, reason="Needs SIGALRM.")
+    def test_timeout(self):
+        watchdog, calls = self.make_watchdog(0.05, 0.01)
+        watchdog.watch(self)
+        with pytest.raises(TimeoutErrorInTest, match=r"after 0\.05s"):
+            threading.Event().wait(timeout=5)
+        watchdog.unwatch()
+        assert calls == [("warning", self), ("timeout", self)]
+
+
+class ThreadStacksTests(SimpleTestCase):
+    def test_all_threads(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait, name="waiter")
+        thread.start()
+        try:
+            traces = thread_stacks(limit=2)
+        finally:
+            stop.set()
+            thread.join()
+        names = [trace.stacks[0].exc_type for trace in traces]
+        assert names[0] == "Thread 'MainThread'"
+        assert "Thread 'waiter'" in names
+        assert all(len(trace.stacks[0].frames) <= 2 for trace in traces)
+
+    def test_skip(self):
+        traces = thread_stacks(skip=threading.get_ident())
+        names = [trace.stacks[0].exc_type for trace in traces]
+        assert "Thread 'MainThread'" not in names
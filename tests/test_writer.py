@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from io import StringIO
+from unittest.runner import _WritelnDecorator
+
+import pytest
+from django.test import SimpleTestCase
+
+from django_rich._writer import BackgroundWriter
+from django_rich.test import RichTestRunner, RichTextTestResult
+
+
+class SlowStream(StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+        self.release = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.release.wait(timeout=5)
+        self.writes += 1
+        return super().write(text)
+
+
+class BrokenStream(StringIO):
+    def write(self, text: str) -> int:
+        raise BrokenPipeError()
+
+
+class BackgroundWriterTests(SimpleTestCase):
+    def test_not_started(self):
+        stream = StringIO()
+        writer = BackgroundWriter(stream)
+        writer.write("hi")
+        assert stream.getvalue() == "hi"
+
+    def test_order(self):
+        stream = StringIO()
+        writer = BackgroundWriter(stream)
+        writer.start()
+        for i in range(100):
+            writer.write(f"{i},")
+        writer.close()
+        assert stream.getvalue() == "".join(f"{i}," for i in range(100))
+        writer.write("after")
+        assert stream.getvalue().endswith("after")
+
+    def test_coalesces(self):
+        stream = SlowStream()
+        writer = BackgroundWriter(stream)
+        writer.start()
+        writer.write("a")
+        for char in "bcd":
+            writer.write(char)
+        stream.release.set()
+        writer.drain()
+        assert stream.getvalue() == "abcd"
+        assert stream.writes <= 2
+        writer.close()
+
+    def test_drain(self):
+        stream = StringIO()
+        writer = BackgroundWriter(stream)
+        writer.start()
+        writer.write("hi")
+        writer.drain()
+        assert stream.getvalue() == "hi"
+        writer.close()
+
+    def test_error(self):
+        writer = BackgroundWriter(BrokenStream())
+        writer.start()
+        writer.write("hi")
+        writer.write("there")
+        with pytest.raises(BrokenPipeError):
+            writer.close()
+
+    def test_delegates(self):
+        stream = StringIO()
+        writer = BackgroundWriter(stream)
+        assert writer.isatty() is False
+        assert writer.encoding == stream.encoding
+
+
+class AsyncOutputTests(SimpleTestCase):
+    def test_runner(self):
+        stream = StringIO()
+        runner = RichTestRunner(stream=stream, async_output=True)
+        assert isinstance(runner.writer, BackgroundWriter)
+        runner.run(unittest.TestSuite())
+        assert runner.writer._thread is None
+        assert "Ran 0 tests" in stream.getvalue()
+
+    def test_stop_drains(self):
+        stream = StringIO()
+        writer = BackgroundWriter(stream)
+        result = RichTextTestResult(_WritelnDecorator(writer), True, 1)
+        writer.start()
+        result.addSuccess(self)
+        result.stop()
+        assert stream.getvalue() == result._dot_strings["."]
+        writer.close()
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class Book(models.Model):
+    title: models.CharField[str, str] = models.CharField(max_length=100)
+
+    def __str__(self) -> str:
+        return str(self.title)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from typing import Any
+from unittest.runner import _WritelnDecorator
+
+from django_rich.test import RichTextTestResult
+
+
+@contextmanager
+def temp_cache_dir() -> Iterator[Path]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield Path(tmp_dir) / "cache"
+
+
+def make_result(
+    stream: StringIO | None = None, verbosity: int = 1, **attributes: Any
+) -> RichTextTestResult:
+    """
+    Make a RichTextTestResult writing to ``stream``, or a new StringIO, with
+    the given attributes set.
+    """
+    if stream is None:
+        stream = StringIO()
+    result = RichTextTestResult(_WritelnDecorator(stream), True, verbosity)
+    for name, value in attributes.items():
+        setattr(result, name, value)
+    return result